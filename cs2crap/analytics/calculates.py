@@ -1,11 +1,11 @@
 import re
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 from statsmodels.tsa.arima.model import ARIMA
 
 from cs2crap.common.request_handler import request2
+from cs2crap.analytics.history_store import HistoryStore
 
 
 # ==================================================================================================================================
@@ -51,10 +51,8 @@ def get_currency_mult() -> float:
 # ==================================================================================================================================
 
 
-def analysis(item_category: str, item_prices_filename: str):
-    df = pd.read_csv(
-        f"cs2crap/analytics/data/{item_category}/{item_prices_filename}.csv"
-    )
+def analysis(item_category: str, item_name: str):
+    df = HistoryStore(item_category).to_dataframe(item_name)
 
     # Получаем коэффициент конвертации в рубли
     currency_mult = get_currency_mult()
@@ -81,8 +79,6 @@ def analysis(item_category: str, item_prices_filename: str):
     average_price_last_N_days = df["price_rub"].tail(N).mean()
     print("\nСредняя цена за последние", N, "дней:", average_price_last_N_days)
 
-    # Преобразование столбца с датой в тип datetime
-    df["time"] = pd.to_datetime(df["time"], format="%b %d %Y %H")
     df.set_index("time", inplace=True)
 
     # Визуализация временного ряда
@@ -99,4 +95,4 @@ def analysis(item_category: str, item_prices_filename: str):
 
 
 if __name__ == "__main__":
-    analysis("agents", "Crasswater The Forgotten Guerrilla Warfare")
+    analysis("agents", "Crasswater The Forgotten | Guerrilla Warfare")
@@ -2,11 +2,18 @@ import re
 import os
 import json
 import pandas as pd
+from typing import Optional
 
-from cs2crap.analytics.utils import safe_filename
+from cs2crap.analytics.manifest import FRESHNESS_WINDOW, HarvestManifest
+from cs2crap.analytics.history_store import COMPACT_RATIO, HistoryStore
 from cs2crap.common.request_handler import request2
+from cs2crap.common.proxy_manager import get_proxy_manager
+from cs2crap.common.scan_control import run_concurrently
+from cs2crap.common.price_history import extract_price_history
 from cs2crap.common.utils import color_print, read_and_fix_csv
 
+MAX_HARVEST_WORKERS = 16  # Потолок потоков сбора истории цен
+
 AGENTS_URL = "https://steamcommunity.com/market/search/render/?query=&start=@@@&count=100&search_descriptions=0&sort_column=price&sort_dir=asc&appid=730&category_730_ItemSet%5B%5D=any&category_730_ProPlayer%5B%5D=any&category_730_StickerCapsule%5B%5D=any&category_730_TournamentTeam%5B%5D=any&category_730_Type%5B%5D=tag_Type_CustomPlayer&category_730_Weapon%5B%5D=any"
 
 
@@ -150,44 +157,160 @@ def get_items_list(items_category: str, url: str, start: int = 0, count: int = 1
 # ==================================================================================================================================
 
 
-def get_items_price_history(items_category: str) -> None:
+def fetch_item_price_history(
+    store: HistoryStore, item_name: str, item_href: str, since: Optional[int] = None
+) -> dict:
     """
-    Проходится по созданному списку предметов и получает их данные
+    Получает историю цен одного предмета и дописывает её в хранилище истории категории.
 
     Parameters:
-        - items_category (str): категория предметов или же название файла .csv полученного из get_items_list()
+        - store (HistoryStore): хранилище истории категории
+        - item_name (str): название предмета
+        - item_href (str): ссылка на страницу предмета
+        - since (int, optional): время последней сохранённой точки предмета: дописываются только точки не старше неё
+            (последняя точка дописывается повторно, так как текущий час Steam ещё дополняет)
 
     Returns:
-        - None
+        - dict: points - точек на странице (0 - страница не получена или истории на ней нет),
+            added - дописано точек, bytes - дописано байт, downloaded - размер страницы
     """
-    items_df = pd.read_csv(f"cs2crap/analytics/data/{items_category}.csv")
 
-    for index, row in items_df.iterrows():
-        item_href = row["item_href"]
+    # Без napping: темп запросов задают ограничитель и пул прокси
+    response = request2(item_href, 2, 5, False)
 
-        response = request2(item_href, 2, 5, True)
+    result = {"points": 0, "added": 0, "bytes": 0, "downloaded": len(response)}
 
-        color_print('none', "status", f"[{index + 1}/{items_df.shape[0]}]", False)
-        color_print('none', "create", f"{items_df.at[index, "item_name"]}", False)
+    history = extract_price_history(response)
 
-        big_data = re.findall(
-            r"\[\"([^\"]+ \d+): [^\"]+\",(-?\d+(\.\d+)?|\.\d+),\"(\d+)\"\]", response
-        )
+    if not len(history):
+        return result
+
+    new_points = history.timestamps >= since if since is not None else slice(None)
 
-        data_list = [
-            (data[0], f"{data[1]}{data[2] if not "." in str(data[1]) else ''}", data[3])
-            for data in big_data
-        ]
+    result["points"] = len(history)
+    result["added"] = len(history.timestamps[new_points])
+    result["bytes"] = store.append(
+        item_name,
+        history.timestamps[new_points],
+        history.prices[new_points],
+        history.counts[new_points],
+    )
 
-        item_df = pd.DataFrame(data_list, columns=["time", "price", "sell_count"])
+    return result
 
-        item_name = row["item_name"]
 
-        if not os.path.exists(f"cs2crap/analytics/data/{items_category}"):
-            os.makedirs(f"cs2crap/analytics/data/{items_category}")
+# ==================================================================================================================================
+
+
+def get_items_price_history(
+    items_category: str,
+    workers: Optional[int] = None,
+    freshness: float = FRESHNESS_WINDOW,
+    stop_event=None,
+    incremental: bool = True,
+) -> dict:
+    """
+    Проходится по созданному списку предметов и получает их историю цен в несколько потоков.
+    Прогресс записывается в манифест категории: предметы, история которых получена в пределах окна свежести,
+    пропускаются, поэтому прерванный сбор продолжается с того же места.
+    В инкрементальном режиме в хранилище дописываются только точки новее последней сохранённой точки предмета.
+
+    Parameters:
+        - items_category (str): категория предметов или же название файла .csv полученного из get_items_list()
+        - workers (int, optional): количество потоков (None - по одному на каждый доступный прокси)
+        - freshness (float): окно свежести истории в секундах (0 - запросить историю всех предметов)
+        - stop_event (ScanControl | threading.Event, optional): остановка и пауза сбора
+        - incremental (bool): дописывать только новые точки (False - всю историю, повторы объединяются по времени)
 
-        item_name = safe_filename(item_name)
-        item_df.to_csv(f"cs2crap/analytics/data/{items_category}/{item_name}.csv", index=False)
+    Returns:
+        - dict: количество предметов в категории, пропущенных (свежих), полученных и неудачных,
+            дописанных точек и байт, загруженных байт страниц
+    """
+
+    items_df = pd.read_csv(f"cs2crap/analytics/data/{items_category}.csv")
+    manifest = HarvestManifest(items_category)
+    store = HistoryStore(items_category)
+    last_timestamps = store.last_timestamps() if incremental else {}
+
+    stale_df = items_df[
+        [not manifest.is_fresh(name, freshness) for name in items_df["item_name"]]
+    ]
+
+    stats = {
+        "items": len(items_df),
+        "skipped": len(items_df) - len(stale_df),
+        "fetched": 0,
+        "failed": 0,
+        "points_added": 0,
+        "bytes_added": 0,
+        "bytes_downloaded": 0,
+    }
+
+    if workers is None:
+        workers = min(max(get_proxy_manager().healthy_count(), 1), MAX_HARVEST_WORKERS)
+
+    color_print(
+        "status",
+        "status",
+        f"{items_category}: свежих {stats['skipped']}, к сбору {len(stale_df)}, "
+        f"потоков {workers}",
+        True,
+    )
+
+    empty_result = {"points": 0, "added": 0, "bytes": 0, "downloaded": 0}
+
+    def fetch(row) -> dict:
+        return fetch_item_price_history(
+            store, row.item_name, row.item_href, last_timestamps.get(row.item_name)
+        )
+
+    def on_result(item_name: str, result: dict) -> None:
+        if result["points"]:
+            manifest.mark(item_name, result["points"])
+            stats["fetched"] += 1
+        else:
+            stats["failed"] += 1
+
+        stats["points_added"] += result["added"]
+        stats["bytes_added"] += result["bytes"]
+        stats["bytes_downloaded"] += result["downloaded"]
+
+        processed = stats["skipped"] + stats["fetched"] + stats["failed"]
+        color_print(
+            "none", "status", f"[{processed}/{stats['items']}] {item_name}", True
+        )
+
+    def on_error(item_name: str, e: Exception) -> None:
+        color_print("fail", "fail", f"Ошибка {item_name}: {e}", True)
+        on_result(item_name, empty_result)
+
+    try:
+        run_concurrently(
+            ((row.item_name, row) for row in stale_df.itertuples(index=False)),
+            fetch,
+            on_result,
+            workers,
+            stop_event,
+            on_error=on_error,
+            thread_name_prefix="harvest",
+        )
+    finally:
+        # Названия предметов сохраняются до манифеста, который на них ссылается
+        store.flush()
+        manifest.save()
+
+    # Повторно дописанные последние часы сжимаются, когда их накапливается заметная доля
+    store.compact(COMPACT_RATIO)
+
+    color_print(
+        "done",
+        "done",
+        f"{items_category}: дописано {stats['points_added']} точек "
+        f"({stats['bytes_added']} байт), загружено {stats['bytes_downloaded']} байт",
+        True,
+    )
+
+    return stats
 
 
 # ==================================================================================================================================
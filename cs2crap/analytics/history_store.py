@@ -0,0 +1,406 @@
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+from cs2crap.analytics.manifest import ANALYTICS_DATA_DIR
+from cs2crap.analytics.utils import safe_filename
+from cs2crap.common.utils import color_print
+
+
+# ==================================================================================================================================
+# |                                                      HISTORY STORE DATA                                                        |
+# ==================================================================================================================================
+
+HISTORY_FILE = "history.bin"  # Точки истории категории подряд, записи HISTORY_DTYPE
+ITEMS_FILE = "history_items.json"  # Названия предметов по item_id
+
+# Одна точка истории: 24 байта без выравнивания вместо строки CSV
+HISTORY_DTYPE = np.dtype(
+    [
+        ("item_id", "<u4"),
+        ("timestamp", "<i8"),  # Unix-время начала часа (UTC)
+        ("price", "<f8"),
+        ("sell_count", "<u4"),
+    ]
+)
+
+STEAM_TIME_FORMAT = "%b %d %Y %H"  # Формат времени в истории цен Steam ("Dec 05 2023 01")
+
+COMPACT_RATIO = 0.1  # Сжимать файл истории, когда повторные точки составляют больше этой доли
+NAMES_SAVE_EVERY = 100  # Сохранять список названий каждые N новых предметов (и в flush / compact)
+
+
+# ==================================================================================================================================
+# |                                                         HISTORY STORE                                                          |
+# ==================================================================================================================================
+
+
+def steam_times_to_timestamps(times) -> np.ndarray:
+    """
+    Переводит время из истории цен Steam ("Dec 05 2023 01") в Unix-время.
+
+    Parameters:
+        - times (Iterable[str]): Время точек истории.
+
+    Returns:
+        - np.ndarray: Unix-время в секундах (int64).
+    """
+
+    parsed = pd.to_datetime(pd.Series(times, dtype=object), format=STEAM_TIME_FORMAT)
+    return parsed.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+# ==================================================================================================================================
+
+
+def merge_records(records: np.ndarray) -> np.ndarray:
+    """
+    Объединяет точки истории по (item_id, timestamp): из повторов остаётся записанная последней.
+
+    Parameters:
+        - records (np.ndarray): Записи HISTORY_DTYPE в порядке записи.
+
+    Returns:
+        - np.ndarray: Записи без повторов, отсортированные по item_id и времени.
+    """
+
+    if len(records) == 0:
+        return np.empty(0, dtype=HISTORY_DTYPE)
+
+    # Внутри одинаковых (item_id, timestamp) более поздняя запись идёт первой
+    order = np.lexsort(
+        (-np.arange(len(records)), records["timestamp"], records["item_id"])
+    )
+    records = records[order]
+
+    keep = np.ones(len(records), dtype=bool)
+    keep[1:] = (records["item_id"][1:] != records["item_id"][:-1]) | (
+        records["timestamp"][1:] != records["timestamp"][:-1]
+    )
+
+    return records[keep]
+
+
+# ==================================================================================================================================
+
+
+class HistoryStore:
+    """
+    Единое хранилище истории цен категории: все точки всех предметов в одном бинарном файле записей HISTORY_DTYPE.
+    Файл только дописывается, читается одним последовательным чтением или отображается в память (np.memmap).
+    """
+
+    def __init__(self, items_category: str, data_dir: str = ANALYTICS_DATA_DIR):
+        """
+        Parameters:
+            - items_category (str): Категория предметов.
+            - data_dir (str): Папка с данными аналитики.
+        """
+
+        self.items_category = items_category
+        self.directory = os.path.join(data_dir, items_category)
+        self.filename = os.path.join(self.directory, HISTORY_FILE)
+        self.items_filename = os.path.join(self.directory, ITEMS_FILE)
+
+        self._lock = threading.Lock()
+        self._names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._unsaved_names = 0
+
+        self._load_items()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _load_items(self) -> None:
+        if os.path.isfile(self.items_filename):
+            with open(self.items_filename, "r", encoding="utf-8") as items_file:
+                self._names = json.load(items_file)
+
+        # Названия последних предметов могли не сохраниться до падения процесса:
+        # их id остаются занятыми, чтобы новые предметы не получили чужие точки
+        history = self.load()
+        if len(history):
+            orphans = int(history["item_id"].max()) + 1 - len(self._names)
+            self._names += [""] * max(orphans, 0)
+
+        self._ids = {
+            name: item_id for item_id, name in enumerate(self._names) if name
+        }
+
+    def _save_items(self) -> None:
+        temp_filename = f"{self.items_filename}.tmp"
+
+        with open(temp_filename, "w", encoding="utf-8") as items_file:
+            json.dump(self._names, items_file, ensure_ascii=False)
+            items_file.flush()
+            os.fsync(items_file.fileno())
+
+        os.replace(temp_filename, self.items_filename)
+
+    def item_id(self, item_name: str) -> int:
+        """Возвращает item_id предмета, регистрируя новый предмет при первом обращении."""
+
+        with self._lock:
+            return self._item_id(item_name)
+
+    def _item_id(self, item_name: str) -> int:
+        item_id = self._ids.get(item_name)
+
+        if item_id is None:
+            # Список названий переписывается пачками, а не на каждый новый предмет
+            item_id = len(self._names)
+            self._names.append(item_name)
+            self._ids[item_name] = item_id
+            self._unsaved_names += 1
+
+            if self._unsaved_names >= NAMES_SAVE_EVERY:
+                self._flush_items()
+
+        return item_id
+
+    def _flush_items(self) -> None:
+        if self._unsaved_names:
+            os.makedirs(self.directory, exist_ok=True)
+            self._save_items()
+            self._unsaved_names = 0
+
+    def flush(self) -> None:
+        """Сохраняет названия новых предметов (вызывается в конце сбора)."""
+
+        with self._lock:
+            self._flush_items()
+
+    def item_name(self, item_id: int) -> str:
+        return self._names[item_id]
+
+    @property
+    def item_names(self) -> list[str]:
+        return list(self._names)
+
+    def __contains__(self, item_name: str) -> bool:
+        return item_name in self._ids
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def append(
+        self,
+        item_name: str,
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+        sell_counts: np.ndarray,
+    ) -> int:
+        """
+        Дописывает точки истории предмета в конец файла категории.
+
+        Parameters:
+            - item_name (str): Название предмета.
+            - timestamps (np.ndarray): Unix-время точек.
+            - prices (np.ndarray): Цены.
+            - sell_counts (np.ndarray): Количество продаж.
+
+        Returns:
+            - int: Количество записанных байт.
+        """
+
+        records = np.empty(len(timestamps), dtype=HISTORY_DTYPE)
+        records["timestamp"] = timestamps
+        records["price"] = prices
+        records["sell_count"] = sell_counts
+
+        with self._lock:
+            records["item_id"] = self._item_id(item_name)
+
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.filename, "ab") as history_file:
+                # Недописанная запись после падения процесса сдвинула бы все следующие
+                size = history_file.tell()
+                if size % HISTORY_DTYPE.itemsize:
+                    history_file.truncate(size - size % HISTORY_DTYPE.itemsize)
+
+                history_file.write(records.tobytes())
+
+        return records.nbytes
+
+    def load(self, mmap: bool = True) -> np.ndarray:
+        """
+        Загружает всю историю категории.
+
+        Parameters:
+            - mmap (bool): Отобразить файл в память (только чтение) вместо чтения в память целиком.
+
+        Returns:
+            - np.ndarray: Записи HISTORY_DTYPE в порядке записи.
+        """
+
+        if not os.path.isfile(self.filename):
+            return np.empty(0, dtype=HISTORY_DTYPE)
+
+        # Недописанная последняя запись (падение процесса во время записи) отбрасывается
+        count = os.path.getsize(self.filename) // HISTORY_DTYPE.itemsize
+
+        if count == 0:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+
+        if mmap:
+            return np.memmap(
+                self.filename, dtype=HISTORY_DTYPE, mode="r", shape=(count,)
+            )
+
+        return np.fromfile(self.filename, dtype=HISTORY_DTYPE, count=count)
+
+    def merged(self) -> np.ndarray:
+        """Вся история категории без повторов, по item_id и времени (см. merge_records)."""
+
+        return merge_records(self.load())
+
+    def item_history(self, item_name: str) -> np.ndarray:
+        """Точки истории одного предмета по возрастанию времени, без повторов."""
+
+        item_id = self._ids.get(item_name)
+        if item_id is None:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+
+        history = self.load()
+        return merge_records(history[history["item_id"] == item_id])
+
+    def last_timestamps(self) -> dict[str, int]:
+        """
+        Время последней сохранённой точки каждого предмета.
+
+        Returns:
+            - dict[str, int]: Название предмета -> Unix-время.
+        """
+
+        history = self.load()
+        if len(history) == 0:
+            return {}
+
+        last = pd.Series(history["timestamp"]).groupby(history["item_id"]).max()
+        return {
+            self._names[item_id]: int(timestamp) for item_id, timestamp in last.items()
+        }
+
+    def compact(self, min_duplicate_ratio: float = 0.0) -> int:
+        """
+        Переписывает файл истории без повторных точек, отсортированным по item_id и времени.
+
+        Parameters:
+            - min_duplicate_ratio (float): Сжимать, только если повторы составляют больше этой доли.
+
+        Returns:
+            - int: Количество удалённых повторных точек.
+        """
+
+        with self._lock:
+            self._flush_items()
+
+            history = self.load(mmap=False)
+            records = merge_records(history)
+
+            # Точки предметов, названия которых потерялись при падении процесса, не нужны
+            named = np.array([bool(name) for name in self._names], dtype=bool)
+            if len(records) and not named.all():
+                records = records[named[records["item_id"]]]
+
+            removed = len(history) - len(records)
+
+            if removed == 0 or removed <= min_duplicate_ratio * len(history):
+                return 0
+
+            temp_filename = f"{self.filename}.tmp"
+            records.tofile(temp_filename)
+            os.replace(temp_filename, self.filename)
+
+        return removed
+
+    def to_dataframe(self, item_name: Optional[str] = None) -> pd.DataFrame:
+        """
+        История категории или одного предмета в виде DataFrame.
+
+        Parameters:
+            - item_name (str, optional): Название предмета (None - вся категория).
+
+        Returns:
+            - pd.DataFrame: item_name, time (datetime), price, sell_count (без повторов, по времени).
+        """
+
+        records = self.merged() if item_name is None else self.item_history(item_name)
+        names = np.array(self._names, dtype=object)
+
+        return pd.DataFrame(
+            {
+                "item_name": names[records["item_id"]] if len(names) else [],
+                "time": pd.to_datetime(records["timestamp"], unit="s"),
+                "price": records["price"],
+                "sell_count": records["sell_count"],
+            }
+        )
+
+    def __len__(self) -> int:
+        if not os.path.isfile(self.filename):
+            return 0
+        return os.path.getsize(self.filename) // HISTORY_DTYPE.itemsize
+
+
+# ==================================================================================================================================
+
+
+def import_item_csvs(items_category: str, data_dir: str = ANALYTICS_DATA_DIR) -> int:
+    """
+    Переносит историю из отдельных CSV предметов (<category>/<safe_filename(item)>.csv) в хранилище категории.
+
+    Parameters:
+        - items_category (str): Категория предметов (нужен список предметов <category>.csv).
+        - data_dir (str): Папка с данными аналитики.
+
+    Returns:
+        - int: Количество перенесённых предметов.
+    """
+
+    items_df = pd.read_csv(os.path.join(data_dir, f"{items_category}.csv"))
+    store = HistoryStore(items_category, data_dir)
+    imported = 0
+
+    for item_name in items_df["item_name"]:
+        if item_name in store:
+            continue
+
+        item_file = os.path.join(
+            data_dir, items_category, f"{safe_filename(item_name)}.csv"
+        )
+        if not os.path.isfile(item_file):
+            continue
+
+        item_df = pd.read_csv(item_file)
+        store.append(
+            item_name,
+            steam_times_to_timestamps(item_df["time"]),
+            item_df["price"].to_numpy(),
+            item_df["sell_count"].to_numpy(),
+        )
+        imported += 1
+
+    store.flush()
+
+    color_print(
+        "status", "status", f"{items_category}: перенесено {imported} предметов", True
+    )
+    return imported
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_store = HistoryStore("test", data_dir="data/test_analytics")
+    test_store.append(
+        "Revolution Case",
+        steam_times_to_timestamps(["Dec 05 2023 01", "Dec 06 2023 01"]),
+        np.array([12.5, 13.0]),
+        np.array([3, 7]),
+    )
+    test_store.flush()
+
+    print(test_store.to_dataframe("Revolution Case"))
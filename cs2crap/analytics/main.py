@@ -1,11 +1,16 @@
 import os
+import pandas as pd
+from typing import Optional
 
+from cs2crap.analytics.manifest import FRESHNESS_WINDOW
 from cs2crap.analytics.data_manage import (
     get_category_data,
     get_items_category_count,
     get_items_list,
     get_items_price_history,
 )
+from cs2crap.analytics.history_store import HistoryStore
+from cs2crap.common.liquidity import LIQUIDITY_WINDOWS, category_liquidity
 from cs2crap.common.utils import print_cscrap_logo
 
 
@@ -14,12 +19,26 @@ from cs2crap.common.utils import print_cscrap_logo
 # ==================================================================================================================================
 
 
-def get_history(items_category: str):
+def get_history(
+    items_category: str,
+    workers: Optional[int] = None,
+    freshness: float = FRESHNESS_WINDOW,
+    stop_event=None,
+    incremental: bool = True,
+) -> dict:
     """
     Создаёт файл со списком всех предметов в категории, получает историю цен для предметов.
+    Повторный запуск после прерывания продолжает сбор: предметы со свежей историей пропускаются.
 
     Parameters:
         - items_category (str): название категории предметов
+        - workers (int, optional): количество потоков сбора (None - по одному на каждый доступный прокси)
+        - freshness (float): окно свежести истории в секундах
+        - stop_event (ScanControl | threading.Event, optional): остановка и пауза сбора
+        - incremental (bool): дописывать только точки новее уже сохранённых
+
+    Returns:
+        - dict: статистика сбора (см. get_items_price_history)
     """
 
     category_data = get_category_data(items_category)
@@ -33,7 +52,33 @@ def get_history(items_category: str):
         request_count = (int(category_data["items_count"]) // 100) + 1
         get_items_list(items_category, request_url, 0, request_count * 100)
 
-    get_items_price_history(items_category)
+    return get_items_price_history(
+        items_category, workers, freshness, stop_event, incremental
+    )
+
+
+def get_liquidity(
+    items_category: str, now: Optional[float] = None, windows: dict = LIQUIDITY_WINDOWS
+) -> pd.DataFrame:
+    """
+    Считает ликвидность всех предметов категории по собранной истории цен (та же метрика, что и volume в сканере).
+
+    Parameters:
+        - items_category (str): название категории предметов
+        - now (float, optional): момент, от которого отсчитываются окна (по умолчанию текущее время)
+        - windows (dict): окна {название: секунды}
+
+    Returns:
+        - pd.DataFrame: item_name, sales_<окно>, turnover_<окно>, median_<окно>, по убыванию продаж за 24 часа
+    """
+
+    store = HistoryStore(items_category)
+    liquidity = category_liquidity(store.merged(), store.item_names, now, windows)
+
+    if "sales_24h" in liquidity:
+        liquidity = liquidity.sort_values("sales_24h", ascending=False)
+
+    return liquidity
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import threading
+from typing import Optional
+
+from cs2crap.common.utils import color_print
+
+
+# ==================================================================================================================================
+# |                                                    HARVEST MANIFEST DATA                                                       |
+# ==================================================================================================================================
+
+ANALYTICS_DATA_DIR = "cs2crap/analytics/data"
+
+FRESHNESS_WINDOW = 24 * 60 * 60  # История предмета, полученная не раньше N секунд назад, не запрашивается повторно
+SAVE_EVERY = 20  # Сохранять манифест каждые N предметов
+
+
+# ==================================================================================================================================
+# |                                                       HARVEST MANIFEST                                                         |
+# ==================================================================================================================================
+
+
+class HarvestManifest:
+    """
+    Манифест сбора истории цен категории: когда и сколько точек истории получено для каждого предмета.
+    Прерванный сбор продолжается с того же места: предметы со свежей историей пропускаются.
+    """
+
+    def __init__(self, items_category: str, data_dir: str = ANALYTICS_DATA_DIR):
+        """
+        Parameters:
+            - items_category (str): Категория предметов.
+            - data_dir (str): Папка с данными аналитики.
+        """
+
+        self.items_category = items_category
+        self.filename = os.path.join(data_dir, items_category, "manifest.json")
+
+        self._lock = threading.Lock()
+        self._items: dict[str, dict] = {}  # Предмет -> {"fetched_at": time.time(), "points": int}
+        self._unsaved = 0
+
+        self._load()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not os.path.isfile(self.filename):
+            return
+
+        try:
+            with open(self.filename, "r", encoding="utf-8") as manifest_file:
+                self._items = json.load(manifest_file).get("items", {})
+        except (OSError, ValueError):
+            self._items = {}
+
+    def save(self) -> None:
+        """Атомарно сохраняет манифест на диск."""
+
+        with self._lock:
+            state = {"category": self.items_category, "items": dict(self._items)}
+            self._unsaved = 0
+
+        temp_filename = f"{self.filename}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            with open(temp_filename, "w", encoding="utf-8") as manifest_file:
+                json.dump(state, manifest_file, ensure_ascii=False)
+            os.replace(temp_filename, self.filename)
+        except OSError as e:
+            color_print("fail", "fail", f"Ошибка сохранения {self.filename}: {e}", True)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def is_fresh(
+        self,
+        item_name: str,
+        freshness: float = FRESHNESS_WINDOW,
+        now: Optional[float] = None,
+    ) -> bool:
+        """
+        Проверяет, получена ли история предмета в пределах окна свежести.
+
+        Parameters:
+            - item_name (str): Название предмета.
+            - freshness (float): Окно свежести в секундах.
+            - now (float, optional): Текущее время (по умолчанию time.time()).
+
+        Returns:
+            - bool: True, если историю предмета можно не запрашивать.
+        """
+
+        with self._lock:
+            entry = self._items.get(item_name)
+
+        if entry is None:
+            return False
+
+        return (now or time.time()) - entry["fetched_at"] < freshness
+
+    def mark(self, item_name: str, points: int) -> None:
+        """
+        Отмечает, что история предмета получена и записана.
+
+        Parameters:
+            - item_name (str): Название предмета.
+            - points (int): Количество точек истории.
+        """
+
+        with self._lock:
+            self._items[item_name] = {"fetched_at": time.time(), "points": points}
+            self._unsaved += 1
+            need_save = self._unsaved >= SAVE_EVERY
+
+        if need_save:
+            self.save()
+
+    def get(self, item_name: str) -> Optional[dict]:
+        with self._lock:
+            return self._items.get(item_name)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_manifest = HarvestManifest("test", data_dir="data/test_analytics")
+    test_manifest.mark("Revolution Case", 1500)
+    test_manifest.save()
+
+    test_manifest = HarvestManifest("test", data_dir="data/test_analytics")
+    print(test_manifest.is_fresh("Revolution Case"), test_manifest.get("Revolution Case"))
@@ -0,0 +1,349 @@
+import atexit
+import asyncio
+import threading
+from typing import Optional
+
+import aiohttp
+
+from cs2crap.common.utils import color_print
+from cs2crap.common.rate_limiter import get_rate_limiter
+from cs2crap.common.proxy_manager import get_proxy_manager, parse_retry_after
+from cs2crap.common.request_handler import (
+    get_random_delay,
+    get_request_headers,
+    is_proxy_fault,
+)
+
+
+# ==================================================================================================================================
+# |                                                    ASYNC REQUEST HANDLER DATA                                                  |
+# ==================================================================================================================================
+
+MAX_IN_FLIGHT = 32  # Максимальное количество одновременных запросов через движок
+
+_engine_loop: Optional[asyncio.AbstractEventLoop] = None  # Фоновый цикл событий движка
+_engine_thread: Optional[threading.Thread] = None  # Поток, в котором крутится цикл
+_engine_lock = threading.Lock()
+
+_client_session: Optional[aiohttp.ClientSession] = None  # Общая сессия aiohttp
+
+
+# ==================================================================================================================================
+# |                                                      ASYNC REQUEST HANDLER                                                     |
+# ==================================================================================================================================
+
+
+def get_engine_loop() -> asyncio.AbstractEventLoop:
+    """
+    Возвращает фоновый цикл событий движка, при первом обращении запускает его в отдельном потоке.
+
+    Returns:
+        - asyncio.AbstractEventLoop: Цикл событий, в котором выполняются все асинхронные запросы.
+    """
+
+    global _engine_loop, _engine_thread
+
+    with _engine_lock:
+        if _engine_loop is None or _engine_loop.is_closed():
+            _engine_loop = asyncio.new_event_loop()
+            _engine_thread = threading.Thread(
+                target=_engine_loop.run_forever,
+                name="cs2crap-request-engine",
+                daemon=True,
+            )
+            _engine_thread.start()
+
+    return _engine_loop
+
+
+# ==================================================================================================================================
+
+
+async def get_client_session() -> aiohttp.ClientSession:
+    """
+    Возвращает общую сессию aiohttp, создавая её при первом обращении.
+    Соединения внутри сессии переиспользуются (keep-alive) отдельно для каждого прокси.
+
+    Returns:
+        - aiohttp.ClientSession: Сессия для отправки HTTP-запросов.
+    """
+
+    global _client_session
+
+    if _client_session is None or _client_session.closed:
+        connector = aiohttp.TCPConnector(limit=MAX_IN_FLIGHT, ttl_dns_cache=300)
+        _client_session = aiohttp.ClientSession(connector=connector)
+
+    return _client_session
+
+
+# ==================================================================================================================================
+
+
+async def async_request2(
+    url: str,
+    timeout_min: float,
+    timeout_max: float,
+    napping: bool,
+    proxies: Optional[dict] = None,
+) -> str:
+    """
+    Асинхронный аналог request2: отправляет GET-запрос по указанному URL через лучший доступный прокси со случайным user-agent.
+    При ошибке запрос повторяется через следующий прокси из списка.
+
+    Parameters:
+        - url (str): URL для отправки запроса.
+        - timeout_min (float): Минимальное значение времени ожидания для запроса в секундах.
+        - timeout_max (float): Максимальное значение времени ожидания для запроса в секундах.
+        - napping (bool): Флаг, указывающий, следует ли делать задержку после запроса.
+        - proxies (dict, optional): Словарь прокси-серверов. По умолчанию лучшие доступные прокси из менеджера прокси.
+
+    Returns:
+        - str: Текстовое содержимое HTTP-ответа (пустая строка, если ни один прокси не ответил).
+    """
+
+    session = await get_client_session()
+    proxy_manager = get_proxy_manager()
+
+    if proxies is None:
+        if proxy_manager.total_count() == 0:
+            color_print("fail", "fail", "Список прокси пуст.", True)
+            return ""
+
+        proxies = proxy_manager.get_proxies()
+
+        # Все прокси на отдыхе: ждём ближайший вместо слепого sleep
+        while not proxies:
+            await asyncio.sleep(max(proxy_manager.time_until_available(), 1))
+            proxies = proxy_manager.get_proxies()
+
+    rate_limiter = get_rate_limiter()
+    proxies = dict(proxies)
+    response_text = ""
+
+    while proxies:
+        # Ограничитель выбирает прокси со свободным токеном для этого эндпоинта
+        proxy_name, wait = rate_limiter.acquire(proxies, url)
+        proxy_info = proxies.pop(proxy_name)
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        headers = get_request_headers()
+        # Без brotli aiohttp не сможет распаковать ответ
+        headers["Accept-Encoding"] = "gzip, deflate"
+
+        started = proxy_manager.request_started(proxy_name)
+
+        try:
+            async with session.get(
+                url,
+                headers=headers,
+                proxy=proxy_info["https"],
+                timeout=aiohttp.ClientTimeout(
+                    total=get_random_delay(timeout_min, timeout_max)
+                ),
+            ) as r:
+                response_text = await r.text()
+
+                if napping:
+                    await asyncio.sleep(get_random_delay(timeout_min, timeout_max) / 5)
+
+                r.raise_for_status()
+                proxy_manager.request_finished(proxy_name, started)
+                rate_limiter.record_success(proxy_name, url)
+                break
+
+        except asyncio.TimeoutError as e:
+            color_print(
+                "fail",
+                "fail",
+                f"Время ожидания превышено: {e}.",
+                True,
+            )
+            proxy_manager.request_failed(proxy_name, started)
+
+        except aiohttp.ClientResponseError as e:
+            color_print(
+                "fail",
+                "fail",
+                f"Ошибка запроса: {e.status}, {e.message}.",
+                True,
+            )
+            retry_after = parse_retry_after((e.headers or {}).get("Retry-After"))
+
+            if not is_proxy_fault(e.status):
+                # Ответ сервера (например, 404) не зависит от прокси: другие прокси получат тот же ответ
+                proxy_manager.request_finished(proxy_name, started)
+                rate_limiter.record_success(proxy_name, url)
+                response_text = ""
+                break
+
+            proxy_manager.request_failed(proxy_name, started, e.status, retry_after)
+            if e.status == 429:
+                rate_limiter.record_rate_limited(proxy_name, url, retry_after)
+
+        except aiohttp.ClientError as e:
+            color_print(
+                "fail",
+                "fail",
+                f"Ошибка соединения с сервером: {e}.",
+                True,
+            )
+            proxy_manager.request_failed(proxy_name, started)
+
+    return response_text
+
+
+# ==================================================================================================================================
+
+
+async def gather_requests(
+    urls: list[str],
+    timeout_min: float,
+    timeout_max: float,
+    napping: bool,
+    max_in_flight: int = MAX_IN_FLIGHT,
+) -> list[str]:
+    """
+    Отправляет пачку запросов одновременно, держа в полёте не больше max_in_flight запросов.
+
+    Parameters:
+        - urls (list[str]): Список URL для отправки запросов.
+        - timeout_min (float): Минимальное значение времени ожидания для запроса в секундах.
+        - timeout_max (float): Максимальное значение времени ожидания для запроса в секундах.
+        - napping (bool): Флаг, указывающий, следует ли делать задержку после запроса.
+        - max_in_flight (int): Максимальное количество одновременных запросов.
+
+    Returns:
+        - list[str]: Содержимое ответов в том же порядке, что и urls.
+    """
+
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def limited_request(url: str) -> str:
+        async with semaphore:
+            return await async_request2(url, timeout_min, timeout_max, napping)
+
+    return await asyncio.gather(*(limited_request(url) for url in urls))
+
+
+# ==================================================================================================================================
+
+
+def run_in_engine(coroutine):
+    """
+    Выполняет корутину в фоновом цикле движка и ждёт её результата.
+    Можно вызывать из любого потока, кроме потока самого движка.
+
+    Parameters:
+        - coroutine: Корутина для выполнения.
+
+    Returns:
+        - Результат выполнения корутины.
+    """
+
+    loop = get_engine_loop()
+
+    if threading.current_thread() is _engine_thread:
+        coroutine.close()
+        raise RuntimeError("run_in_engine нельзя вызывать из потока движка.")
+
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+# ==================================================================================================================================
+# |                                                         MAIN FUNCTIONS                                                         |
+# ==================================================================================================================================
+
+
+def engine_request2(
+    url: str, timeout_min: float, timeout_max: float, napping: bool
+) -> str:
+    """
+    Синхронная обёртка над async_request2 с тем же контрактом, что и request2.
+    Позволяет переводить функции на асинхронный движок по одной.
+
+    Parameters:
+        - url (str): URL для отправки запроса.
+        - timeout_min (float): Минимальное значение времени ожидания для запроса в секундах.
+        - timeout_max (float): Максимальное значение времени ожидания для запроса в секундах.
+        - napping (bool): Флаг, указывающий, следует ли делать задержку после запроса.
+
+    Returns:
+        - str: Текстовое содержимое HTTP-ответа.
+    """
+
+    return run_in_engine(async_request2(url, timeout_min, timeout_max, napping))
+
+
+# ==================================================================================================================================
+
+
+def engine_request_many(
+    urls: list[str],
+    timeout_min: float,
+    timeout_max: float,
+    napping: bool,
+    max_in_flight: int = MAX_IN_FLIGHT,
+) -> list[str]:
+    """
+    Синхронная обёртка над gather_requests: отправляет пачку запросов одновременно.
+
+    Parameters:
+        - urls (list[str]): Список URL для отправки запросов.
+        - timeout_min (float): Минимальное значение времени ожидания для запроса в секундах.
+        - timeout_max (float): Максимальное значение времени ожидания для запроса в секундах.
+        - napping (bool): Флаг, указывающий, следует ли делать задержку после запроса.
+        - max_in_flight (int): Максимальное количество одновременных запросов.
+
+    Returns:
+        - list[str]: Содержимое ответов в том же порядке, что и urls.
+    """
+
+    return run_in_engine(
+        gather_requests(urls, timeout_min, timeout_max, napping, max_in_flight)
+    )
+
+
+# ==================================================================================================================================
+
+
+def close_engine() -> None:
+    """Закрывает сессию aiohttp и останавливает фоновый цикл движка."""
+
+    global _engine_loop, _client_session
+
+    with _engine_lock:
+        loop = _engine_loop
+        _engine_loop = None
+
+    if loop is None or loop.is_closed():
+        return
+
+    async def close_session():
+        if _client_session is not None and not _client_session.closed:
+            await _client_session.close()
+
+    if threading.current_thread() is not _engine_thread:
+        asyncio.run_coroutine_threadsafe(close_session(), loop).result()
+
+    _client_session = None
+    loop.call_soon_threadsafe(loop.stop)
+
+
+atexit.register(close_engine)
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_urls = [
+        "https://steamcommunity.com/market/listings/730/AK-47%20%7C%20Slate%20%28Minimal%20Wear%29",
+        "https://steamcommunity.com/market/listings/730/Revolution%20Case",
+    ]
+
+    test_pages = engine_request_many(test_urls, 2, 4, False)
+
+    for test_url, test_page in zip(test_urls, test_pages):
+        color_print("log", "log", f"{test_url}: {len(test_page)} символов", True)
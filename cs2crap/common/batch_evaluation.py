@@ -0,0 +1,189 @@
+import time
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from cs2crap.common.price_comparison import PROFIT_THRESHOLD
+from cs2crap.csgomarket.price_book import get_price_book, normalize_name
+
+
+# ==================================================================================================================================
+# |                                                      BATCH EVALUATION DATA                                                     |
+# ==================================================================================================================================
+
+STEAM_PAYOUT = 0.87  # Доля цены, которую получает продавец в Steam (комиссия 13%)
+CSGOMARKET_PAYOUT = 0.95  # Доля цены, которую получает продавец на CS:GO Market (комиссия 5%)
+
+OPPORTUNITY_COLUMNS = [
+    "item_name",
+    "method",
+    "buy_at",  # Цена, по которой предмет покупается
+    "sell_at",  # Цена, по которой предмет продаётся
+    "profit",  # Прибыль с учётом комиссии площадки продажи, ₽
+    "margin",  # Прибыль с учётом комиссии, % от цены покупки
+    "instant",  # AUTOBUY для CS:GO Market -> Steam, FAST BUY для Steam -> CS:GO Market
+    "volume",
+    "item_href",
+]
+
+
+# ==================================================================================================================================
+# |                                                        BATCH EVALUATION                                                        |
+# ==================================================================================================================================
+
+"""
+Те же правила, что и в price_comparison / telegram_notifier, но сразу для всей таблицы:
+    - STM2STM: покупка по price_sell (автобай), продажа по price_buy (минимальный лот);
+    - CSM2STM: покупка на CS:GO Market, продажа в Steam по price_sell (AUTOBUY), иначе по price_buy;
+    - STM2CSM: покупка в Steam по price_buy (FAST BUY), иначе по price_sell, продажа на CS:GO Market.
+"""
+
+
+def _method_frame(
+    df: pd.DataFrame,
+    method: str,
+    mask: np.ndarray,
+    buy_at: np.ndarray,
+    sell_at: np.ndarray,
+    payout: float,
+    instant: np.ndarray,
+) -> pd.DataFrame:
+    profit = sell_at[mask] * payout - buy_at[mask]
+
+    return pd.DataFrame(
+        {
+            "item_name": df["item_name"].to_numpy()[mask],
+            "method": method,
+            "buy_at": buy_at[mask],
+            "sell_at": sell_at[mask],
+            "profit": profit,
+            "margin": profit / buy_at[mask] * 100,
+            "instant": instant[mask],
+            "volume": df["volume"].to_numpy()[mask],
+            "item_href": df["item_href"].to_numpy()[mask],
+        },
+        columns=OPPORTUNITY_COLUMNS,
+    )
+
+
+# ==================================================================================================================================
+
+
+def evaluate_opportunities(
+    df: pd.DataFrame,
+    methods: Optional[dict] = None,
+    csgomarket_prices: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """
+    Векторно оценивает все методы торговли для всей базы предметов за один проход.
+
+    Parameters:
+        - df (pd.DataFrame): База предметов (item_name, price_buy, price_sell, volume, item_href).
+        - methods (dict, optional): Включенные методы {"STM2STM": bool, "CSM2STM": bool, "STM2CSM": bool}. По умолчанию все.
+        - csgomarket_prices (pd.Series, optional): Цены CS:GO Market с индексом по названию. По умолчанию из общей книги цен.
+
+    Returns:
+        - pd.DataFrame: Выгодные сделки (столбцы OPPORTUNITY_COLUMNS), отсортированные по убыванию margin.
+    """
+
+    if methods is None:
+        methods = {"STM2STM": True, "CSM2STM": True, "STM2CSM": True}
+
+    price_buy = pd.to_numeric(df["price_buy"], errors="coerce").to_numpy(float)
+    price_sell = pd.to_numeric(df["price_sell"], errors="coerce").to_numpy(float)
+
+    frames = []
+
+    # Сравнения с NaN дают False, поэтому предметы без цен отсеиваются сами
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if methods.get("STM2STM"):
+            mask = (price_buy - price_sell) > PROFIT_THRESHOLD * price_buy
+            mask &= price_sell > 0
+            frames.append(
+                _method_frame(
+                    df,
+                    "STM2STM",
+                    mask,
+                    price_sell,
+                    price_buy,
+                    STEAM_PAYOUT,
+                    np.zeros(len(df), dtype=bool),
+                )
+            )
+
+        if methods.get("CSM2STM") or methods.get("STM2CSM"):
+            if csgomarket_prices is None:
+                csgomarket_prices = get_price_book().as_series()
+
+            csgomarket_price = (
+                df["item_name"]
+                .map(normalize_name)
+                .map(csgomarket_prices)
+                .to_numpy(float)
+            )
+
+            if methods.get("CSM2STM"):
+                by_price_buy = (
+                    price_buy - csgomarket_price
+                ) > PROFIT_THRESHOLD * price_buy
+                by_price_sell = (
+                    price_sell - csgomarket_price
+                ) > PROFIT_THRESHOLD * price_sell
+                frames.append(
+                    _method_frame(
+                        df,
+                        "CSM2STM",
+                        (by_price_buy | by_price_sell) & (csgomarket_price > 0),
+                        csgomarket_price,
+                        np.where(by_price_sell, price_sell, price_buy),
+                        STEAM_PAYOUT,
+                        by_price_sell,
+                    )
+                )
+
+            if methods.get("STM2CSM"):
+                by_price_buy = (
+                    csgomarket_price - price_buy
+                ) > PROFIT_THRESHOLD * csgomarket_price
+                by_price_sell = (
+                    csgomarket_price - price_sell
+                ) > PROFIT_THRESHOLD * csgomarket_price
+                buy_at = np.where(by_price_buy, price_buy, price_sell)
+                frames.append(
+                    _method_frame(
+                        df,
+                        "STM2CSM",
+                        (by_price_buy | by_price_sell) & (buy_at > 0),
+                        buy_at,
+                        csgomarket_price,
+                        CSGOMARKET_PAYOUT,
+                        by_price_buy,
+                    )
+                )
+
+    frames = [frame for frame in frames if not frame.empty]
+
+    if not frames:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+
+    return (
+        pd.concat(frames, ignore_index=True)
+        .sort_values("margin", ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_df = pd.read_csv("data/items_database.csv")
+
+    test_start = time.perf_counter()
+    test_opportunities = evaluate_opportunities(test_df)
+    test_elapsed = time.perf_counter() - test_start
+
+    print(test_opportunities.head(20))
+    print(
+        f"{len(test_df)} предметов, {len(test_opportunities)} сделок "
+        f"за {test_elapsed * 1000:.1f} мс"
+    )
@@ -1,15 +1,36 @@
 import re
 import os
-import asyncio
+import json
+import threading
 import pandas as pd
+from urllib.parse import quote
 from math import ceil
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from typing import Callable, Optional
 
 from cs2crap.common.request_handler import request2
+from cs2crap.common.async_request_handler import engine_request_many
+from cs2crap.common.proxy_manager import get_proxy_manager
 from cs2crap.common.utils import color_print, read_and_fix_csv
+from cs2crap.common.scan_journal import JOURNAL_FILE, ScanJournal
+from cs2crap.common.items_store import ItemsStore
+from cs2crap.common.scan_control import ScanControl, run_concurrently, should_stop
+from cs2crap.common.scan_checkpoint import ScanCheckpoint
+from cs2crap.common.price_history import extract_price_history
+from cs2crap.common.liquidity import item_liquidity
 from cs2crap.telegram_bot.telegram_notifier import message_sending, send_message
-from cs2crap.csgomarket.data_loader import get_csgomarket_items_prices
+
+
+MAX_SCAN_WORKERS = 16  # Потолок потоков сканирования в double_hook
+MIN_VOLUME = 25  # Минимальное количество продаж за сутки для уведомления о предмете
+CHECKPOINT_PAGES = 10  # Сохранять подгруженные страницы и контрольную точку каждые N страниц
+OVERVIEW_BATCH_PAGES = 4  # Сколько страниц выдачи по цене запрашивать за раз до проверки верхней границы диапазона
+
+SEARCH_JSON_URL = "https://steamcommunity.com/market/search/render/?query=&start={start}&count=100&search_descriptions=0&sort_column={sort_column}&sort_dir={sort_dir}&appid=730&norender=1&currency=5"
+LISTING_URL = "https://steamcommunity.com/market/listings/730/"
+IMAGE_URL = "https://community.cloudflare.steamstatic.com/economy/image/"
+
+# Цена лота в выдаче: "1 234,56 pуб." (поле sell_price выдачи - центы USD, currency=5 на него не влияет)
+RUB_PRICE_PATTERN = re.compile(r"^\s*(\d[\d\s]*(?:[.,]\d+)?)\s*(?:[pр]уб|₽)")
 
 
 # ==================================================================================================================================
@@ -17,7 +38,14 @@ from cs2crap.csgomarket.data_loader import get_csgomarket_items_prices
 # ==================================================================================================================================
 
 
-def get_items_list(start: int, count: int, sort_column: str, sort_dir: str):
+def get_items_list(
+    start: int,
+    count: int,
+    sort_column: str,
+    sort_dir: str,
+    stop_event: Optional[ScanControl | threading.Event] = None,
+    checkpoint: Optional[ScanCheckpoint] = None,
+):
     """
     ### Получает данные о предметах с указанных страниц и обновляет файл new_items.csv.
 
@@ -26,6 +54,10 @@ def get_items_list(start: int, count: int, sort_column: str, sort_dir: str):
         - count (int): Общее количество предметов.
         - sort_column (str): Колонка для сортировки ("price" или "popular").
         - sort_dir (str): Направление сортировки ("asc" или "desc").
+        - stop_event (ScanControl | threading.Event, optional): Управление подгрузкой: остановка (уже полученные
+            страницы сохраняются) и пауза между страницами.
+        - checkpoint (ScanCheckpoint, optional): Контрольная точка: подгрузка продолжается с сохранённой страницы,
+            а полученные страницы записываются в new_items.csv каждые CHECKPOINT_PAGES страниц.
 
     ### Returns:
         - Добавляет предметы в data/new_items.csv (создаёт, если его нет)
@@ -41,7 +73,21 @@ def get_items_list(start: int, count: int, sort_column: str, sort_dir: str):
 
     percentage = 0
 
-    for i in range(start, start + count, 100):
+    next_page = start if checkpoint is None else max(start, checkpoint.cursor)
+    stopped = False
+
+    for i in range(next_page, start + count, 100):
+        # Сохраняем полученные страницы и только после этого сдвигаем курсор контрольной точки
+        if checkpoint is not None and len(dfs) >= CHECKPOINT_PAGES:
+            save_new_items(dfs)
+            dfs = []
+            checkpoint.advance(i)
+
+        if should_stop(stop_event):
+            color_print("warning", "warning", "Подгрузка предметов остановлена.", True)
+            stopped = True
+            break
+
         current_url = base_url.replace("@@@", str(i)).replace("@@@", str(i + 100))
 
         color_print("status", "done", f"Подгрузка предметов:", True)
@@ -85,6 +131,28 @@ def get_items_list(start: int, count: int, sort_column: str, sort_dir: str):
                 )
                 current_attempt += 1
 
+        next_page = i + 100
+
+    if dfs:
+        save_new_items(dfs)
+
+    if checkpoint is not None:
+        checkpoint.advance(next_page)
+        if not stopped:
+            checkpoint.finish()
+
+
+# ==================================================================================================================================
+
+
+def save_new_items(dfs: list[pd.DataFrame]) -> None:
+    """
+    Дописывает полученные страницы предметов в data/new_items.csv (уже записанные предметы не перезаписываются).
+
+    Parameters:
+        - dfs (list[pd.DataFrame]): Страницы предметов (item_name, item_href, image_src).
+    """
+
     df = pd.concat(dfs, ignore_index=True)
 
     if os.path.isfile("data/new_items.csv"):
@@ -101,6 +169,211 @@ def get_items_list(start: int, count: int, sort_column: str, sort_dir: str):
 # ==================================================================================================================================
 
 
+def parse_rub_price(price_text: str) -> float:
+    """
+    Переводит цену из выдачи поиска Steam (sell_price_text) в число.
+
+    Parameters:
+        - price_text (str): Цена в виде текста, например "1 234,56 pуб.".
+
+    Returns:
+        - float: Цена в ₽ или NaN, если цена не в рублях или не распознана.
+    """
+
+    match = RUB_PRICE_PATTERN.match(price_text or "")
+
+    if match is None:
+        return float("nan")
+
+    return float(re.sub(r"\s", "", match.group(1)).replace(",", "."))
+
+
+# ==================================================================================================================================
+
+
+def parse_overview_page(response_content: str) -> list[dict]:
+    """
+    Разбирает страницу JSON-выдачи поиска Steam.
+
+    Parameters:
+        - response_content (str): Ответ SEARCH_JSON_URL.
+
+    Returns:
+        - list[dict]: item_name, item_href, image_src, sell_price (₽ или NaN), sell_listings;
+            пустой список, если страница пуста или не разобралась.
+    """
+
+    try:
+        results = json.loads(response_content).get("results") or []
+    except ValueError:
+        color_print("fail", "fail", "Ошибка парсинга выдачи: страница пропущена.", True)
+        return []
+
+    rows = []
+
+    for result in results:
+        hash_name = result.get("hash_name")
+        if not hash_name:
+            continue
+
+        icon_url = result.get("asset_description", {}).get("icon_url", "")
+
+        rows.append(
+            {
+                "item_name": hash_name,
+                "item_href": LISTING_URL + quote(hash_name, safe=""),
+                "image_src": f"{IMAGE_URL}{icon_url}/62fx62f" if icon_url else "",
+                "sell_price": parse_rub_price(result.get("sell_price_text", "")),
+                "sell_listings": result.get("sell_listings", 0),
+            }
+        )
+
+    return rows
+
+
+def overview_dataframe(rows: list[dict]) -> pd.DataFrame:
+    """Собирает строки выдачи (см. parse_overview_page) в DataFrame без повторов."""
+
+    df = pd.DataFrame(
+        rows,
+        columns=["item_name", "item_href", "image_src", "sell_price", "sell_listings"],
+    )
+
+    color_print("done", "done", f"Получено из выдачи: {len(df)} предметов", True)
+
+    return df.drop_duplicates(subset="item_name", keep="first")
+
+
+def get_items_overview(
+    start: int, count: int, sort_column: str = "popular", sort_dir: str = "desc"
+) -> pd.DataFrame:
+    """
+    Получает JSON-выдачу поиска Steam (по 100 предметов за запрос) с минимальной ценой лота и количеством лотов.
+    Страницы запрашиваются одновременно через асинхронный движок.
+
+    Parameters:
+        - start (int): Начальный индекс для запросов.
+        - count (int): Общее количество предметов.
+        - sort_column (str): Колонка для сортировки ("price" или "popular").
+        - sort_dir (str): Направление сортировки ("asc" или "desc").
+
+    Returns:
+        - pd.DataFrame: item_name, item_href, image_src, sell_price (минимальный лот, ₽), sell_listings (количество лотов).
+            sell_price берётся из sell_price_text: числовое поле sell_price выдачи - в центах USD.
+            Если цена пришла не в рублях, sell_price - NaN (предмет не отсеивается по цене).
+    """
+
+    urls = [
+        SEARCH_JSON_URL.format(
+            start=i, sort_column=sort_column, sort_dir=sort_dir
+        )
+        for i in range(start, start + count, 100)
+    ]
+
+    color_print("status", "status", f"Подгрузка выдачи: {len(urls)} страниц", True)
+
+    rows = []
+
+    for response_content in engine_request_many(urls, 2, 4, False):
+        rows += parse_overview_page(response_content)
+
+    return overview_dataframe(rows)
+
+
+def get_price_range_overview(
+    min_price: float, max_price: float, count: int
+) -> pd.DataFrame:
+    """
+    Получает JSON-выдачу поиска Steam только в диапазоне цен, а не весь каталог.
+    Выдача сортируется по возрастанию цены: первая страница диапазона ищется двоичным поиском
+    (около log2(count / 100) запросов), затем страницы подгружаются пачками по OVERVIEW_BATCH_PAGES,
+    пока минимальный лот на странице не превысит max_price.
+
+    Неудачный запрос считается концом выдачи: диапазон от этого только сужается,
+    а предметов вне выдачи предварительный отсев не касается.
+
+    Parameters:
+        - min_price (float): Нижняя граница цены в ₽.
+        - max_price (float): Верхняя граница цены в ₽ (inf - до конца выдачи).
+        - count (int): Сколько предметов выдачи просматривать максимум.
+
+    Returns:
+        - pd.DataFrame: То же, что get_items_overview.
+    """
+
+    pages_count = ceil(count / 100)
+    pages = {}
+
+    def fetch_pages(numbers: list[int]) -> None:
+        urls = [
+            SEARCH_JSON_URL.format(
+                start=number * 100, sort_column="price", sort_dir="asc"
+            )
+            for number in numbers
+        ]
+        responses = engine_request_many(urls, 2, 4, False)
+
+        for number, response_content in zip(numbers, responses):
+            pages[number] = parse_overview_page(response_content)
+
+    def known_prices(number: int) -> list[float]:
+        return [
+            row["sell_price"] for row in pages[number] if pd.notna(row["sell_price"])
+        ]
+
+    # Первая страница, на которой есть лот не дешевле min_price
+    low, high = 0, pages_count
+    while low < high:
+        middle = (low + high) // 2
+        fetch_pages([middle])
+        prices = known_prices(middle)
+
+        if pages[middle] and prices and max(prices) < min_price:
+            low = middle + 1
+        else:
+            high = middle
+
+    color_print(
+        "status", "status", f"Подгрузка выдачи в диапазоне цен со страницы {low}", True
+    )
+
+    rows = []
+    number = low
+
+    while number < pages_count:
+        batch = range(number, min(number + OVERVIEW_BATCH_PAGES, pages_count))
+
+        # Страницы, уже полученные двоичным поиском, повторно не запрашиваются
+        missing = [page for page in batch if page not in pages]
+        if missing:
+            fetch_pages(missing)
+
+        finished = False
+
+        for page in batch:
+            prices = known_prices(page)
+
+            if not pages[page]:
+                finished = True
+                break
+
+            rows += pages[page]
+
+            if prices and min(prices) > max_price:
+                finished = True
+                break
+
+        if finished:
+            break
+
+        number += OVERVIEW_BATCH_PAGES
+
+    return overview_dataframe(rows)
+
+
+# ==================================================================================================================================
+
+
 def get_item_id(item_href: str) -> tuple[int, str]:
     """
     Получение ID предмета по item_href.
@@ -196,45 +469,14 @@ def get_item_volume(item_href: str = None, item_page: str = None) -> int:
         - int: Кол-во продаж предмета за последние 24 часа.
     """
 
-    volume = 0
-
-    current_time = datetime.now()
-    current_date = current_time.strftime("%b %d %Y")
-
-    back_time = current_time - timedelta(hours=24)
-    formatted_back_date = back_time.strftime("%b %d %Y")
-
-    back_hours_since = back_time.strftime("%H")
-
     # Если в функцию поступает страница с предметом, то запрос не кидается
     if item_page is None:
         response_content = request2(item_href, 2, 4, False)
     elif item_page is not None:
         response_content = item_page
 
-    soup = BeautifulSoup(response_content, "html.parser")
-    script_tags = soup.find_all("script")
-
-    if script_tags:
-        last_script_content = script_tags[-1].string
-
-        current_day_pattern = re.compile(rf"{current_date}.*?\"(\d+)", re.DOTALL)
-        current_day_result = current_day_pattern.findall(last_script_content)
-
-        previous_day_pattern = re.compile(
-            rf"{formatted_back_date} (\d\d): .*?\"(\d+)",
-            re.DOTALL,
-        )
-        previous_day_result = previous_day_pattern.findall(last_script_content)
-
-    if current_day_result:
-        for match in current_day_result:
-            volume += int(match)
-
-    if previous_day_result:
-        for match in previous_day_result:
-            if int(match[0]) >= int(back_hours_since) - 2:
-                volume += int(match[1])
+    # Та же метрика ликвидности, что и в аналитике: продажи за последние 24 часа истории
+    volume = item_liquidity(extract_price_history(response_content))["sales_24h"]
 
     color_print("done", "done", "Популярность предмета получена:", True)
     (
@@ -249,13 +491,77 @@ def get_item_volume(item_href: str = None, item_page: str = None) -> int:
 # ==================================================================================================================================
 
 
+def scan_item(row: pd.Series, methods: dict) -> dict:
+    """
+    Получает данные одного предмета (id, объем, цены) и отправляет уведомление, если предмет выгоден.
+    Не изменяет исходный DataFrame, поэтому может выполняться в нескольких потоках одновременно.
+
+    Parameters:
+        - row (pd.Series): Строка DataFrame с данными предмета.
+        - methods (dict): Включенные методы торговли {"STM2STM": bool, "CSM2STM": bool, "STM2CSM": bool}.
+
+    Returns:
+        - dict: Полученные значения столбцов предмета (item_name, id, volume, price_buy, price_sell).
+    """
+
+    result = {"item_name": str(row["item_name"]).replace("&amp;", "&")}
+    item_page = None
+
+    id = row.get("id")
+
+    if pd.notna(id) and id != 0:
+        color_print("done", "done", "id предмета найден:", True)
+        color_print("none", "create", id, False)
+    else:
+        id, item_page = get_item_id(row["item_href"])
+        if pd.notna(id):
+            result["id"] = int(id)
+
+    # Получение популярности предмета
+    if item_page is not None:
+        # Если id был получен, то используем уже полученную страницу
+        volume = get_item_volume(item_page=item_page)
+    else:
+        # Если id был найден в базе, кидаем запрос
+        volume = get_item_volume(row["item_href"])
+    result["volume"] = int(volume)
+
+    if id is not None:
+        # Получение цен предмета
+        price_buy, price_sell = get_item_prices(id)
+
+        result["price_buy"] = float(price_buy)
+        result["price_sell"] = float(price_sell)
+
+        # Отсеиваем предметы по популярности
+        if int(volume) >= MIN_VOLUME:
+            message_sending(
+                result["item_name"],
+                volume,
+                price_buy,
+                price_sell,
+                row["item_href"],
+                methods,
+            )
+
+    return result
+
+
+# ==================================================================================================================================
+
+
 def double_hook(
     df: pd.DataFrame,
     STM2STM: bool = True,
     CSM2STM: bool = False,
     STM2CSM: bool = True,
     items_count: int = 0,
-    stop_cscrap_event: asyncio.Event = None,
+    stop_cscrap_event: Optional[ScanControl | threading.Event] = None,
+    workers: Optional[int] = 1,
+    items_store: Optional[ItemsStore] = None,
+    checkpoint: Optional[ScanCheckpoint] = None,
+    journal: Optional[ScanJournal] = None,
+    on_record: Optional[Callable[[dict], None]] = None,
 ) -> None:
     """
     Функция для парсинга данных (id, объем, цены) предметов за последние сутки и отправки уведомлений.
@@ -265,84 +571,134 @@ def double_hook(
         - STM2STM (bool): Флаг для включения/выключения метода торговли Steam -> Steam (по умолчанию True).
         - CSM2STM (bool): Флаг для включения/выключения метода торговли CS:GO Market -> Steam (по умолчанию False).
         - STM2CSM (bool): Флаг для включения/выключения метода торговли Steam -> CS:GO Market (по умолчанию True).
+        - items_count (int): Общее количество предметов для вывода прогресса (по умолчанию len(df)).
+        - stop_cscrap_event (ScanControl | threading.Event, optional): Управление сканированием: остановка,
+            пауза и продолжение. На паузе новые предметы не берутся, прокси освобождаются.
+        - workers (int, optional): Количество потоков сканирования (по умолчанию 1 - последовательно).
+            None - по одному потоку на каждый доступный прокси.
+        - items_store (ItemsStore, optional): База предметов SQLite, в которую результат каждого предмета записывается сразу.
+        - checkpoint (ScanCheckpoint, optional): Контрольная точка: уже обработанные в ней предметы пропускаются,
+            журнал сканирования продолжается, а не начинается заново.
+        - journal (ScanJournal, optional): Открытый журнал сканирования, общий с другими источниками результатов
+            (например, перепроверкой цен). Закрывает его вызывающий; по умолчанию открывается и закрывается JOURNAL_FILE.
+        - on_record (Callable[[dict], None], optional): Получает записанный результат каждого предмета
+            (например, чтобы перепроверка цен брала свежие id и объём, а не значения на старте сканирования).
 
     Output:
         - None
     """
+
+    methods = {
+        "STM2STM": STM2STM,
+        "CSM2STM": CSM2STM,
+        "STM2CSM": STM2CSM,
+    }
+
+    if not items_count:
+        items_count = max(len(df), 1)
+
+    if workers is None:
+        workers = min(max(get_proxy_manager().healthy_count(), 1), MAX_SCAN_WORKERS)
+
     item_number = 1
-    item_page = None
+    percentage = 0
 
-    for index, row in df.iterrows():
-        if not stop_cscrap_event.is_set():
+    # Продолжение прерванного сканирования: пропускаем предметы, результат которых уже записан
+    resuming = checkpoint is not None and bool(checkpoint.done)
+    if resuming:
+        pending = checkpoint.pending(df["item_name"])
+        item_number += len(df) - sum(pending)
+        df = df[pending].copy()
+
+    def is_stopped() -> bool:
+        return stop_cscrap_event is not None and stop_cscrap_event.is_set()
+
+    def save_checkpoint() -> None:
+        # Перед паузой сохраняем контрольную точку: задача на паузе может так и не продолжиться
+        if checkpoint is not None:
+            checkpoint.save()
+
+    def wait_if_paused() -> bool:
+        if isinstance(stop_cscrap_event, ScanControl) and stop_cscrap_event.is_paused():
+            save_checkpoint()
+
+        # На паузе ждём здесь: следующий предмет не берётся, пока сканирование не продолжат
+        return not should_stop(stop_cscrap_event)
+
+    def merge_result(index, result: dict) -> None:
+        nonlocal item_number, percentage
+
+        # В многопоточном режиме предметы завершаются не по порядку, номер выводим по факту готовности
+        if workers > 1:
             color_print(
                 "status", "status", f"Предмет: [{item_number} / {items_count}]", True
             )
 
-            # Отправка сообщений и вывод в консоль каждые 10% от общего кол-ва:
-            if (ceil(item_number * 100 / items_count)) % 10 == 0:
-                send_message(
-                    f"📡 *Сканирование: {(item_number * 100 / items_count):.0f}%* 📡"
-                )
+        for column, value in result.items():
+            df.at[index, column] = value
+
+        # Отправка сообщений и вывод в консоль каждые 10% от общего кол-ва:
+        current_percentage = ceil(item_number * 100 / items_count)
+        if current_percentage % 10 == 0 and percentage < current_percentage:
+            percentage = current_percentage
+            send_message(f"📡 *Сканирование: {percentage}%* 📡")
+
+        # Дописываем предмет в журнал вместо перезаписи всего updated_items.csv
+        record = {column: df.at[index, column] for column in df.columns}
+        journal.append(record)
 
-            df.at[index, "item_name"] = str(df.at[index, "item_name"]).replace(
-                "&amp;", "&"
+        if items_store is not None:
+            items_store.upsert(record)
+
+        if on_record is not None:
+            on_record(record)
+
+        if checkpoint is not None:
+            checkpoint.mark_done(record["item_name"])
+
+        item_number += 1
+
+    own_journal = journal is None
+    if own_journal:
+        journal = ScanJournal(JOURNAL_FILE, reset=not resuming)
+    stopped = False
+
+    try:
+        if workers <= 1:
+            for index, row in df.iterrows():
+                if not wait_if_paused():
+                    stopped = True
+                    break
+
+                color_print(
+                    "status", "status", f"Предмет: [{item_number} / {items_count}]", True
+                )
+                merge_result(index, scan_item(row, methods))
+        else:
+            color_print("status", "status", f"Потоков сканирования: {workers}", True)
+
+            run_concurrently(
+                df.iterrows(),
+                lambda row: scan_item(row, methods),
+                merge_result,
+                workers,
+                stop_cscrap_event,
+                on_pause=save_checkpoint,
+                on_error=lambda index, e: color_print(
+                    "fail", "fail", f"Ошибка сканирования предмета: {e}", True
+                ),
+                thread_name_prefix="scan",
             )
+            stopped = is_stopped()
+    finally:
+        if own_journal:
+            journal.close()
+
+        if checkpoint is not None:
+            checkpoint.save()
 
-            if CSM2STM or STM2CSM:
-                if item_number % 80 == 0:
-                    color_print(
-                        "status", "status", f"Обновляем базу скинов CS:GO Market.", True
-                    )
-                    get_csgomarket_items_prices()
-
-            id = row.get("id")
-
-            if pd.notna(id) and id != 0:
-                color_print("done", "done", "id предмета найден:", True)
-                color_print("none", "create", id, False)
-            else:
-                id, item_page = get_item_id(row["item_href"])
-                if pd.notna(id):
-                    df.at[index, "id"] = int(id)
-
-            # Получение популярности предмета
-            if item_page is not None:
-                # Если id был получен, то используем уже полученную страницу
-                volume = get_item_volume(item_page=item_page)
-            else:
-                # Если id был найден в базе, кидаем запрос
-                volume = get_item_volume(row["item_href"])
-            df.at[index, "volume"] = int(volume)
-
-            if id is not None:
-                # Получение цен предмета
-                price_buy, price_sell = get_item_prices(id)
-
-                df.at[index, "price_buy"] = float(price_buy)
-                df.at[index, "price_sell"] = float(price_sell)
-
-                methods = {
-                    "STM2STM": STM2STM,
-                    "CSM2STM": CSM2STM,
-                    "STM2CSM": STM2CSM,
-                }
-
-                # Отсеиваем предметы по популярности
-                if int(volume) >= 25:
-                    message_sending(
-                        df.at[index, "item_name"],
-                        volume,
-                        price_buy,
-                        price_sell,
-                        df.at[index, "item_href"],
-                        methods,
-                    )
-
-                df = df.astype({"id": "Int64", "volume": "Int64"}, errors="ignore")
-
-                df.to_csv("data/updated_items.csv", index=False, encoding="utf-8")
-
-            item_number += 1
+    if checkpoint is not None and not stopped:
+        checkpoint.finish()
 
 
 if __name__ == "__main__":
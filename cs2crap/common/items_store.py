@@ -0,0 +1,242 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+import pandas as pd
+
+from cs2crap.common.scan_journal import COLUMNS, to_json_value
+
+
+# ==================================================================================================================================
+# |                                                        ITEMS STORE DATA                                                        |
+# ==================================================================================================================================
+
+ITEMS_STORE_FILE = "data/items_database.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_name TEXT PRIMARY KEY,
+    id INTEGER,
+    price_buy REAL,
+    price_sell REAL,
+    volume INTEGER,
+    item_href TEXT,
+    image_src TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS items_id ON items (id);
+CREATE INDEX IF NOT EXISTS items_price_sell ON items (price_sell);
+"""
+
+# Обновляются только непустые значения, как в upsert_items
+UPSERT_QUERY = """
+INSERT INTO items (item_name, id, price_buy, price_sell, volume, item_href, image_src, updated_at)
+VALUES (:item_name, :id, :price_buy, :price_sell, :volume, :item_href, :image_src, :updated_at)
+ON CONFLICT (item_name) DO UPDATE SET
+    id = COALESCE(excluded.id, items.id),
+    price_buy = COALESCE(excluded.price_buy, items.price_buy),
+    price_sell = COALESCE(excluded.price_sell, items.price_sell),
+    volume = COALESCE(excluded.volume, items.volume),
+    item_href = COALESCE(excluded.item_href, items.item_href),
+    image_src = COALESCE(excluded.image_src, items.image_src),
+    updated_at = excluded.updated_at
+"""
+
+
+# ==================================================================================================================================
+# |                                                           ITEMS STORE                                                          |
+# ==================================================================================================================================
+
+
+class ItemsStore:
+    """
+    База предметов на SQLite (режим WAL) вместо data/items_database.csv.
+    Поддерживает построчные upsert из сканера и выборки по диапазону цен по индексу.
+    """
+
+    def __init__(self, filename: str = ITEMS_STORE_FILE):
+        self.filename = filename
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _to_row(self, record: dict) -> dict:
+        row = {column: to_json_value(record.get(column)) for column in COLUMNS}
+        row["item_name"] = str(row["item_name"]).replace("&amp;", "&")
+        row["updated_at"] = time.time()
+        return row
+
+    def upsert(self, record: dict) -> None:
+        """
+        Добавляет или обновляет один предмет (пустые значения не затирают сохранённые).
+
+        Parameters:
+            - record (dict): Значения столбцов предмета (обязательно item_name).
+        """
+
+        with self._lock, self._connection:
+            self._connection.execute(UPSERT_QUERY, self._to_row(record))
+
+    def upsert_dataframe(self, df: pd.DataFrame) -> int:
+        """
+        Добавляет или обновляет пачку предметов одной транзакцией.
+
+        Parameters:
+            - df (pd.DataFrame): Данные предметов.
+
+        Returns:
+            - int: Количество обработанных строк.
+        """
+
+        rows = [self._to_row(record) for record in df.to_dict("records")]
+
+        with self._lock, self._connection:
+            self._connection.executemany(UPSERT_QUERY, rows)
+
+        return len(rows)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def count(self) -> int:
+        """Количество предметов в базе."""
+
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def _query(self, where: str = "", params: tuple = ()) -> pd.DataFrame:
+        query = f"SELECT {', '.join(COLUMNS)} FROM items {where}"
+
+        with self._lock:
+            df = pd.read_sql_query(query, self._connection, params=params)
+
+        return df.astype({"id": "Int64", "volume": "Int64"}, errors="ignore")
+
+    def filter_items(
+        self,
+        price_range: Optional[tuple] = (0, float("inf")),
+        souvenirs: bool = False,
+        graffiti: bool = False,
+        stickers: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Аналог utils.filter_items: выборка по диапазону price_sell с использованием индекса.
+
+        Parameters:
+            - price_range (tuple, optional): Диапазон цен. None - предметы без цен.
+            - souvenirs (bool, optional): Флаг для исключения сувенирных товаров. По умолчанию False.
+            - graffiti (bool, optional): Флаг для исключения граффити. По умолчанию False.
+            - stickers (bool, optional): Флаг для исключения стикеров. По умолчанию False.
+
+        Returns:
+            - pd.DataFrame: Отфильтрованные данные, отсортированные по price_sell.
+        """
+
+        conditions = []
+        params = []
+
+        if price_range is None:
+            conditions.append("price_sell IS NULL AND price_buy IS NULL")
+        else:
+            conditions.append("price_sell BETWEEN ? AND ?")
+            params.extend(
+                [
+                    max(float(price_range[0]), -1e18),
+                    min(float(price_range[1]), 1e18),
+                ]
+            )
+
+        # LIKE в SQLite не учитывает регистр латиницы, как str.contains(case=False)
+        for enabled, word in (
+            (souvenirs, "Souvenir"),
+            (graffiti, "Graffiti"),
+            (stickers, "Sticker"),
+        ):
+            if not enabled:
+                conditions.append(f"item_name NOT LIKE '%{word}%'")
+
+        return self._query(
+            f"WHERE {' AND '.join(conditions)} ORDER BY price_sell", tuple(params)
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Вся база предметов в виде DataFrame."""
+
+        return self._query()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def import_csv(self, filename: str) -> int:
+        """
+        Загружает предметы из CSV (например, data/items_database.csv).
+
+        Returns:
+            - int: Количество загруженных строк.
+        """
+
+        return self.upsert_dataframe(pd.read_csv(filename, encoding="utf-8"))
+
+    def export_csv(self, filename: str) -> None:
+        """Выгружает базу в CSV в формате items_database.csv."""
+
+        self.to_dataframe().to_csv(filename, index=False, encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+# ==================================================================================================================================
+
+
+_items_store = None
+_items_store_lock = threading.Lock()
+
+
+def get_items_store(
+    filename: str = ITEMS_STORE_FILE,
+    import_from: Optional[str] = "data/items_database.csv",
+) -> ItemsStore:
+    """
+    Возвращает общую для процесса базу предметов. При первом открытии пустой базы
+    подтягивает данные из CSV, если он есть.
+
+    Parameters:
+        - filename (str): Путь к файлу SQLite.
+        - import_from (str, optional): CSV для первичного заполнения.
+
+    Returns:
+        - ItemsStore: База предметов.
+    """
+
+    global _items_store
+
+    with _items_store_lock:
+        if _items_store is None:
+            _items_store = ItemsStore(filename)
+
+            if (
+                import_from is not None
+                and _items_store.count() == 0
+                and os.path.isfile(import_from)
+            ):
+                _items_store.import_csv(import_from)
+
+    return _items_store
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_store = ItemsStore("data/test_items.sqlite3")
+    test_store.upsert(
+        {"item_name": "Revolution Case", "price_buy": 80.5, "price_sell": 70.1}
+    )
+    test_store.upsert({"item_name": "Revolution Case", "volume": 1500})
+
+    print(test_store.filter_items((50, 100)))
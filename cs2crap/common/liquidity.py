@@ -0,0 +1,195 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+from cs2crap.common.price_history import PriceHistory
+
+
+# ==================================================================================================================================
+# |                                                         LIQUIDITY DATA                                                         |
+# ==================================================================================================================================
+
+LIQUIDITY_WINDOWS = {  # Окна ликвидности в секундах
+    "1h": 60 * 60,
+    "24h": 24 * 60 * 60,
+    "7d": 7 * 24 * 60 * 60,
+    "30d": 30 * 24 * 60 * 60,
+}
+
+
+# ==================================================================================================================================
+# |                                                           LIQUIDITY                                                            |
+# ==================================================================================================================================
+
+
+def weighted_medians(
+    groups: np.ndarray, prices: np.ndarray, weights: np.ndarray, groups_count: int
+) -> np.ndarray:
+    """
+    Медиана цены продажи в каждой группе: цена точки истории учитывается столько раз, сколько было продаж.
+
+    Parameters:
+        - groups (np.ndarray): Номер группы (предмета) каждой точки, от 0 до groups_count - 1.
+        - prices (np.ndarray): Цены точек.
+        - weights (np.ndarray): Количество продаж в точках.
+        - groups_count (int): Количество групп.
+
+    Returns:
+        - np.ndarray: Медианы по группам (NaN, если продаж в группе нет).
+    """
+
+    medians = np.full(groups_count, np.nan)
+
+    sold = weights > 0
+    groups, prices, weights = groups[sold], prices[sold], weights[sold]
+
+    if len(groups) == 0:
+        return medians
+
+    order = np.lexsort((prices, groups))
+    groups, prices, weights = groups[order], prices[order], weights[order]
+
+    totals = np.bincount(groups, weights=weights, minlength=groups_count)
+    before_group = np.cumsum(totals) - totals
+    within_group = np.cumsum(weights) - before_group[groups]
+
+    # Первая точка группы, на которой набирается половина продаж
+    reached = np.flatnonzero(within_group >= totals[groups] / 2)
+    found_groups, first = np.unique(groups[reached], return_index=True)
+    medians[found_groups] = prices[reached[first]]
+
+    return medians
+
+
+# ==================================================================================================================================
+
+
+def liquidity_arrays(
+    groups: np.ndarray,
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    counts: np.ndarray,
+    groups_count: int,
+    now: Optional[float] = None,
+    windows: dict = LIQUIDITY_WINDOWS,
+) -> dict[str, np.ndarray]:
+    """
+    Считает ликвидность сразу для всех групп (предметов) по всем окнам.
+
+    Parameters:
+        - groups (np.ndarray): Номер группы (предмета) каждой точки истории.
+        - timestamps (np.ndarray): Unix-время точек.
+        - prices (np.ndarray): Цены точек.
+        - counts (np.ndarray): Количество продаж в точках.
+        - groups_count (int): Количество групп.
+        - now (float, optional): Момент, от которого отсчитываются окна (по умолчанию time.time()).
+        - windows (dict): Окна {название: секунды}.
+
+    Returns:
+        - dict[str, np.ndarray]: sales_<окно> - продаж, turnover_<окно> - оборот (цена * продажи),
+            median_<окно> - медиана цены продажи; по массиву длины groups_count на каждый показатель.
+    """
+
+    if now is None:
+        now = time.time()
+
+    groups = np.asarray(groups, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+    turnover = prices * counts
+
+    result = {}
+
+    for name, seconds in windows.items():
+        in_window = (timestamps >= now - seconds) & (timestamps <= now)
+
+        window_groups = groups[in_window]
+        window_counts = counts[in_window]
+
+        result[f"sales_{name}"] = np.bincount(
+            window_groups, weights=window_counts, minlength=groups_count
+        ).astype(np.int64)
+        result[f"turnover_{name}"] = np.bincount(
+            window_groups, weights=turnover[in_window], minlength=groups_count
+        )
+        result[f"median_{name}"] = weighted_medians(
+            window_groups, prices[in_window], window_counts, groups_count
+        )
+
+    return result
+
+
+# ==================================================================================================================================
+
+
+def item_liquidity(
+    history: PriceHistory,
+    now: Optional[float] = None,
+    windows: dict = LIQUIDITY_WINDOWS,
+) -> dict:
+    """
+    Ликвидность одного предмета по его истории продаж.
+
+    Parameters:
+        - history (PriceHistory): История продаж (см. extract_price_history).
+        - now (float, optional): Момент, от которого отсчитываются окна (по умолчанию time.time()).
+        - windows (dict): Окна {название: секунды}.
+
+    Returns:
+        - dict: sales_<окно>, turnover_<окно>, median_<окно> (см. liquidity_arrays).
+    """
+
+    groups = np.zeros(len(history), dtype=np.int64)
+    result = liquidity_arrays(
+        groups, history.timestamps, history.prices, history.counts, 1, now, windows
+    )
+
+    return {name: values[0].item() for name, values in result.items()}
+
+
+def category_liquidity(
+    records: np.ndarray,
+    item_names: list[str],
+    now: Optional[float] = None,
+    windows: dict = LIQUIDITY_WINDOWS,
+) -> pd.DataFrame:
+    """
+    Ликвидность всех предметов категории за один проход по её истории.
+
+    Parameters:
+        - records (np.ndarray): Записи истории с полями item_id, timestamp, price, sell_count
+            (например, HistoryStore.merged()).
+        - item_names (list[str]): Названия предметов по item_id.
+        - now (float, optional): Момент, от которого отсчитываются окна (по умолчанию time.time()).
+        - windows (dict): Окна {название: секунды}.
+
+    Returns:
+        - pd.DataFrame: item_name и показатели sales_<окно>, turnover_<окно>, median_<окно>.
+    """
+
+    result = liquidity_arrays(
+        records["item_id"],
+        records["timestamp"],
+        records["price"],
+        records["sell_count"],
+        len(item_names),
+        now,
+        windows,
+    )
+
+    return pd.DataFrame({"item_name": item_names, **result})
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_now = 1_700_000_000
+    test_history = PriceHistory(
+        np.array(
+            [test_now - 40 * 86400, test_now - 3 * 86400, test_now - 7200, test_now - 1800]
+        ),
+        np.array([90.0, 100.0, 110.0, 120.0]),
+        np.array([5, 4, 3, 1]),
+    )
+
+    print(item_liquidity(test_history, now=test_now))
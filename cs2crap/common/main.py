@@ -1,5 +1,5 @@
 import os
-import asyncio
+from typing import Optional
 
 from cs2crap.common.utils import (
     csv_up_nonprices,
@@ -9,12 +9,31 @@ from cs2crap.common.utils import (
     filter_items,
     update_items_database,
 )
-from cs2crap.common.data_manage import get_items_list, double_hook, read_and_fix_csv
+from cs2crap.common.data_manage import (
+    get_items_list,
+    get_items_overview,
+    get_price_range_overview,
+    double_hook,
+    read_and_fix_csv,
+)
+from cs2crap.common.price_comparison import prescreen_items
+from cs2crap.common.scan_journal import ScanJournal, journal_filename, remove_journal
+from cs2crap.common.scan_checkpoint import (
+    ScanCheckpoint,
+    checkpoint_name,
+    remove_checkpoint,
+)
+from cs2crap.common.items_store import get_items_store
+from cs2crap.common.price_delta import DeltaRechecker
 from cs2crap.csgomarket.data_loader import get_csgomarket_items_prices
+from cs2crap.csgomarket.price_refresher import get_price_refresher
 from cs2crap.telegram_bot.telegram_notifier import send_message
 
 
-stop_cscrap_event = asyncio.Event()
+PRESCREEN_ITEMS_COUNT = 21100  # Сколько предметов выдачи просматривать при предварительном отсеве
+PRESCREEN_PRICE_MARGIN = 0.2  # Выдача для отсева берётся и на эту долю ниже диапазона: подешевевшие предметы тоже отсеиваются
+
+RUN_CHECKPOINTS = ("update_list", "update_scan", "cscrap")  # Этапы, контрольные точки которых есть у запуска
 
 
 # ==================================================================================================================================
@@ -27,6 +46,11 @@ def update_database(
     items_count: int = 21100,
     sort_column: str = "popular",
     sort_dir: str = "desc",
+    workers: Optional[int] = 1,
+    storage: str = "csv",
+    stop_cscrap_event=None,
+    resume: bool = False,
+    run_id: Optional[str] = None,
 ) -> None:
     """
     Создает базу данных предметов, если она не существует, и заполняет ее начальными данными:
@@ -39,6 +63,12 @@ def update_database(
         - items_count (int): Количество предметов для подгрузки (значение должно быть кратно 100).
         - sort_column (str): Порядок сортировки подгружаемых предметов (popular / price)
         - sort_dir (str): Способ сортировки (desc - убывание, asc - возрастание)
+        - workers (int, optional): Количество потоков сканирования (по умолчанию 1 - последовательно, None - по одному на каждый доступный прокси)
+        - storage (str): Хранилище базы предметов: "csv" (data/items_database.csv) или "sqlite" (data/items_database.sqlite3)
+        - stop_cscrap_event (ScanControl, optional): Остановка, пауза и продолжение обновления с помощью телеграм-бота.
+        - resume (bool): Продолжить прерванное обновление с теми же параметрами с последней контрольной точки.
+        - run_id (str, optional): Идентификатор запуска (см. new_run_id): у каждого запуска свои контрольные точки
+            и журнал, поэтому новый запуск не затирает прерванный или стоящий на паузе.
 
     Для полного сбора предметов рекомендуется оставить значения по умолчанию.
 
@@ -49,25 +79,59 @@ def update_database(
     if not os.path.isfile("data/new_items.csv"):
         create_empty_items_csv("data/new_items.csv")
 
-    send_message("📥 *Получение данных: 0%* 📥")
-    color_print("create", "create", "Получаем предметы", True)
+    params = {
+        "start_from": start_from,
+        "items_count": items_count,
+        "sort_column": sort_column,
+        "sort_dir": sort_dir,
+        "storage": storage,
+    }
+    list_checkpoint = ScanCheckpoint(
+        checkpoint_name("update_list", run_id), params, resume
+    )
+    scan_checkpoint = ScanCheckpoint(
+        checkpoint_name("update_scan", run_id), params, resume
+    )
+
+    if not list_checkpoint.finished:
+        send_message("📥 *Получение данных: 0%* 📥")
+        color_print("create", "create", "Получаем предметы", True)
+
+        get_items_list(
+            start_from,
+            items_count,
+            sort_column,
+            sort_dir,
+            stop_cscrap_event,
+            list_checkpoint,
+        )
 
-    get_items_list(start_from, items_count, sort_column, sort_dir)
+    if stop_cscrap_event is not None and stop_cscrap_event.is_set():
+        return
 
     send_message("🛠️ *Обновляем базу данных* 🛠️")
     color_print("create", "create", "Обновляем базу данных", True)
 
-    update_items_database("data/new_items.csv", "data/items_database.csv")
+    if storage == "sqlite":
+        items_store = get_items_store()
+        items_store.upsert_dataframe(read_and_fix_csv("data/new_items.csv"))
 
-    csv_up_nonprices("data/items_database.csv")
+        df = items_store.filter_items(
+            None, souvenirs=True, graffiti=True, stickers=True
+        )
+    else:
+        items_store = None
+        update_items_database("data/new_items.csv", "data/items_database.csv")
 
-    df = filter_items(
-        read_and_fix_csv("data/items_database.csv"),
-        None,
-        souvenirs=True,
-        graffiti=True,
-        stickers=True,
-    )
+        csv_up_nonprices("data/items_database.csv")
+
+        df = filter_items(
+            read_and_fix_csv("data/items_database.csv"),
+            None,
+            souvenirs=True,
+            graffiti=True,
+            stickers=True,
+        )
 
     df["item_name"] = df["item_name"].str.replace("&amp;", "&")
 
@@ -81,9 +145,53 @@ def update_database(
     send_message(f"🆕 *Найдено: {len(df)} новых предметов* 🆕")
     send_message(f"📋 *Получение новых данных* 📋")
 
-    double_hook(df, False, False, False, len(df), stop_cscrap_event)
+    journal = ScanJournal(journal_filename(run_id), reset=not scan_checkpoint.done)
+
+    try:
+        double_hook(
+            df,
+            False,
+            False,
+            False,
+            len(df),
+            stop_cscrap_event,
+            workers,
+            items_store,
+            scan_checkpoint,
+            journal,
+        )
+    finally:
+        journal.close()
+
+    if items_store is None:
+        update_items_database(journal.filename, "data/items_database.csv")
+
+    # Контрольные точки и журнал нужны только прерванному обновлению
+    if scan_checkpoint.finished:
+        list_checkpoint.clear()
+        scan_checkpoint.clear()
+        remove_journal(run_id)
+
+
+# ==================================================================================================================================
 
-    update_items_database("data/updated_items.csv", "data/items_database.csv")
+
+def discard_run(run_id: Optional[str]) -> None:
+    """
+    Удаляет контрольные точки и журнал запуска, отменённого пользователем (/stop, /cancel):
+    такой запуск не продолжается командой /continue.
+
+    Parameters:
+        - run_id (str, optional): Идентификатор запуска (None - общие контрольные точки этапов).
+
+    Returns:
+        None
+    """
+
+    for kind in RUN_CHECKPOINTS:
+        remove_checkpoint(checkpoint_name(kind, run_id))
+
+    remove_journal(run_id)
 
 
 # ==================================================================================================================================
@@ -94,7 +202,12 @@ def cscrap(
     STM2STM=True,
     CSM2STM=False,
     STM2CSM=False,
-    stop_cscrap_event=asyncio.Event,
+    stop_cscrap_event=None,
+    workers: Optional[int] = 1,
+    prescreen: bool = False,
+    storage: str = "csv",
+    resume: bool = False,
+    run_id: Optional[str] = None,
 ) -> None:
     """
     Основная функция для скрапинга данных по предметам Counter Strike 2.
@@ -107,7 +220,14 @@ def cscrap(
             - CSM2STM (bool): Флаг для метода CSGO Market -> Steam.
             - STM2CSM (bool): Флаг для метода Steam -> CSGO Market.
 
-        - stop_cscrap_event (asyncio.Event): Событие для остановки скрапинга с помощью телеграм-бота.
+        - stop_cscrap_event (ScanControl, optional): Остановка, пауза и продолжение скрапинга с помощью телеграм-бота.
+        - workers (int, optional): Количество потоков сканирования (по умолчанию 1 - последовательно, None - по одному на каждый доступный прокси).
+        - prescreen (bool): Предварительно отсеять предметы по JSON-выдаче поиска Steam,
+            чтобы запросы гистограммы и страницы предмета уходили только на кандидатов.
+        - storage (str): Хранилище базы предметов: "csv" или "sqlite".
+        - resume (bool): Продолжить прерванный поиск с теми же параметрами с последнего обработанного предмета.
+        - run_id (str, optional): Идентификатор запуска (см. new_run_id): у каждого запуска своя контрольная точка
+            и журнал, поэтому новый поиск не затирает прерванный или стоящий на паузе.
 
     Returns:
         None
@@ -120,11 +240,63 @@ def cscrap(
 
     get_csgomarket_items_prices()
 
-    df = filter_items(
-        read_and_fix_csv("data/items_database.csv"),
-        (price_range[0], price_range[1]),
+    if storage == "sqlite":
+        items_store = get_items_store()
+        df = items_store.filter_items((price_range[0], price_range[1]))
+    else:
+        items_store = None
+        df = filter_items(
+            read_and_fix_csv("data/items_database.csv"),
+            (price_range[0], price_range[1]),
+        )
+
+    methods = {"STM2STM": STM2STM, "CSM2STM": CSM2STM, "STM2CSM": STM2CSM}
+
+    checkpoint = ScanCheckpoint(
+        checkpoint_name("cscrap", run_id),
+        {
+            "price_range": price_range,
+            "methods": methods,
+            "prescreen": prescreen,
+            "storage": storage,
+        },
+        resume,
     )
 
+    if prescreen and not df.empty:
+        if price_range[0] <= 0 and price_range[1] == float("inf"):
+            overview = get_items_overview(0, PRESCREEN_ITEMS_COUNT)
+        else:
+            # Только страницы выдачи в диапазоне цен, а не весь каталог
+            overview = get_price_range_overview(
+                price_range[0] * (1 - PRESCREEN_PRICE_MARGIN),
+                price_range[1],
+                PRESCREEN_ITEMS_COUNT,
+            )
+
+        if overview.empty:
+            color_print(
+                "warning",
+                "warning",
+                "Выдача поиска пуста: предварительный отсев пропущен.",
+                True,
+            )
+        else:
+            # Исключаются только предметы, отсеянные по выдаче; предметов вне выдачи отсев не касается
+            candidates = prescreen_items(overview, methods, price_range)
+            ruled_out = overview["item_name"][
+                ~overview["item_name"].isin(candidates["item_name"])
+            ]
+
+            df = df[~df["item_name"].isin(ruled_out)]
+
+            color_print(
+                "status",
+                "status",
+                f"После предварительного отсева осталось {len(df)} предметов.",
+                True,
+            )
+
     price_message = (
         f"all"
         if price_range[1] == float("inf")
@@ -138,9 +310,51 @@ def cscrap(
     )
     send_message(f"🔍 *Найдено предметов: {len(df)}* 🔍")
 
-    double_hook(df, STM2STM, CSM2STM, STM2CSM, len(df), stop_cscrap_event)
-
-    update_items_database("data/updated_items.csv", "data/items_database.csv")
+    # Цены CS:GO Market обновляются в фоне, сканирование их не ждёт.
+    # Предметы, цена которых на CS:GO Market изменилась, перепроверяются сразу, вне очереди.
+    price_refresher = get_price_refresher()
+    delta_rechecker = None
+
+    # Журнал общий для сканирования и перепроверок: в режиме CSV он же попадает в базу предметов
+    journal = ScanJournal(journal_filename(run_id), reset=not checkpoint.done)
+
+    if CSM2STM or STM2CSM:
+        delta_rechecker = DeltaRechecker(
+            df,
+            methods,
+            on_result=items_store.upsert if items_store is not None else journal.append,
+            control=stop_cscrap_event,
+        )
+        delta_rechecker.attach(price_refresher)
+        price_refresher.start()
+
+    try:
+        double_hook(
+            df,
+            STM2STM,
+            CSM2STM,
+            STM2CSM,
+            len(df),
+            stop_cscrap_event,
+            workers,
+            items_store,
+            checkpoint,
+            journal,
+            delta_rechecker.update_row if delta_rechecker is not None else None,
+        )
+    finally:
+        # Общий обновлятор цен останавливается, только когда он не нужен другим задачам поиска
+        if delta_rechecker is not None:
+            price_refresher.stop()
+            delta_rechecker.detach(price_refresher, wait=True)
+        journal.close()
+
+    if items_store is None:
+        update_items_database(journal.filename, "data/items_database.csv")
+
+    if checkpoint.finished:
+        checkpoint.clear()
+        remove_journal(run_id)
 
 
 # ==================================================================================================================================
@@ -165,11 +379,6 @@ ________________________________________________________________________________
 |                                                                                                       |
 |                                             ИСПРАВЛЕНИЯ:                                              |
 |                                                                                                       |
-|   FIXME: FutureWarning: The behavior of DataFrame concatenation with empty or all-NA entries is       |
-|   deprecated. In a future version, this will no longer exclude empty or all-NA columns when           |
-|   determining the result dtypes. To retain the old behavior, exclude the relevant entries before the  |
-|   concat operation. Предупреждение вызывает cs2crap.common.utils.update_items_database                |
-|                                                                                                       |
 |   FIXME: После обновления всех предметов срабатывает исключение:                                      |
 |   Failed to fetch updates - TelegramNetworkError: HTTP Client says - Request timeout error            |
 |   Sleep for 1.000000 seconds and try again... (tryings = 0, bot id = 6940558618)                      |
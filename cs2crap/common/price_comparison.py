@@ -2,6 +2,10 @@ import pandas as pd
 from typing import Optional
 
 from cs2crap.common.utils import color_print
+from cs2crap.csgomarket.price_book import get_price_book, normalize_name
+
+
+PROFIT_THRESHOLD = 0.2  # Минимальная разница цен (доля) для выгодной сделки
 
 # ==================================================================================================================================
 # |                                                          PRICE_COMPARISON                                                      |
@@ -37,7 +41,7 @@ def stm2stm_comparison(price_buy: float, price_sell: float) -> bool:
         \n\t(учитывая 13% комиссию с продажи - 7% выручка), в противном случае False.
     """
 
-    if (float(price_buy) - float(price_sell)) > 0.2 * float(price_buy):
+    if (float(price_buy) - float(price_sell)) > PROFIT_THRESHOLD * float(price_buy):
         return True
     else:
         return False
@@ -66,19 +70,18 @@ def csm2stm_comparison(
         Если предмет не найден или произошла ошибка, возвращает None.
     """
 
-    df = pd.read_csv("cs2crap/csgomarket/csgomarket_prices.csv")
+    csgo_market_item_price = get_price_book().get(item_hash_name)
 
-    try:
-        csgo_market_item_price = df.loc[
-            df["market_hash_name"] == item_hash_name, "price"
-        ].values[0]
+    if csgo_market_item_price is None:
+        return None
 
-        by_price_buy = (float(price_buy) - csgo_market_item_price) > 0.2 * float(
-            price_buy
-        )
-        by_price_sell = (float(price_sell) - csgo_market_item_price) > 0.2 * float(
-            price_sell
-        )
+    try:
+        by_price_buy = (
+            float(price_buy) - csgo_market_item_price
+        ) > PROFIT_THRESHOLD * float(price_buy)
+        by_price_sell = (
+            float(price_sell) - csgo_market_item_price
+        ) > PROFIT_THRESHOLD * float(price_sell)
 
         return int(csgo_market_item_price), by_price_buy, by_price_sell
 
@@ -110,22 +113,82 @@ def stm2csm_comparison(
         Если предмет не найден или произошла ошибка, возвращает None.
     """
 
-    df = pd.read_csv("cs2crap/csgomarket/csgomarket_prices.csv")
+    csgo_market_item_price = get_price_book().get(item_hash_name)
 
-    try:
-        csgo_market_item_price = df.loc[
-            df["market_hash_name"] == item_hash_name, "price"
-        ].values[0]
+    if csgo_market_item_price is None:
+        return None
 
-        by_price_buy = (float(csgo_market_item_price) - float(price_buy)) > 0.2 * float(
-            csgo_market_item_price
-        )
+    try:
+        by_price_buy = (
+            float(csgo_market_item_price) - float(price_buy)
+        ) > PROFIT_THRESHOLD * float(csgo_market_item_price)
         by_price_sell = (
             float(csgo_market_item_price) - float(price_sell)
-        ) > 0.2 * float(csgo_market_item_price)
+        ) > PROFIT_THRESHOLD * float(csgo_market_item_price)
 
         return float(csgo_market_item_price), by_price_buy, by_price_sell
 
     except Exception as e:
         color_print("fail", "fail", f"Ошибка сравнения цен маркетов: {e}", True)
         return None
+
+
+# ==================================================================================================================================
+
+
+def prescreen_items(
+    df: pd.DataFrame,
+    methods: dict,
+    price_range: Optional[tuple] = None,
+) -> pd.DataFrame:
+    """
+    Дешёвый отсев предметов по данным поисковой выдачи Steam (минимальный лот и количество лотов),
+    до запросов гистограммы и страницы предмета.
+
+    Отсеиваются только предметы, которые точно не пройдут сравнение цен:
+        - нет ни одного лота на продажу (цены предмета не получить);
+        - минимальный лот ниже нижней границы диапазона (price_sell не может быть выше price_buy);
+        - для CS:GO Market -> Steam: цена на CS:GO Market не ниже price_buy * (1 - PROFIT_THRESHOLD);
+        - для методов с CS:GO Market: предмета нет на CS:GO Market.
+
+    Предмет остаётся, если его может пропустить хотя бы один включенный метод.
+    Правила по цене не применяются к предметам без цены в выдаче (sell_price - NaN).
+
+    Parameters:
+        - df (pd.DataFrame): Выдача get_items_overview() (item_name, sell_price, sell_listings).
+        - methods (dict): Включенные методы торговли {"STM2STM": bool, "CSM2STM": bool, "STM2CSM": bool}.
+        - price_range (tuple, optional): Диапазон цен поиска.
+
+    Returns:
+        - pd.DataFrame: Предметы-кандидаты.
+    """
+
+    price_buy = df["sell_price"]
+    known_price = price_buy.notna()
+
+    ruled_out = df["sell_listings"] <= 0
+
+    if price_range is not None:
+        ruled_out |= known_price & (price_buy < price_range[0])
+
+    csgomarket_price = pd.Series(float("nan"), index=df.index)
+
+    if methods["CSM2STM"] or methods["STM2CSM"]:
+        csgomarket_prices = get_price_book().as_series()
+        csgomarket_price = (
+            df["item_name"].map(normalize_name).map(csgomarket_prices).astype(float)
+        )
+
+    candidates = pd.Series(False, index=df.index)
+
+    if methods["STM2STM"]:
+        candidates |= ~ruled_out
+    if methods["CSM2STM"]:
+        candidates |= ~ruled_out & ~(
+            csgomarket_price.isna()
+            | (known_price & (csgomarket_price >= (1 - PROFIT_THRESHOLD) * price_buy))
+        )
+    if methods["STM2CSM"]:
+        candidates |= ~ruled_out & csgomarket_price.notna()
+
+    return df[candidates]
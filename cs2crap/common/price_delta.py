@@ -0,0 +1,250 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+import pandas as pd
+
+from cs2crap.common.utils import color_print
+from cs2crap.common.scan_control import should_stop
+from cs2crap.common.data_manage import MIN_VOLUME, get_item_prices, scan_item
+from cs2crap.common.batch_evaluation import evaluate_opportunities
+from cs2crap.telegram_bot.telegram_notifier import message_sending
+from cs2crap.csgomarket.price_book import normalize_name
+from cs2crap.csgomarket.price_refresher import PriceRefresher, changed_items
+
+
+# ==================================================================================================================================
+# |                                                        PRICE DELTA DATA                                                        |
+# ==================================================================================================================================
+
+RECHECK_WORKERS = 2  # Потоков перепроверки цен Steam
+MAX_RECHECKS_PER_REFRESH = 200  # Сколько предметов максимум перепроверять после одного обновления цен
+
+
+# ==================================================================================================================================
+# |                                                          PRICE DELTA                                                           |
+# ==================================================================================================================================
+
+
+def select_rechecks(
+    diff: dict, methods: dict, df: Optional[pd.DataFrame] = None
+) -> list[str]:
+    """
+    Выбирает предметы, цены Steam которых стоит перепроверить после изменения цен CS:GO Market.
+        - CS:GO Market -> Steam: подешевевшие и новые на CS:GO Market предметы;
+        - Steam -> CS:GO Market: подорожавшие и новые на CS:GO Market предметы.
+    Пропавшие с CS:GO Market предметы перепроверять незачем.
+
+    Если передана база предметов, затронутые изменением предметы сначала оцениваются по уже известным
+    ценам Steam (см. evaluate_opportunities): выгодные по новым ценам CS:GO Market идут первыми.
+
+    Parameters:
+        - diff (dict): Изменения цен (см. price_refresher.diff_prices).
+        - methods (dict): Включенные методы торговли {"STM2STM": bool, "CSM2STM": bool, "STM2CSM": bool}.
+        - df (pd.DataFrame, optional): База предметов (item_name, price_buy, price_sell, volume, item_href).
+
+    Returns:
+        - list[str]: Названия предметов: выгодные по известным ценам Steam, затем самые сильные изменения цены.
+    """
+
+    moves = {}
+
+    if methods.get("CSM2STM"):
+        for name, (old_price, price) in diff["down"].items():
+            moves[name] = (old_price - price) / old_price
+    if methods.get("STM2CSM"):
+        for name, (old_price, price) in diff["up"].items():
+            moves[name] = (price - old_price) / old_price
+    if methods.get("CSM2STM") or methods.get("STM2CSM"):
+        for name in diff["added"]:
+            moves.setdefault(name, float("inf"))
+
+    names = sorted(moves, key=moves.get, reverse=True)
+
+    if df is None or not names:
+        return names
+
+    changed = df[df["item_name"].map(normalize_name).isin(changed_items(diff))]
+    opportunities = evaluate_opportunities(
+        changed,
+        {
+            "STM2STM": False,
+            "CSM2STM": methods.get("CSM2STM", False),
+            "STM2CSM": methods.get("STM2CSM", False),
+        },
+    )
+
+    # Лучшие по марже первыми, затем остальные по силе изменения цены
+    first = [
+        name
+        for name in dict.fromkeys(opportunities["item_name"].map(normalize_name))
+        if name in moves
+    ]
+    first_set = set(first)
+
+    return first + [name for name in names if name not in first_set]
+
+
+# ==================================================================================================================================
+
+
+class DeltaRechecker:
+    """
+    Перепроверяет цены Steam только у предметов, цена которых на CS:GO Market изменилась.
+    Подписывается на PriceRefresher, поэтому окно для арбитража ловится через секунды после обновления цен,
+    а не на следующем полном проходе.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        methods: dict,
+        workers: int = RECHECK_WORKERS,
+        on_result: Optional[Callable[[dict], None]] = None,
+        control=None,
+    ):
+        """
+        Parameters:
+            - df (pd.DataFrame): Предметы, которые можно перепроверять (item_name, id, volume, item_href).
+            - methods (dict): Включенные методы торговли {"STM2STM": bool, "CSM2STM": bool, "STM2CSM": bool}.
+            - workers (int): Количество потоков перепроверки.
+            - on_result (Callable[[dict], None], optional): Получает новые значения столбцов перепроверенного предмета.
+            - control (ScanControl | threading.Event, optional): Управление сканированием, которому принадлежит
+                перепроверка: на паузе запросы к Steam не отправляются, после остановки перепроверки пропускаются.
+        """
+
+        self.methods = methods
+        self.on_result = on_result
+        self.control = control
+
+        # Строки обновляются результатами сканирования (см. update_row), поэтому перепроверка берёт текущие значения
+        self._rows = {
+            normalize_name(row["item_name"]): row for row in df.to_dict("records")
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="cs2crap-recheck"
+        )
+
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._stopped = False
+
+        self.rechecked = 0
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def on_prices_changed(self, diff: dict) -> None:
+        """Обработчик изменений цен CS:GO Market: ставит затронутые предметы в очередь перепроверки."""
+
+        # Затронутые предметы оцениваются по текущим значениям строк, а не по снимку на старте сканирования
+        with self._lock:
+            rows = [self._rows[name] for name in changed_items(diff) if name in self._rows]
+
+        names = [
+            name
+            for name in select_rechecks(
+                diff, self.methods, pd.DataFrame(rows) if rows else None
+            )
+            if name in self._rows
+        ][:MAX_RECHECKS_PER_REFRESH]
+
+        with self._lock:
+            if self._stopped:
+                return
+
+            names = [name for name in names if name not in self._pending]
+            self._pending.update(names)
+
+            for name in names:
+                self._executor.submit(self._recheck, name)
+
+        if names:
+            color_print(
+                "log",
+                "log",
+                f"Перепроверяем цены Steam: {len(names)} предметов.",
+                True,
+            )
+
+    def update_row(self, record: dict) -> None:
+        """
+        Обновляет известные значения предмета (id, объём, цены) по результату сканирования или перепроверки.
+
+        Parameters:
+            - record (dict): Значения столбцов предмета (с item_name); неизвестные предметы пропускаются.
+        """
+
+        name = normalize_name(record["item_name"])
+
+        with self._lock:
+            row = self._rows.get(name)
+            if row is not None:
+                self._rows[name] = {**row, **record}
+
+    def _recheck(self, name: str) -> None:
+        try:
+            if self._stopped:
+                return
+
+            # Задача на паузе не отправляет запросы к Steam: ждём продолжения или остановки
+            if should_stop(self.control) or self._stopped:
+                return
+
+            with self._lock:
+                row = self._rows[name]
+
+            if pd.isna(row.get("id")) or pd.isna(row.get("volume")):
+                # О предмете ничего не известно: сканируем полностью
+                result = scan_item(row, self.methods)
+            else:
+                price_buy, price_sell = get_item_prices(int(row["id"]))
+                result = {
+                    "item_name": row["item_name"],
+                    "price_buy": float(price_buy),
+                    "price_sell": float(price_sell),
+                }
+
+                if int(row["volume"]) >= MIN_VOLUME:
+                    message_sending(
+                        row["item_name"],
+                        int(row["volume"]),
+                        price_buy,
+                        price_sell,
+                        row["item_href"],
+                        self.methods,
+                    )
+
+            self.rechecked += 1
+            self.update_row(result)
+
+            if self.on_result is not None:
+                self.on_result(result)
+
+        except Exception as e:
+            color_print("fail", "fail", f"Ошибка перепроверки {name}: {e}", True)
+
+        finally:
+            with self._lock:
+                self._pending.discard(name)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def attach(self, price_refresher: PriceRefresher) -> None:
+        """Подписывается на изменения цен CS:GO Market."""
+
+        price_refresher.add_change_listener(self.on_prices_changed)
+
+    def detach(self, price_refresher: PriceRefresher, wait: bool = False) -> None:
+        """
+        Отписывается от изменений цен и отменяет ещё не начатые перепроверки.
+
+        Parameters:
+            - price_refresher (PriceRefresher): Обновлятор цен, на который подписан перепроверщик.
+            - wait (bool): Дождаться уже начатых перепроверок (например, перед закрытием журнала из on_result).
+        """
+
+        price_refresher.remove_change_listener(self.on_prices_changed)
+
+        with self._lock:
+            self._stopped = True
+
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,158 @@
+import json
+import calendar
+import numpy as np
+from typing import Iterable, NamedTuple
+
+
+# ==================================================================================================================================
+# |                                                      PRICE HISTORY DATA                                                        |
+# ==================================================================================================================================
+
+LINE1_MARKER = "var line1="  # История продаж на странице предмета: var line1=[["Dec 05 2023 01: +0",12.5,"3"],...];
+
+MONTHS = {
+    month: number
+    for number, month in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+        start=1,
+    )
+}
+
+_decoder = json.JSONDecoder()
+
+
+# ==================================================================================================================================
+# |                                                         PRICE HISTORY                                                          |
+# ==================================================================================================================================
+
+
+class PriceHistory(NamedTuple):
+    """История продаж предмета в виде массивов одинаковой длины, по возрастанию времени."""
+
+    timestamps: np.ndarray  # Unix-время начала часа (int64, UTC)
+    prices: np.ndarray  # Средняя цена продажи (float64)
+    counts: np.ndarray  # Количество продаж (int64)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+EMPTY_HISTORY = PriceHistory(
+    np.empty(0, dtype=np.int64),
+    np.empty(0, dtype=np.float64),
+    np.empty(0, dtype=np.int64),
+)
+
+
+# ==================================================================================================================================
+
+
+def steam_timestamps(times: Iterable[str]) -> np.ndarray:
+    """
+    Переводит время точек истории Steam ("Dec 05 2023 01: +0", UTC) в Unix-время.
+    Начало дня считается один раз на дату, час прибавляется арифметикой.
+
+    Parameters:
+        - times (Iterable[str]): Время точек истории.
+
+    Returns:
+        - np.ndarray: Unix-время начала часа (int64).
+    """
+
+    days: dict[str, int] = {}
+
+    def day_start(day: str) -> int:
+        timestamp = days.get(day)
+        if timestamp is None:
+            timestamp = days[day] = calendar.timegm(
+                (int(day[7:11]), MONTHS[day[:3]], int(day[4:6]), 0, 0, 0)
+            )
+        return timestamp
+
+    return np.fromiter(
+        (day_start(point[:11]) + int(point[12:14]) * 3600 for point in times),
+        dtype=np.int64,
+    )
+
+
+# ==================================================================================================================================
+
+
+def extract_price_history(page: str) -> PriceHistory:
+    """
+    Находит историю продаж (var line1=[...]) на странице предмета и разбирает её как JSON сразу в массивы,
+    без разбора HTML всей страницы.
+
+    Parameters:
+        - page (str): HTML страницы предмета на торговой площадке Steam.
+
+    Returns:
+        - PriceHistory: История продаж (пустая, если её нет на странице).
+    """
+
+    start = page.find(LINE1_MARKER) if page else -1
+
+    if start == -1:
+        return EMPTY_HISTORY
+
+    try:
+        points, _ = _decoder.raw_decode(page, start + len(LINE1_MARKER))
+    except ValueError:
+        return EMPTY_HISTORY
+
+    if not points:
+        return EMPTY_HISTORY
+
+    times, prices, counts = zip(*points)
+
+    return PriceHistory(
+        steam_timestamps(times),
+        np.asarray(prices, dtype=np.float64),
+        np.fromiter(map(int, counts), dtype=np.int64, count=len(counts)),
+    )
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    import re
+    import time
+    from bs4 import BeautifulSoup
+    from datetime import datetime, timedelta
+
+    # Страница предмета: ~3 года часовой и дневной истории среди разметки и скриптов
+    test_started = datetime(2021, 1, 1)
+    test_points = [
+        [
+            (test_started + timedelta(hours=i)).strftime("%b %d %Y %H: +0"),
+            round(100 + i % 97 * 0.37, 3),
+            str(i % 40 + 1),
+        ]
+        for i in range(3000)
+    ]
+    test_page = (
+        "<html><head>"
+        + "<script>var g_rgAppContextData = {};</script>" * 40
+        + "</head><body>"
+        + '<div class="market_listing_row">Лот</div>' * 3000
+        + "<script>$J(function() { var line1="
+        + json.dumps(test_points, separators=(",", ":"))
+        + "; g_timePriceHistoryEarliest = new Date(); });</script>"
+        + "</body></html>"
+    )
+
+    def parse_soup():
+        # Прежний путь get_item_volume: весь HTML через html.parser, затем regex по последнему <script>
+        script = BeautifulSoup(test_page, "html.parser").find_all("script")[-1].string
+        return re.findall(r"Dec 31 2021.*?\"(\d+)", script, re.DOTALL)
+
+    def benchmark(name: str, parse, repeat: int = 20) -> None:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parse()
+        elapsed = (time.perf_counter() - started) / repeat
+        print(f"{name}: {elapsed * 1000:.2f} мс на страницу")
+
+    print(f"Размер страницы: {len(test_page) / 1024:.0f} КБ, точек: {len(test_points)}")
+    benchmark("BeautifulSoup + regex", parse_soup)
+    benchmark("extract_price_history", lambda: extract_price_history(test_page))
@@ -0,0 +1,393 @@
+import os
+import time
+import random
+import threading
+from typing import Callable, Optional
+from email.utils import parsedate_to_datetime
+
+from cs2crap.common.utils import color_print
+
+
+# ==================================================================================================================================
+# |                                                       PROXY MANAGER DATA                                                       |
+# ==================================================================================================================================
+
+PROXIES_FILE = "data/proxies.txt"
+
+EWMA_ALPHA = 0.3  # Вес нового замера в скользящих средних
+DEFAULT_LATENCY = 1.0  # Стартовая оценка задержки прокси в секундах
+
+BREAKER_CONSECUTIVE_FAILURES = 3  # Подряд идущих ошибок для размыкания
+BREAKER_ERROR_RATE = 0.6  # Доля ошибок (EWMA) для размыкания
+BREAKER_MIN_REQUESTS = 5  # Минимум запросов перед оценкой доли ошибок
+BREAKER_COOLDOWN = 30  # Базовое время отдыха разомкнутого прокси в секундах
+BREAKER_MAX_COOLDOWN = 600  # Потолок времени отдыха в секундах
+RATE_LIMIT_COOLDOWN = 60  # Отдых после 429, если Steam не прислал Retry-After
+
+RELOAD_CHECK_INTERVAL = 5  # Как часто проверять изменения proxies.txt в секундах
+
+
+# ==================================================================================================================================
+# |                                                          PROXY MANAGER                                                         |
+# ==================================================================================================================================
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Разбирает заголовок Retry-After.
+
+    Parameters:
+        - value (str): Значение заголовка (секунды или HTTP-дата).
+
+    Returns:
+        - Optional[float]: Количество секунд ожидания или None, если заголовок пустой или некорректный.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+# ==================================================================================================================================
+
+
+class ProxyHealth:
+    """Состояние одного прокси: скользящие средние задержки, ошибок и 429, состояние автомата."""
+
+    def __init__(self, address: str):
+        self.address = address
+
+        self.latency = DEFAULT_LATENCY
+        self.error_rate = 0.0
+        self.rate_limit_rate = 0.0
+
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.in_flight = 0
+
+        self.trips = 0  # Сколько раз подряд автомат размыкался
+        self.open_until = 0.0  # До какого момента (time.monotonic) прокси отдыхает
+        self.half_open = False  # Отдых закончился, ждём пробный запрос
+
+    def is_available(self, now: float) -> bool:
+        if now < self.open_until:
+            return False
+        # В полуоткрытом состоянии пропускаем только один пробный запрос
+        return not (self.half_open and self.in_flight > 0)
+
+    def score(self) -> float:
+        """Чем меньше, тем лучше: задержка с поправкой на ошибки, 429 и текущую загрузку."""
+
+        # Новые прокси пробуем в первую очередь, чтобы узнать их задержку
+        if self.requests == 0 and self.in_flight == 0:
+            return 0.0
+
+        return (
+            self.latency
+            * (1 + 4 * self.error_rate + 8 * self.rate_limit_rate)
+            * (1 + self.in_flight)
+        )
+
+
+# ==================================================================================================================================
+
+
+class ProxyManager:
+    """
+    Общий для процесса менеджер прокси.
+    Отслеживает здоровье каждого прокси, размыкает автомат на сбойных и подхватывает изменения proxies.txt без перезапуска.
+    """
+
+    def __init__(self, proxies_file: str = PROXIES_FILE):
+        self.proxies_file = proxies_file
+
+        self._lock = threading.Lock()
+        self._health: dict[str, ProxyHealth] = {}
+        self._listeners: list[Callable[[set], None]] = []
+
+        self._mtime = None
+        self._last_reload_check = 0.0
+
+        self.reload()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def reload(self) -> None:
+        """Перечитывает файл прокси. Статистика прокси, оставшихся в файле, сохраняется."""
+
+        try:
+            mtime = os.path.getmtime(self.proxies_file)
+            with open(self.proxies_file, "r", encoding="utf-8") as proxies_list:
+                addresses = [
+                    line.strip() for line in proxies_list.read().splitlines() if line.strip()
+                ]
+        except OSError as e:
+            color_print("fail", "fail", f"Ошибка чтения {self.proxies_file}: {e}", True)
+            return
+
+        with self._lock:
+            changed = self._mtime is not None and set(addresses) != set(self._health)
+            self._mtime = mtime
+            self._health = {
+                address: self._health.get(address) or ProxyHealth(address)
+                for address in addresses
+            }
+            listeners = list(self._listeners)
+            active = set(self._health)
+
+        if changed:
+            color_print("log", "log", f"Список прокси обновлён: {len(active)} шт.", True)
+            for listener in listeners:
+                listener(active)
+
+    def _reload_if_changed(self) -> None:
+        now = time.monotonic()
+        if now - self._last_reload_check < RELOAD_CHECK_INTERVAL:
+            return
+        self._last_reload_check = now
+
+        try:
+            mtime = os.path.getmtime(self.proxies_file)
+        except OSError:
+            return
+
+        if mtime != self._mtime:
+            self.reload()
+
+    def add_reload_listener(self, listener: Callable[[set], None]) -> None:
+        """
+        Подписывает функцию на изменение списка прокси.
+
+        Parameters:
+            - listener (Callable[[set], None]): Получает множество актуальных адресов прокси.
+        """
+
+        with self._lock:
+            self._listeners.append(listener)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def get_proxies(self, limit: Optional[int] = None) -> dict:
+        """
+        Возвращает доступные прокси, лучшие первыми. Прокси на отдыхе не возвращаются.
+
+        Parameters:
+            - limit (int, optional): Максимальное количество прокси.
+
+        Returns:
+            - dict: Словарь вида {'login:password@ip:port': {'https': 'http://login:password@ip:port'}, ...}
+        """
+
+        self._reload_if_changed()
+        now = time.monotonic()
+
+        with self._lock:
+            available = [
+                health for health in self._health.values() if health.is_available(now)
+            ]
+            # Небольшой разброс, чтобы равные по качеству прокси нагружались поровну
+            available.sort(key=lambda health: health.score() * random.uniform(0.85, 1.15))
+
+        if limit is not None:
+            available = available[:limit]
+
+        return {
+            health.address: {"https": f"http://{health.address}"} for health in available
+        }
+
+    def healthy_count(self) -> int:
+        """Количество прокси, которые сейчас не отдыхают."""
+
+        now = time.monotonic()
+        with self._lock:
+            return sum(
+                1 for health in self._health.values() if now >= health.open_until
+            )
+
+    def total_count(self) -> int:
+        """Общее количество прокси в файле."""
+
+        with self._lock:
+            return len(self._health)
+
+    def time_until_available(self) -> float:
+        """Сколько секунд осталось до окончания отдыха ближайшего прокси."""
+
+        now = time.monotonic()
+        with self._lock:
+            if not self._health:
+                return 0.0
+            return max(
+                min(health.open_until for health in self._health.values()) - now, 0.0
+            )
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def request_started(self, address: str) -> float:
+        """
+        Отмечает начало запроса через прокси.
+
+        Returns:
+            - float: Момент начала запроса для передачи в request_finished / request_failed.
+        """
+
+        with self._lock:
+            health = self._health.get(address)
+            if health is not None:
+                health.in_flight += 1
+
+        return time.monotonic()
+
+    def request_finished(self, address: str, started: float) -> None:
+        """Учитывает успешный запрос: обновляет задержку и замыкает автомат."""
+
+        latency = time.monotonic() - started
+
+        with self._lock:
+            health = self._health.get(address)
+            if health is None:
+                return
+
+            health.in_flight = max(health.in_flight - 1, 0)
+            health.requests += 1
+            health.latency += EWMA_ALPHA * (latency - health.latency)
+            health.error_rate *= 1 - EWMA_ALPHA
+            health.rate_limit_rate *= 1 - EWMA_ALPHA
+            health.consecutive_failures = 0
+            health.half_open = False
+            health.trips = 0
+
+    def request_failed(
+        self,
+        address: str,
+        started: float,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Учитывает неудачный запрос. При необходимости размыкает автомат прокси.
+
+        Parameters:
+            - address (str): Прокси.
+            - started (float): Значение, полученное из request_started.
+            - status_code (int, optional): HTTP-статус ответа, None для таймаутов и ошибок соединения.
+            - retry_after (float, optional): Значение заголовка Retry-After в секундах.
+        """
+
+        latency = time.monotonic() - started
+        rate_limited = status_code == 429
+
+        with self._lock:
+            health = self._health.get(address)
+            if health is None:
+                return
+
+            health.in_flight = max(health.in_flight - 1, 0)
+            health.requests += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.latency += EWMA_ALPHA * (max(latency, health.latency) - health.latency)
+            health.error_rate += EWMA_ALPHA * (1 - health.error_rate)
+            health.rate_limit_rate += EWMA_ALPHA * (
+                (1 if rate_limited else 0) - health.rate_limit_rate
+            )
+
+            should_trip = (
+                rate_limited
+                or health.half_open
+                or health.consecutive_failures >= BREAKER_CONSECUTIVE_FAILURES
+                or (
+                    health.requests >= BREAKER_MIN_REQUESTS
+                    and health.error_rate >= BREAKER_ERROR_RATE
+                )
+            )
+
+            if should_trip:
+                cooldown = min(BREAKER_COOLDOWN * 2**health.trips, BREAKER_MAX_COOLDOWN)
+                if rate_limited:
+                    cooldown = max(cooldown, retry_after or RATE_LIMIT_COOLDOWN)
+
+                health.trips += 1
+                health.open_until = time.monotonic() + cooldown
+                health.half_open = True
+                health.consecutive_failures = 0
+
+        if should_trip:
+            color_print(
+                "warning",
+                "warning",
+                f"Прокси отправлен на отдых: {cooldown:.0f} сек.",
+                True,
+            )
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def stats(self) -> list[dict]:
+        """
+        Возвращает состояние всех прокси (без логинов и паролей).
+
+        Returns:
+            - list[dict]: Для каждого прокси: адрес, задержка, доли ошибок и 429, количество запросов и время до конца отдыха.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "proxy": health.address.rsplit("@", 1)[-1],
+                    "latency": round(health.latency, 3),
+                    "error_rate": round(health.error_rate, 3),
+                    "rate_limit_rate": round(health.rate_limit_rate, 3),
+                    "requests": health.requests,
+                    "failures": health.failures,
+                    "cooldown": round(max(health.open_until - now, 0.0), 1),
+                }
+                for health in self._health.values()
+            ]
+
+
+# ==================================================================================================================================
+
+
+_proxy_manager = None
+_proxy_manager_lock = threading.Lock()
+
+
+def get_proxy_manager() -> ProxyManager:
+    """
+    Возвращает общий для процесса менеджер прокси, создавая его при первом обращении.
+
+    Returns:
+        - ProxyManager: Менеджер прокси.
+    """
+
+    global _proxy_manager
+
+    with _proxy_manager_lock:
+        if _proxy_manager is None:
+            _proxy_manager = ProxyManager()
+
+    return _proxy_manager
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_manager = get_proxy_manager()
+
+    for test_proxy in test_manager.get_proxies():
+        test_started = test_manager.request_started(test_proxy)
+        test_manager.request_failed(test_proxy, test_started, 429, 5)
+
+    print(test_manager.stats())
+    print("Доступно:", test_manager.healthy_count(), "/", test_manager.total_count())
@@ -0,0 +1,255 @@
+import time
+import threading
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+
+# ==================================================================================================================================
+# |                                                        RATE LIMITER DATA                                                       |
+# ==================================================================================================================================
+
+"""
+Бюджеты запросов на один IP (прокси) для разных эндпоинтов торговой площадки Steam:
+    - rate: стартовая скорость в запросах в минуту
+    - max_rate: потолок, до которого скорость может дорасти без 429
+    - burst: сколько запросов можно отправить подряд без ожидания
+"""
+ENDPOINT_LIMITS = {
+    "search": {"rate": 10, "max_rate": 15, "burst": 2},  # /market/search/render
+    "listings": {"rate": 20, "max_rate": 30, "burst": 4},  # /market/listings/730/...
+    "histogram": {"rate": 30, "max_rate": 45, "burst": 5},  # /market/itemordershistogram
+    "other": {"rate": 60, "max_rate": 60, "burst": 10},
+}
+
+MIN_RATE = 2  # Нижняя граница скорости после серии 429 (запросов в минуту)
+DECREASE_FACTOR = 0.5  # Во сколько раз снижается скорость после 429
+INCREASE_STEP = 0.02  # Прибавка к скорости после успешного запроса (доля от стартовой)
+DEFAULT_RETRY_AFTER = 60  # Пауза после 429 без заголовка Retry-After в секундах
+
+
+# ==================================================================================================================================
+# |                                                          RATE LIMITER                                                          |
+# ==================================================================================================================================
+
+
+def get_endpoint_class(url: str) -> str:
+    """
+    Определяет класс эндпоинта Steam по URL.
+
+    Parameters:
+        - url (str): URL запроса.
+
+    Returns:
+        - str: "search", "listings", "histogram" или "other".
+    """
+
+    path = urlparse(url).path
+
+    if path.startswith("/market/search/render"):
+        return "search"
+    if path.startswith("/market/listings/"):
+        return "listings"
+    if path.startswith("/market/itemordershistogram"):
+        return "histogram"
+    return "other"
+
+
+# ==================================================================================================================================
+
+
+class TokenBucket:
+    """
+    Ведро токенов с резервированием: токены могут уйти в минус,
+    тогда следующий запрос ждёт, пока долг не восполнится.
+    """
+
+    def __init__(self, rate: float, max_rate: float, burst: int):
+        self.base_rate = rate / 60
+        self.rate = rate / 60
+        self.max_rate = max_rate / 60
+        self.capacity = burst
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+        self.rate_limited = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.capacity)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Сколько секунд придётся ждать следующий токен."""
+
+        self._refill(now)
+        return max((1 - self.tokens) / self.rate, 0.0)
+
+    def reserve(self, now: float) -> float:
+        """Забирает токен и возвращает время ожидания до момента, когда его можно потратить."""
+
+        wait = self.wait_time(now)
+        self.tokens -= 1
+        return wait
+
+    def on_success(self) -> None:
+        self.rate = min(self.rate + self.base_rate * INCREASE_STEP, self.max_rate)
+
+    def on_rate_limited(self, retry_after: Optional[float], now: float) -> None:
+        self._refill(now)
+        self.rate = max(self.rate * DECREASE_FACTOR, MIN_RATE / 60)
+        # Долг в токенах заставит все следующие запросы ждать окончания Retry-After
+        self.tokens = min(self.tokens, 0.0) - (retry_after or DEFAULT_RETRY_AFTER) * self.rate
+        self.rate_limited += 1
+
+
+# ==================================================================================================================================
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов: отдельное ведро токенов на каждую пару (прокси, класс эндпоинта).
+    Скорость растёт после успешных запросов и падает после 429, поэтому общая пропускная способность
+    на N прокси стремится к N-кратному лимиту одного IP.
+    """
+
+    def __init__(self, limits: Optional[dict] = None):
+        self.limits = limits or ENDPOINT_LIMITS
+
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def _get_bucket(self, proxy_name: str, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get((proxy_name, endpoint))
+
+        if bucket is None:
+            limit = self.limits.get(endpoint, self.limits["other"])
+            bucket = TokenBucket(limit["rate"], limit["max_rate"], limit["burst"])
+            self._buckets[(proxy_name, endpoint)] = bucket
+
+        return bucket
+
+    def acquire(self, proxy_names: Iterable[str], url: str) -> tuple[str, float]:
+        """
+        Выбирает прокси для запроса и резервирует за ним токен.
+        Берётся первый прокси в порядке proxy_names, у которого есть свободный токен,
+        иначе тот, у которого токен освободится раньше всех.
+
+        Parameters:
+            - proxy_names (Iterable[str]): Прокси в порядке предпочтения.
+            - url (str): URL запроса.
+
+        Returns:
+            - tuple[str, float]: Выбранный прокси и время ожидания в секундах перед отправкой запроса.
+        """
+
+        endpoint = get_endpoint_class(url)
+        now = time.monotonic()
+
+        with self._lock:
+            best_name = None
+            best_wait = float("inf")
+
+            for proxy_name in proxy_names:
+                wait = self._get_bucket(proxy_name, endpoint).wait_time(now)
+
+                if wait < best_wait:
+                    best_name, best_wait = proxy_name, wait
+                if wait == 0:
+                    break
+
+            if best_name is None:
+                raise ValueError("Нет прокси для запроса.")
+
+            return best_name, self._get_bucket(best_name, endpoint).reserve(now)
+
+    def record_success(self, proxy_name: str, url: str) -> None:
+        """Учитывает успешный запрос: скорость для этого прокси и эндпоинта немного растёт."""
+
+        with self._lock:
+            self._get_bucket(proxy_name, get_endpoint_class(url)).on_success()
+
+    def record_rate_limited(
+        self, proxy_name: str, url: str, retry_after: Optional[float] = None
+    ) -> None:
+        """
+        Учитывает ответ 429: скорость падает, запросы к эндпоинту через этот прокси ждут Retry-After.
+
+        Parameters:
+            - proxy_name (str): Прокси.
+            - url (str): URL запроса.
+            - retry_after (float, optional): Значение заголовка Retry-After в секундах.
+        """
+
+        with self._lock:
+            self._get_bucket(proxy_name, get_endpoint_class(url)).on_rate_limited(
+                retry_after, time.monotonic()
+            )
+
+    def prune(self, active_proxies: set) -> None:
+        """Удаляет вёдра прокси, пропавших из списка."""
+
+        with self._lock:
+            for key in list(self._buckets):
+                if key[0] not in active_proxies:
+                    del self._buckets[key]
+
+    def stats(self) -> dict:
+        """
+        Возвращает текущую скорость по классам эндпоинтов.
+
+        Returns:
+            - dict: Для каждого класса: суммарная скорость по всем прокси (запросов в минуту) и количество 429.
+        """
+
+        with self._lock:
+            result = {}
+            for (_, endpoint), bucket in self._buckets.items():
+                endpoint_stats = result.setdefault(
+                    endpoint, {"rate_per_minute": 0.0, "rate_limited": 0, "proxies": 0}
+                )
+                endpoint_stats["rate_per_minute"] += bucket.rate * 60
+                endpoint_stats["rate_limited"] += bucket.rate_limited
+                endpoint_stats["proxies"] += 1
+
+        for endpoint_stats in result.values():
+            endpoint_stats["rate_per_minute"] = round(endpoint_stats["rate_per_minute"], 1)
+
+        return result
+
+
+# ==================================================================================================================================
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Возвращает общий для процесса ограничитель частоты запросов, создавая его при первом обращении.
+
+    Returns:
+        - RateLimiter: Ограничитель частоты запросов.
+    """
+
+    global _rate_limiter
+
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+
+    return _rate_limiter
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_limiter = RateLimiter()
+    test_url = "https://steamcommunity.com/market/itemordershistogram?item_nameid=176000356"
+
+    for _ in range(12):
+        print(test_limiter.acquire(["proxy_1", "proxy_2"], test_url))
+
+    test_limiter.record_rate_limited("proxy_1", test_url, 30)
+    print(test_limiter.acquire(["proxy_1", "proxy_2"], test_url))
+    print(test_limiter.stats())
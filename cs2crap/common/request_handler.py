@@ -1,11 +1,15 @@
 import re
 import random
 import requests
+import threading
 from time import sleep
+from typing import Optional
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 
 from cs2crap.common.utils import color_print
+from cs2crap.common.rate_limiter import get_rate_limiter
+from cs2crap.common.proxy_manager import get_proxy_manager, parse_retry_after
 
 
 # ==================================================================================================================================
@@ -95,6 +99,28 @@ def get_random_referer() -> str:
 # ==================================================================================================================================
 
 
+def get_request_headers() -> dict:
+    """
+    Собирает заголовки запроса со случайными user-agent и реферером.
+
+    Returns:
+        - dict: Заголовки для HTTP-запроса.
+    """
+
+    return {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Cache-Control": "max-age=0",
+        # "Host": "steamcommunity.com",
+        "Referer": f"{get_random_referer()}",
+        "User-Agent": f"{get_random_user_agent()}",
+    }
+
+
+# ==================================================================================================================================
+
+
 def get_random_delay(number_from: int, number_to: int) -> float:
     """
     Генерирует случайную задержку в заданном диапазоне.
@@ -130,10 +156,13 @@ def get_random_proxy(proxies: dict) -> dict:
 # ==================================================================================================================================
 
 
-def get_session() -> requests.Session:
+def get_session(pool_maxsize: int = 10) -> requests.Session:
     """
     Создает и возвращает сессию запросов с настройками повторных попыток подключения.
 
+    Parameters:
+        - pool_maxsize (int): Максимальное количество соединений, которые сессия держит открытыми для одного хоста.
+
     Returns:
         - requests.Session: Объект сессии для отправки HTTP-запросов.
     """
@@ -144,11 +173,157 @@ def get_session() -> requests.Session:
         backoff_factor=1.5,
         status_forcelist=[500, 502, 504],
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=pool_maxsize)
     session.mount("https://", adapter)
     return session
 
 
+# ==================================================================================================================================
+# |                                                          SESSION POOL                                                          |
+# ==================================================================================================================================
+
+
+class SessionPool:
+    """
+    Пул долгоживущих сессий: по одной keep-alive сессии на каждый прокси.
+    Соединения через прокси переиспользуются между запросами.
+    """
+
+    def __init__(self, pool_maxsize: int = 10):
+        self.pool_maxsize = pool_maxsize
+
+        self._lock = threading.Lock()
+        self._sessions: dict[str, requests.Session] = {}
+
+        self.sessions_created = 0
+        self.requests_sent = 0
+
+    def prune(self, active_proxies: set) -> None:
+        """
+        Закрывает сессии прокси, пропавших из списка.
+
+        Parameters:
+            - active_proxies (set): Актуальные прокси.
+        """
+
+        with self._lock:
+            for proxy_name in list(self._sessions):
+                if proxy_name not in active_proxies:
+                    self._sessions.pop(proxy_name).close()
+
+    def get_session(self, proxy_name: str) -> requests.Session:
+        """
+        Возвращает сессию, закреплённую за прокси, создавая её при первом обращении.
+
+        Parameters:
+            - proxy_name (str): Имя прокси из get_proxies().
+
+        Returns:
+            - requests.Session: Keep-alive сессия для этого прокси.
+        """
+
+        with self._lock:
+            session = self._sessions.get(proxy_name)
+
+            if session is None:
+                session = get_session(self.pool_maxsize)
+                self._sessions[proxy_name] = session
+                self.sessions_created += 1
+
+            self.requests_sent += 1
+
+        return session
+
+    def stats(self) -> dict:
+        """
+        Собирает счётчики пула. Количество открытых соединений берётся из пулов соединений urllib3.
+
+        Returns:
+            - dict: requests_sent, sessions_created, connections_opened, connection_requests и reuse_rate
+              (доля запросов, ушедших по уже открытому соединению).
+        """
+
+        connections_opened = 0
+        connection_requests = 0
+
+        with self._lock:
+            sessions = list(self._sessions.values())
+
+        pool_managers = [
+            pool_manager
+            for session in sessions
+            for adapter in session.adapters.values()
+            for pool_manager in [adapter.poolmanager, *adapter.proxy_manager.values()]
+        ]
+
+        for pool_manager in pool_managers:
+            for key in pool_manager.pools.keys():
+                pool = pool_manager.pools.get(key)
+                if pool is not None:
+                    connections_opened += pool.num_connections
+                    connection_requests += pool.num_requests
+
+        reuse_rate = (
+            1 - connections_opened / connection_requests if connection_requests else 0.0
+        )
+
+        return {
+            "requests_sent": self.requests_sent,
+            "sessions_created": self.sessions_created,
+            "connections_opened": connections_opened,
+            "connection_requests": connection_requests,
+            "reuse_rate": round(reuse_rate, 3),
+        }
+
+    def close(self) -> None:
+        """Закрывает все сессии пула."""
+
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_session_pool = None
+_session_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """
+    Возвращает общий для процесса пул сессий, создавая его при первом обращении.
+
+    Returns:
+        - SessionPool: Пул сессий.
+    """
+
+    global _session_pool
+
+    with _session_pool_lock:
+        if _session_pool is None:
+            _session_pool = SessionPool()
+            get_proxy_manager().add_reload_listener(_session_pool.prune)
+            get_proxy_manager().add_reload_listener(get_rate_limiter().prune)
+
+    return _session_pool
+
+
+# ==================================================================================================================================
+
+
+def is_proxy_fault(status_code: Optional[int]) -> bool:
+    """
+    Проверяет, считается ли ошибка запроса отказом прокси.
+
+    Parameters:
+        - status_code (int, optional): HTTP-статус ответа, None для ошибок без ответа.
+
+    Returns:
+        - bool: True для 429, 5xx и ошибок без ответа сервера.
+    """
+
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
 # ==================================================================================================================================
 # |                                                         MAIN FUNCTIONS                                                         |
 # ==================================================================================================================================
@@ -168,28 +343,38 @@ def request2(url: str, timeout_min: float, timeout_max: float, napping: bool) ->
         - str: Текстовое содержимое HTTP-ответа.
     """
 
-    session = get_session()
-    proxies = get_proxy_list()
-    error_proxies = set()
+    session_pool = get_session_pool()
+    proxy_manager = get_proxy_manager()
+    rate_limiter = get_rate_limiter()
+
+    if proxy_manager.total_count() == 0:
+        color_print("fail", "fail", "Список прокси пуст.", True)
+        return ""
+
+    proxies = proxy_manager.get_proxies()
 
-    for proxy_name, proxy_info in proxies.items():
-        if proxy_name in error_proxies:
-            continue
+    # Все прокси на отдыхе: ждём ближайший вместо слепого sleep
+    while not proxies:
+        sleep(max(proxy_manager.time_until_available(), 1))
+        proxies = proxy_manager.get_proxies()
 
-        # color_print("log", "log", f"Used proxy: {proxy_name}:", True)
+    r = None
+
+    while proxies:
+        # Ограничитель выбирает прокси со свободным токеном для этого эндпоинта
+        proxy_name, wait = rate_limiter.acquire(proxies, url)
+        proxy_info = proxies.pop(proxy_name)
+
+        if wait > 0:
+            sleep(wait)
+
+        session = session_pool.get_session(proxy_name)
+        started = proxy_manager.request_started(proxy_name)
 
         try:
             r = session.get(
                 url,
-                headers={
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
-                    "Cache-Control": "max-age=0",
-                    # "Host": "steamcommunity.com",
-                    "Referer": f"{get_random_referer()}",
-                    "User-Agent": f"{get_random_user_agent()}",
-                },
+                headers=get_request_headers(),
                 timeout=get_random_delay(timeout_min, timeout_max),
                 proxies=proxy_info,
             )
@@ -198,17 +383,17 @@ def request2(url: str, timeout_min: float, timeout_max: float, napping: bool) ->
                 sleep(get_random_delay(timeout_min, timeout_max) / 5)
 
             r.raise_for_status()
-            if 200 <= r.status_code < 300:
-                break
-            else:
+            proxy_manager.request_finished(proxy_name, started)
+            rate_limiter.record_success(proxy_name, url)
+
+            if not 200 <= r.status_code < 300:
                 color_print(
                     "fail",
                     "fail",
                     f"Неожиданный статус код: {r.status_code}",
                     True,
                 )
-                error_proxies.add(proxy_name)
-                break
+            break
 
         except requests.exceptions.Timeout as e:
             color_print(
@@ -217,7 +402,7 @@ def request2(url: str, timeout_min: float, timeout_max: float, napping: bool) ->
                 f"Время ожидания превышено: {e}.",
                 True,
             )
-            error_proxies.add(proxy_name)
+            proxy_manager.request_failed(proxy_name, started)
 
         except requests.exceptions.ConnectionError as e:
             color_print(
@@ -226,7 +411,7 @@ def request2(url: str, timeout_min: float, timeout_max: float, napping: bool) ->
                 f"Ошибка соединения с сервером: {e}.",
                 True,
             )
-            error_proxies.add(proxy_name)
+            proxy_manager.request_failed(proxy_name, started)
 
         except requests.exceptions.RequestException as e:
             color_print(
@@ -235,11 +420,24 @@ def request2(url: str, timeout_min: float, timeout_max: float, napping: bool) ->
                 f"Ошибка запроса: {e}.",
                 True,
             )
-            if len(error_proxies) > 2:
-                sleep(60)
-            else:
-                sleep(5)
-            error_proxies.add(proxy_name)
+            status_code, retry_after = None, None
+            if e.response is not None:
+                status_code = e.response.status_code
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+
+            if not is_proxy_fault(status_code):
+                # Ответ сервера (например, 404) не зависит от прокси: другие прокси получат тот же ответ
+                proxy_manager.request_finished(proxy_name, started)
+                rate_limiter.record_success(proxy_name, url)
+                r = None
+                break
+
+            proxy_manager.request_failed(proxy_name, started, status_code, retry_after)
+            if status_code == 429:
+                rate_limiter.record_rate_limited(proxy_name, url, retry_after)
+
+    if r is None:
+        return ""
 
     return r.text
 
@@ -259,6 +457,9 @@ def check_proxy_ip():
     )
 
     print("\nIP:", ip[0])
+    print("Сессии:", get_session_pool().stats())
+    print("Прокси:", get_proxy_manager().stats())
+    print("Лимиты:", get_rate_limiter().stats())
 
 
 # ==================================================================================================================================
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+
+from cs2crap.common.utils import color_print
+
+
+# ==================================================================================================================================
+# |                                                      SCAN CHECKPOINT DATA                                                      |
+# ==================================================================================================================================
+
+CHECKPOINT_DIR = "data/checkpoints"  # Папка с контрольными точками сканирований
+
+SAVE_INTERVAL = 10  # Сохранять контрольную точку не чаще, чем раз в N секунд
+SAVE_EVERY = 500  # ...но обязательно каждые N предметов
+
+
+# ==================================================================================================================================
+# |                                                        SCAN CHECKPOINT                                                         |
+# ==================================================================================================================================
+
+
+def normalize_params(params: dict) -> dict:
+    """Приводит параметры к виду после JSON (кортежи -> списки), чтобы их можно было сравнить с сохранёнными."""
+
+    return json.loads(json.dumps(params))
+
+
+def new_run_id() -> str:
+    """Идентификатор нового запуска сканирования (время запуска), по нему различаются контрольные точки и журналы."""
+
+    return datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+
+def checkpoint_name(kind: str, run_id: Optional[str] = None) -> str:
+    """
+    Имя контрольной точки этапа сканирования.
+
+    Parameters:
+        - kind (str): Этап ("cscrap", "update_list", "update_scan").
+        - run_id (str, optional): Идентификатор запуска (None - общая контрольная точка этапа).
+
+    Returns:
+        - str: Имя контрольной точки, например "cscrap-20240101-120000-000000".
+    """
+
+    return kind if run_id is None else f"{kind}-{run_id}"
+
+
+def read_checkpoint(name: str, directory: str = CHECKPOINT_DIR) -> Optional[dict]:
+    """
+    Читает контрольную точку без её загрузки в сканирование (например, чтобы узнать параметры прерванного запуска).
+
+    Parameters:
+        - name (str): Имя контрольной точки (см. checkpoint_name).
+        - directory (str): Папка с контрольными точками.
+
+    Returns:
+        - dict | None: params, cursor, done, finished, updated_at или None, если контрольной точки нет.
+    """
+
+    filename = os.path.join(directory, f"{name}.json")
+
+    if not os.path.isfile(filename):
+        return None
+
+    try:
+        with open(filename, "r", encoding="utf-8") as checkpoint_file:
+            return json.load(checkpoint_file)
+    except (OSError, ValueError):
+        return None
+
+
+def remove_checkpoint(name: str, directory: str = CHECKPOINT_DIR) -> None:
+    """Удаляет контрольную точку, не загружая её (например, запуска, отменённого командой /stop или /cancel)."""
+
+    try:
+        os.remove(os.path.join(directory, f"{name}.json"))
+    except FileNotFoundError:
+        pass
+
+
+def list_checkpoints(
+    kind: str, directory: str = CHECKPOINT_DIR
+) -> list[tuple[Optional[str], dict]]:
+    """
+    Находит сохранённые контрольные точки всех запусков этапа (например, для /continue).
+
+    Parameters:
+        - kind (str): Этап ("cscrap", "update_list", "update_scan").
+        - directory (str): Папка с контрольными точками.
+
+    Returns:
+        - list[tuple[str | None, dict]]: (run_id, состояние) по возрастанию времени сохранения;
+            run_id - None для общей контрольной точки этапа.
+    """
+
+    if not os.path.isdir(directory):
+        return []
+
+    checkpoints = []
+
+    for filename in os.listdir(directory):
+        name, extension = os.path.splitext(filename)
+
+        if extension != ".json":
+            continue
+
+        if name == kind:
+            run_id = None
+        elif name.startswith(f"{kind}-"):
+            run_id = name[len(kind) + 1 :]
+        else:
+            continue
+
+        state = read_checkpoint(name, directory)
+        if state is not None:
+            checkpoints.append((run_id, state))
+
+    return sorted(checkpoints, key=lambda checkpoint: checkpoint[1].get("updated_at", 0))
+
+
+# ==================================================================================================================================
+
+
+class ScanCheckpoint:
+    """
+    Контрольная точка сканирования на диске: позиция курсора, обработанные предметы и параметры запуска.
+    Прерванный запуск (падение процесса) с теми же параметрами продолжается с последнего сохранённого предмета.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        params: dict,
+        resume: bool = False,
+        directory: str = CHECKPOINT_DIR,
+    ):
+        """
+        Parameters:
+            - name (str): Имя контрольной точки (одно на запуск, см. checkpoint_name).
+            - params (dict): Параметры запуска (диапазон цен, методы и т.п.), должны сериализоваться в JSON.
+            - resume (bool): Продолжить с сохранённой контрольной точки, если её параметры совпадают с params.
+            - directory (str): Папка с контрольными точками.
+        """
+
+        self.name = name
+        self.params = normalize_params(params)
+        self.filename = os.path.join(directory, f"{name}.json")
+
+        self._lock = threading.Lock()
+        self.cursor = 0  # Позиция последовательного курсора (например, номер следующей страницы поиска)
+        self.done: set[str] = set()  # Обработанные предметы
+        self.finished = False
+
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+
+        if resume:
+            self._load()
+        else:
+            self.clear()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        state = read_checkpoint(self.name, os.path.dirname(self.filename))
+
+        if state is None:
+            return
+
+        if state.get("params") != self.params:
+            color_print(
+                "warning",
+                "warning",
+                f"Контрольная точка {self.name} сохранена с другими параметрами, начинаем заново.",
+                True,
+            )
+            return
+
+        self.cursor = state.get("cursor", 0)
+        self.done = set(state.get("done", []))
+        self.finished = state.get("finished", False)
+
+        color_print(
+            "status",
+            "status",
+            f"Продолжаем {self.name}: курсор {self.cursor}, обработано {len(self.done)} предметов.",
+            True,
+        )
+
+    def save(self) -> None:
+        """Атомарно сохраняет контрольную точку на диск."""
+
+        with self._lock:
+            state = {
+                "params": self.params,
+                "cursor": self.cursor,
+                "done": sorted(self.done),
+                "finished": self.finished,
+                "updated_at": time.time(),
+            }
+            self._unsaved = 0
+            self._last_save = time.monotonic()
+
+        temp_filename = f"{self.filename}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            with open(temp_filename, "w", encoding="utf-8") as checkpoint_file:
+                json.dump(state, checkpoint_file, ensure_ascii=False)
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+            os.replace(temp_filename, self.filename)
+        except OSError as e:
+            color_print("fail", "fail", f"Ошибка сохранения {self.filename}: {e}", True)
+
+    def _save_if_due(self) -> None:
+        if (
+            self._unsaved >= SAVE_EVERY
+            or time.monotonic() - self._last_save >= SAVE_INTERVAL
+        ):
+            self.save()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def advance(self, cursor: int) -> None:
+        """Сдвигает курсор и сохраняет контрольную точку (вызывается после того, как данные до cursor записаны)."""
+
+        with self._lock:
+            self.cursor = cursor
+            self._unsaved += 1
+
+        self.save()
+
+    def mark_done(self, item_name: str) -> None:
+        """Отмечает предмет обработанным (вызывается после того, как его результат записан)."""
+
+        with self._lock:
+            self.done.add(item_name)
+            self.cursor = len(self.done)
+            self._unsaved += 1
+
+        self._save_if_due()
+
+    def pending(self, item_names: Iterable[str]) -> list[bool]:
+        """Маска предметов, которые ещё не обработаны."""
+
+        with self._lock:
+            return [item_name not in self.done for item_name in item_names]
+
+    def finish(self) -> None:
+        """Отмечает этап завершённым: при продолжении он будет пропущен."""
+
+        with self._lock:
+            self.finished = True
+
+        self.save()
+
+    def clear(self) -> None:
+        """Удаляет контрольную точку (запуск завершён полностью или начат заново)."""
+
+        with self._lock:
+            self.cursor = 0
+            self.done = set()
+            self.finished = False
+
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_checkpoint = ScanCheckpoint(
+        "test", {"price_range": (10, 20)}, directory="data/test_checkpoints"
+    )
+    test_checkpoint.mark_done("Revolution Case")
+    test_checkpoint.save()
+
+    print(
+        ScanCheckpoint(
+            "test",
+            {"price_range": (10, 20)},
+            resume=True,
+            directory="data/test_checkpoints",
+        ).done
+    )
+    test_checkpoint.clear()
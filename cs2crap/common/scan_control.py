@@ -0,0 +1,200 @@
+import threading
+from typing import Callable, Hashable, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from cs2crap.common.utils import color_print
+
+
+# ==================================================================================================================================
+# |                                                          SCAN CONTROL                                                          |
+# ==================================================================================================================================
+
+
+class ScanControl:
+    """
+    Управление сканированием из другого потока (например, из телеграм-бота): остановка, пауза и продолжение.
+    Повторяет интерфейс threading.Event (set / is_set / clear), поэтому подходит везде, где ожидается событие остановки.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._paused = False
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def stop(self) -> None:
+        """Останавливает сканирование (в том числе стоящее на паузе)."""
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def pause(self) -> None:
+        """Ставит сканирование на паузу: новые предметы не берутся, уже начатые дорабатываются."""
+
+        with self._condition:
+            self._paused = True
+
+    def resume(self) -> None:
+        """Продолжает сканирование с того места, где оно было приостановлено."""
+
+        with self._condition:
+            self._paused = False
+            self._condition.notify_all()
+
+    def is_stopped(self) -> bool:
+        with self._condition:
+            return self._stopped
+
+    def is_paused(self) -> bool:
+        with self._condition:
+            return self._paused and not self._stopped
+
+    def wait_if_paused(self, timeout: Optional[float] = None) -> bool:
+        """
+        Блокирует поток, пока сканирование на паузе.
+
+        Parameters:
+            - timeout (float, optional): Максимальное время ожидания в секундах.
+
+        Returns:
+            - bool: True, если сканирование можно продолжать, False, если оно остановлено.
+        """
+
+        with self._condition:
+            self._condition.wait_for(lambda: not self._paused or self._stopped, timeout)
+            return not self._stopped
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    # Совместимость с threading.Event
+    set = stop
+    is_set = is_stopped
+
+    def clear(self) -> None:
+        with self._condition:
+            self._stopped = False
+            self._paused = False
+            self._condition.notify_all()
+
+
+# ==================================================================================================================================
+
+
+def should_stop(control) -> bool:
+    """
+    Проверка между предметами: ждёт, пока сканирование на паузе, и сообщает, нужно ли остановиться.
+
+    Parameters:
+        - control (ScanControl | threading.Event | None): Управление сканированием.
+
+    Returns:
+        - bool: True, если сканирование остановлено.
+    """
+
+    if control is None:
+        return False
+
+    if isinstance(control, ScanControl):
+        return not control.wait_if_paused()
+
+    return control.is_set()
+
+
+# ==================================================================================================================================
+
+
+def run_concurrently(
+    items: Iterable[tuple[Hashable, object]],
+    work: Callable[[object], object],
+    on_result: Callable[[Hashable, object], None],
+    workers: int,
+    control=None,
+    on_pause: Optional[Callable[[], None]] = None,
+    on_error: Optional[Callable[[Hashable, Exception], None]] = None,
+    thread_name_prefix: str = "worker",
+) -> None:
+    """
+    Обрабатывает предметы в пуле потоков с учётом остановки и паузы. Результаты обрабатываются в вызывающем потоке.
+    В очереди держится не больше двух предметов на поток, поэтому остановка и пауза срабатывают быстро.
+
+    Parameters:
+        - items (Iterable[tuple[Hashable, object]]): Пары (ключ, предмет), например df.iterrows().
+        - work (Callable[[object], object]): Обработка одного предмета (выполняется в пуле).
+        - on_result (Callable[[Hashable, object], None]): Обработка результата предмета (ключ, результат).
+        - workers (int): Количество потоков.
+        - control (ScanControl | threading.Event, optional): Управление: на паузе новые предметы не берутся,
+            а уже начатые дорабатываются и обрабатываются; после остановки ждущие в очереди предметы отменяются.
+        - on_pause (Callable[[], None], optional): Вызывается на паузе перед ожиданием продолжения,
+            когда все начатые предметы обработаны (например, для сохранения контрольной точки).
+        - on_error (Callable[[Hashable, Exception], None], optional): Обработка ошибки предмета
+            (по умолчанию ошибка выводится в консоль, а предмет пропускается).
+        - thread_name_prefix (str): Префикс имён потоков пула.
+
+    Returns:
+        - None
+    """
+
+    def is_stopped() -> bool:
+        return control is not None and control.is_set()
+
+    def is_paused() -> bool:
+        return isinstance(control, ScanControl) and control.is_paused()
+
+    items = iter(items)
+    pending = {}
+    exhausted = False
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix=thread_name_prefix
+    ) as executor:
+        while True:
+            # На паузе новые предметы не берём, пока не доработаны уже начатые
+            while (
+                not exhausted
+                and len(pending) < workers * 2
+                and not is_paused()
+                and not is_stopped()
+            ):
+                next_item = next(items, None)
+                if next_item is None:
+                    exhausted = True
+                    break
+                key, item = next_item
+                pending[executor.submit(work, item)] = key
+
+            if not pending:
+                if exhausted or is_stopped():
+                    break
+
+                # Пауза: все начатые предметы обработаны, ждём продолжения или остановки
+                if on_pause is not None and is_paused():
+                    on_pause()
+                if should_stop(control):
+                    break
+                continue
+
+            # После остановки не начинаем предметы, которые ещё ждут в очереди
+            if is_stopped():
+                for future in pending:
+                    future.cancel()
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                key = pending.pop(future)
+
+                if future.cancelled():
+                    continue
+
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if on_error is None:
+                        color_print("fail", "fail", f"Ошибка обработки {key}: {e}", True)
+                    else:
+                        on_error(key, e)
+                    continue
+
+                on_result(key, result)
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import threading
+import pandas as pd
+from typing import Optional
+
+
+# ==================================================================================================================================
+# |                                                        SCAN JOURNAL DATA                                                       |
+# ==================================================================================================================================
+
+JOURNAL_FILE = "data/updated_items.jsonl"  # Журнал результатов сканирования
+SNAPSHOT_FILE = "data/updated_items.csv"  # Итоговый CSV для совместимости
+
+FSYNC_EVERY = 50  # Сбрасывать журнал на диск каждые N записей
+FSYNC_INTERVAL = 5  # ...или не реже, чем раз в N секунд
+COMPACT_EVERY = 2000  # Сжимать журнал каждые N записей
+
+COLUMNS = [
+    "id",
+    "item_name",
+    "price_buy",
+    "price_sell",
+    "volume",
+    "item_href",
+    "image_src",
+]
+
+
+# ==================================================================================================================================
+# |                                                           SCAN JOURNAL                                                         |
+# ==================================================================================================================================
+
+
+def to_json_value(value):
+    """Приводит значение из DataFrame к типу, который можно записать в JSON (NaN/NA -> None)."""
+
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+# ==================================================================================================================================
+
+
+def journal_filename(run_id: Optional[str] = None) -> str:
+    """
+    Путь к журналу сканирования запуска.
+
+    Parameters:
+        - run_id (str, optional): Идентификатор запуска (None - общий журнал JOURNAL_FILE).
+
+    Returns:
+        - str: Путь к журналу, например data/updated_items-20240101-120000-000000.jsonl.
+    """
+
+    if run_id is None:
+        return JOURNAL_FILE
+
+    root, extension = os.path.splitext(JOURNAL_FILE)
+    return f"{root}-{run_id}{extension}"
+
+
+def remove_journal(run_id: Optional[str]) -> None:
+    """Удаляет журнал завершённого запуска (общий журнал JOURNAL_FILE не удаляется)."""
+
+    if run_id is None:
+        return
+
+    try:
+        os.remove(journal_filename(run_id))
+    except FileNotFoundError:
+        pass
+
+
+# ==================================================================================================================================
+
+
+def read_scan_journal(filename: str = JOURNAL_FILE) -> pd.DataFrame:
+    """
+    Читает журнал сканирования. Для каждого предмета берутся последние записанные значения столбцов:
+    неполная запись (например, перепроверка только цен) обновляет лишь свои столбцы.
+    Недописанная последняя строка (например, после падения процесса) пропускается.
+
+    Parameters:
+        - filename (str): Путь к журналу.
+
+    Returns:
+        - pd.DataFrame: Результаты сканирования со столбцами базы предметов.
+    """
+
+    records = {}
+
+    if os.path.isfile(filename):
+        with open(filename, "r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                records.setdefault(record["item_name"], {}).update(record)
+
+    df = pd.DataFrame(list(records.values()), columns=COLUMNS)
+    return df.astype({"id": "Int64", "volume": "Int64"}, errors="ignore")
+
+
+# ==================================================================================================================================
+
+
+class ScanJournal:
+    """
+    Журнал результатов сканирования только на дозапись: каждый предмет стоит O(1) работы с диском
+    вместо перезаписи всего updated_items.csv. Записи сбрасываются на диск пачками и периодически сжимаются.
+    """
+
+    def __init__(
+        self,
+        filename: str = JOURNAL_FILE,
+        reset: bool = True,
+        fsync_every: int = FSYNC_EVERY,
+        compact_every: int = COMPACT_EVERY,
+    ):
+        """
+        Parameters:
+            - filename (str): Путь к журналу.
+            - reset (bool): Начать журнал заново (иначе продолжить существующий).
+            - fsync_every (int): Сбрасывать журнал на диск каждые N записей.
+            - compact_every (int): Сжимать журнал каждые N записей.
+        """
+
+        self.filename = filename
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+
+        self._lock = threading.Lock()
+        self._file = open(filename, "w" if reset else "a", encoding="utf-8")
+
+        self.records_written = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, record: dict) -> None:
+        """
+        Дописывает результат сканирования предмета в журнал.
+
+        Parameters:
+            - record (dict): Значения столбцов предмета (обязательно item_name).
+        """
+
+        line = json.dumps(
+            {key: to_json_value(value) for key, value in record.items()},
+            ensure_ascii=False,
+        )
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+            self.records_written += 1
+            self._unsynced += 1
+
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= FSYNC_INTERVAL
+            ):
+                self._sync()
+
+            if self.records_written % self.compact_every == 0:
+                self._compact()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _compact(self) -> None:
+        """Переписывает журнал, оставляя по одной (последней) записи на предмет."""
+
+        self._sync()
+        df = read_scan_journal(self.filename)
+
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "w", encoding="utf-8") as temp_file:
+            for record in df.to_dict("records"):
+                temp_file.write(
+                    json.dumps(
+                        {key: to_json_value(value) for key, value in record.items()},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        self._file.close()
+        os.replace(temp_filename, self.filename)
+        self._file = open(self.filename, "a", encoding="utf-8")
+
+    def close(self, snapshot_file: str = SNAPSHOT_FILE) -> None:
+        """
+        Сбрасывает журнал на диск и выгружает итог в CSV для совместимости.
+
+        Parameters:
+            - snapshot_file (str): Путь к CSV (None - не выгружать).
+        """
+
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+
+        if snapshot_file is not None:
+            read_scan_journal(self.filename).to_csv(
+                snapshot_file, index=False, encoding="utf-8"
+            )
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_journal = ScanJournal("data/test_journal.jsonl", compact_every=3)
+
+    for test_price in (10.5, 11.0, 12.25):
+        test_journal.append(
+            {"item_name": "Revolution Case", "price_buy": test_price, "volume": 100}
+        )
+
+    test_journal.close(None)
+    print(read_scan_journal("data/test_journal.jsonl"))
@@ -1,10 +1,13 @@
 import time
 import sys
 import os
+import numpy as np
 import pandas as pd
 import urllib.parse
 from colorama import Fore, Style, init
 
+from cs2crap.common.scan_journal import read_scan_journal
+
 
 init()
 
@@ -371,68 +374,120 @@ def remove_duplicates_keep_last(file_path: str, output_file_path: str) -> None:
 # ==================================================================================================================================
 
 
+def upsert_items(df_items_database: pd.DataFrame, df_new_items: pd.DataFrame) -> pd.DataFrame:
+    """
+    Объединяет пачку новых данных с базой предметов по item_name за одну векторную операцию.
+
+    Parameters:
+        - df_items_database (DataFrame): База предметов.
+        - df_new_items (DataFrame): Новые данные предметов (для повторяющихся имён берётся последняя строка).
+
+    Returns:
+        - DataFrame: Обновленная база предметов.
+
+    Принцип работы:
+        - По именам новых предметов строится хеш-индекс, по нему за один проход находятся совпадающие строки базы.
+        - В совпавших строках перезаписываются только непустые новые значения (по всем строкам с этим именем).
+        - Предметы, которых нет в базе, добавляются в конец одним блоком.
+    """
+
+    df_new_items = df_new_items.copy()
+    df_items_database = df_items_database.copy()
+
+    df_new_items["item_name"] = df_new_items["item_name"].str.replace("&amp;", "&")
+    df_items_database["item_name"] = df_items_database["item_name"].str.replace(
+        "&amp;", "&"
+    )
+
+    if "id" in df_new_items.columns:
+        df_new_items["id"] = pd.to_numeric(df_new_items["id"], errors="coerce")
+
+    df_new_items = df_new_items.drop_duplicates(subset="item_name", keep="last")
+
+    for column in df_new_items.columns:
+        if column not in df_items_database.columns:
+            df_items_database[column] = pd.NA
+
+    # Позиция каждой строки базы среди новых предметов (-1, если предмета нет)
+    new_items_index = pd.Index(df_new_items["item_name"])
+    positions = new_items_index.get_indexer(df_items_database["item_name"])
+    matched_rows = np.flatnonzero(positions >= 0)
+    matched_positions = positions[matched_rows]
+
+    for column in df_new_items.columns:
+        if column == "item_name":
+            continue
+
+        new_values = df_new_items[column].to_numpy(dtype=object)[matched_positions]
+        not_null = pd.notna(new_values)
+
+        if not_null.any():
+            column_values = df_items_database[column].astype(object).to_numpy()
+            column_values[matched_rows[not_null]] = new_values[not_null]
+            df_items_database[column] = pd.Series(
+                column_values, index=df_items_database.index
+            ).infer_objects()
+
+    # Новые предметы добавляем одним блоком, без пустых столбцов (иначе concat выдаёт FutureWarning)
+    df_additions = df_new_items[
+        ~df_new_items["item_name"].isin(df_items_database["item_name"])
+    ]
+
+    if not df_additions.empty:
+        df_additions = df_additions.dropna(axis=1, how="all")
+
+        if df_items_database.empty:
+            df_items_database = df_additions.reindex(columns=df_items_database.columns)
+        else:
+            df_items_database = pd.concat(
+                [df_items_database, df_additions], ignore_index=True
+            )
+
+    # Преобразуем столбцы "id" и "volume" в целочисленный тип данных
+    df_items_database["id"] = pd.to_numeric(
+        df_items_database["id"], errors="coerce"
+    ).astype("Int64")
+    df_items_database["volume"] = pd.to_numeric(
+        df_items_database["volume"], errors="coerce"
+    ).astype("Int64")
+
+    return df_items_database
+
+
+# ==================================================================================================================================
+
+
 def update_items_database(new_items_file: str, items_database_file: str) -> None:
     """
     Функция для обновления базы данных предметов на основе нового файла.
 
     Parameters:
-        - new_items_file (string): путь к файлу с новыми предметами
+        - new_items_file (string): путь к файлу с новыми предметами (.csv или журнал сканирования .jsonl)
         - items_database_file (string): путь к файлу базы данных предметов
 
     Returns:
         - None
 
     Принцип работы:
-        1. Считывание данных: Функция считывает данные из двух CSV-файлов: new_items_file и items_database_file
-        2. Обновление данных: Для каждого нового предмета из new_items_file функция проверяет, присутствует ли предмет с таким же именем в базе данных.
+        1. Считывание данных: Функция считывает данные из new_items_file и items_database_file
+        2. Обновление данных: Все новые предметы объединяются с базой одной операцией (см. upsert_items).
             - Если предмет с таким именем уже есть в базе данных, его данные обновляются.
             - Если предмет с таким именем отсутствует в базе данных, он добавляется.
         3. Сохранение данных: Обновленная база данных сохраняется обратно в items_database_file.
     """
 
-    # Считываем данные из файлов
-    df_new_items = pd.read_csv(new_items_file)
-
-    if os.path.exists(items_database_file):
-        df_items_database = pd.read_csv(items_database_file)
+    # Считываем данные из файлов (журнал сканирования читается напрямую)
+    if new_items_file.endswith(".jsonl"):
+        df_new_items = read_scan_journal(new_items_file)
     else:
-        create_empty_items_csv(items_database_file)
-
-    df_new_items["item_name"] = df_new_items["item_name"].str.replace("&amp;", "&")
-    df_items_database["item_name"] = df_items_database["item_name"].str.replace(
-        "&amp;", "&"
-    )
+        df_new_items = pd.read_csv(new_items_file)
 
-    # Проходим по строкам нового DataFrame
-    for index, new_item in df_new_items.iterrows():
-        # Преобразуем id в целое число
-        if new_item["id"]:
-            new_item["id"] = pd.to_numeric(
-                new_item["id"], errors="coerce", downcast="integer"
-            )
-        # Получаем имя товара из нового DataFrame
-        item_name = new_item["item_name"]
-        # Ищем соответствующую строку в старом DataFrame
-        matching_row = df_items_database[df_items_database["item_name"] == item_name]
-        # Если находим, заменяем значения
-        if not matching_row.empty:
-            for column in df_new_items.columns:
-                if column != "item_name" and pd.notnull(new_item[column]):
-                    df_items_database.loc[matching_row.index, column] = new_item[column]
-        else:
-            # Если не находим совпадений, добавляем новую строку в конец DataFrame
-
-            # FIXME: FutureWarning: The behavior of DataFrame concatenation with empty or all-NA entries is deprecated.
-            # In a future version, this will no longer exclude empty or all-NA columns when determining the result dtypes.
-            # To retain the old behavior, exclude the relevant entries before the concat operation.
+    if not os.path.exists(items_database_file):
+        create_empty_items_csv(items_database_file)
 
-            df_items_database = df_items_database._append(
-                new_item.to_frame().T, ignore_index=True
-            )
+    df_items_database = pd.read_csv(items_database_file)
 
-    # Преобразуем столбец "id" в целочисленный тип данных
-    df_items_database["id"] = df_items_database["id"].astype("Int64")
-    df_items_database["volume"] = df_items_database["volume"].astype("Int64")
+    df_items_database = upsert_items(df_items_database, df_new_items)
 
     # Сохраняем обновленную базу данных
     df_items_database.to_csv(items_database_file, index=False)
@@ -1,5 +1,7 @@
-import requests
-import pandas as pd
+from typing import Optional
+
+from cs2crap.csgomarket.price_book import PRICES_FILE
+from cs2crap.csgomarket.price_refresher import get_price_refresher
 
 
 # ==================================================================================================================================
@@ -8,32 +10,20 @@ import pandas as pd
 
 
 def get_csgomarket_items_prices(
-    output_filename: str = "cs2crap/csgomarket/csgomarket_prices.csv",
-) -> None:
+    output_filename: str = PRICES_FILE,
+) -> Optional[dict]:
     """
-    Получает список всех предметов и их цены с сайта csgomarket.com, помещает их в указанный .csv файл.
+    Получает список всех предметов и их цены с сайта csgomarket.com, помещает их в указанный .csv файл
+    и обновляет общую книгу цен в памяти. Запрос условный: если цены не менялись, ничего не загружается.
 
     Parameters:
         - output_filename (str): название файла для вывода формата .csv
-    """
-
-    url = "https://market.csgo.com/api/v2/prices/RUB.json"
-
-    output_csv = output_filename
 
-    try:
-        response = requests.get(url)
-
-        if response.status_code == 200:
-            data = response.json()
-
-            items = data.get("items", [])
+    Returns:
+        - Optional[dict]: Изменения цен (см. price_refresher.diff_prices) или None, если цены не менялись.
+    """
 
-            df = pd.DataFrame(items)
-            df = df[["market_hash_name", "price"]]
+    price_refresher = get_price_refresher()
+    price_refresher.output_filename = output_filename
 
-            df.to_csv(output_csv, index=False, encoding="utf-8")
-        else:
-            print(f"Ошибка при выполнении запроса: {response.status_code}")
-    except Exception as e:
-        print(f"Произошла ошибка: {e}")
+    return price_refresher.refresh_once()
@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+from typing import Optional
+import pandas as pd
+
+
+# ==================================================================================================================================
+# |                                                     CS:GO MARKET PRICE BOOK DATA                                               |
+# ==================================================================================================================================
+
+PRICES_FILE = "cs2crap/csgomarket/csgomarket_prices.csv"
+
+
+# ==================================================================================================================================
+# |                                                     CS:GO MARKET PRICE BOOK                                                    |
+# ==================================================================================================================================
+
+
+def normalize_name(item_hash_name: str) -> str:
+    """Приводит название предмета к единому виду для поиска в книге цен."""
+
+    return str(item_hash_name).replace("&amp;", "&").strip()
+
+
+# ==================================================================================================================================
+
+
+class PriceBook:
+    """
+    Книга цен CS:GO Market в памяти: словарь {название предмета: цена}.
+    При обновлении словарь подменяется целиком, поэтому читатели никогда не видят частично обновлённые данные.
+    """
+
+    def __init__(self):
+        self._prices: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.updated_at: Optional[float] = None  # time.time() последнего обновления
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def replace(self, prices: dict) -> None:
+        """
+        Атомарно заменяет все цены.
+
+        Parameters:
+            - prices (dict): Словарь {market_hash_name: price} (или PriceTable).
+        """
+
+        book = {}
+        for item_hash_name, price in prices.items():
+            try:
+                book[normalize_name(item_hash_name)] = float(price)
+            except (TypeError, ValueError):
+                continue
+
+        with self._lock:
+            self._prices = book
+            self.updated_at = time.time()
+
+    def load_csv(self, filename: str = PRICES_FILE) -> None:
+        """Загружает цены из csgomarket_prices.csv."""
+
+        df = pd.read_csv(filename, encoding="utf-8")
+        self.replace(dict(zip(df["market_hash_name"], df["price"])))
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def get(self, item_hash_name: str) -> Optional[float]:
+        """
+        Цена предмета на CS:GO Market.
+
+        Parameters:
+            - item_hash_name (str): Название предмета.
+
+        Returns:
+            - Optional[float]: Цена или None, если предмета нет на CS:GO Market.
+        """
+
+        return self._prices.get(normalize_name(item_hash_name))
+
+    def snapshot(self) -> dict:
+        """Текущий снимок цен. Словарь не изменяется: при обновлении книга получает новый."""
+
+        return self._prices
+
+    def as_series(self) -> pd.Series:
+        """Цены в виде pd.Series с индексом по названию предмета (для векторных сравнений)."""
+
+        return pd.Series(self._prices, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+
+# ==================================================================================================================================
+
+
+_price_book = None
+_price_book_lock = threading.Lock()
+
+
+def get_price_book(filename: str = PRICES_FILE) -> PriceBook:
+    """
+    Возвращает общую для процесса книгу цен CS:GO Market.
+    При первом обращении загружает цены из CSV, если он есть.
+
+    Parameters:
+        - filename (str): Файл с ценами CS:GO Market.
+
+    Returns:
+        - PriceBook: Книга цен.
+    """
+
+    global _price_book
+
+    with _price_book_lock:
+        if _price_book is None:
+            _price_book = PriceBook()
+
+            if os.path.isfile(filename):
+                _price_book.load_csv(filename)
+
+    return _price_book
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_book = get_price_book()
+    print(len(test_book), test_book.get("Revolution Case"))
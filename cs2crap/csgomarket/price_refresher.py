@@ -0,0 +1,292 @@
+import os
+import threading
+from typing import Callable, Optional
+import requests
+import pandas as pd
+
+from cs2crap.common.utils import color_print
+from cs2crap.csgomarket.price_book import PRICES_FILE, get_price_book
+from cs2crap.csgomarket.prices_parser import CHUNK_SIZE, parse_prices
+
+
+# ==================================================================================================================================
+# |                                                   CS:GO MARKET PRICE REFRESHER DATA                                            |
+# ==================================================================================================================================
+
+PRICES_URL = "https://market.csgo.com/api/v2/prices/RUB.json"
+
+REFRESH_INTERVAL = 120  # Как часто обновлять цены в фоне в секундах
+REQUEST_TIMEOUT = (5, 30)  # Таймауты подключения и чтения в секундах
+PRICE_EPSILON = 0.01  # Относительное изменение цены, меньше которого цена считается прежней
+
+
+# ==================================================================================================================================
+# |                                                     CS:GO MARKET PRICE REFRESHER                                               |
+# ==================================================================================================================================
+
+
+def diff_prices(
+    old_prices: dict, new_prices: dict, epsilon: float = PRICE_EPSILON
+) -> dict:
+    """
+    Сравнивает два снимка цен CS:GO Market.
+
+    Parameters:
+        - old_prices (dict): Предыдущий снимок {название: цена}.
+        - new_prices (dict): Новый снимок {название: цена}.
+        - epsilon (float): Минимальное относительное изменение цены, которое считается изменением.
+
+    Returns:
+        - dict: {"added": [названия], "removed": [названия],
+            "up": {название: (старая цена, новая цена)}, "down": {название: (старая цена, новая цена)}}
+    """
+
+    diff = {
+        "added": [name for name in new_prices if name not in old_prices],
+        "removed": [name for name in old_prices if name not in new_prices],
+        "up": {},
+        "down": {},
+    }
+
+    for name, price in new_prices.items():
+        old_price = old_prices.get(name)
+
+        if old_price is None or abs(price - old_price) <= epsilon * old_price:
+            continue
+
+        diff["up" if price > old_price else "down"][name] = (old_price, price)
+
+    return diff
+
+
+def changed_items(diff: dict) -> set:
+    """Названия всех предметов, затронутых изменением цен (новые, пропавшие, подорожавшие и подешевевшие)."""
+
+    return (
+        set(diff["added"]) | set(diff["removed"]) | set(diff["up"]) | set(diff["down"])
+    )
+
+
+# ==================================================================================================================================
+
+
+class PriceRefresher:
+    """
+    Фоновое обновление цен CS:GO Market.
+    Использует условные запросы (ETag / If-Modified-Since): если цены не менялись, сервер отвечает 304 без тела.
+    Новые цены подменяются в общей книге цен, сканирование при этом не ждёт загрузку.
+    """
+
+    def __init__(
+        self,
+        interval: float = REFRESH_INTERVAL,
+        output_filename: str = PRICES_FILE,
+    ):
+        """
+        Parameters:
+            - interval (float): Интервал обновления в секундах.
+            - output_filename (str): CSV, в который сохраняются цены для совместимости.
+        """
+
+        self.interval = interval
+        self.output_filename = output_filename
+
+        self._session = requests.Session()
+        self._refresh_lock = threading.Lock()
+        self._listeners: list[Callable[[dict], None]] = []
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._users = 0  # Сколько сканирований сейчас пользуются фоновым обновлением
+        self._users_lock = threading.Lock()
+
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+
+        self.refreshes = 0  # Загружено новых снимков
+        self.not_modified = 0  # Ответов 304
+        self.errors = 0
+        self.last_diff: Optional[dict] = None
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def add_change_listener(self, listener: Callable[[dict], None]) -> None:
+        """
+        Подписывает функцию на изменение цен.
+
+        Parameters:
+            - listener (Callable[[dict], None]): Получает результат diff_prices для каждого нового снимка.
+        """
+
+        self._listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[dict], None]) -> None:
+        """Отписывает функцию от изменения цен."""
+
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def refresh_once(self) -> Optional[dict]:
+        """
+        Один условный запрос цен. При получении нового снимка обновляет книгу цен и CSV.
+
+        Returns:
+            - Optional[dict]: Изменения цен (см. diff_prices) или None, если цены не менялись или запрос не удался.
+        """
+
+        with self._refresh_lock:
+            headers = {}
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+
+            try:
+                with self._session.get(
+                    PRICES_URL, headers=headers, timeout=REQUEST_TIMEOUT, stream=True
+                ) as response:
+                    if response.status_code == 304:
+                        self.not_modified += 1
+                        return None
+
+                    response.raise_for_status()
+                    # Разбираем ответ потоково, не загружая весь JSON в память
+                    prices = parse_prices(response.iter_content(CHUNK_SIZE))
+            except (requests.RequestException, ValueError) as e:
+                self.errors += 1
+                color_print(
+                    "fail", "fail", f"Ошибка обновления цен CS:GO Market: {e}", True
+                )
+                return None
+
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
+
+            price_book = get_price_book()
+            old_prices = price_book.snapshot()
+            price_book.replace(prices)
+            new_prices = price_book.snapshot()
+
+            self._save_csv(new_prices)
+
+            self.refreshes += 1
+            self.last_diff = diff_prices(old_prices, new_prices)
+            listeners = list(self._listeners)
+
+        # Ошибка одного подписчика не должна останавливать фоновое обновление и других подписчиков
+        for listener in listeners:
+            try:
+                listener(self.last_diff)
+            except Exception as e:
+                color_print(
+                    "fail", "fail", f"Ошибка обработки изменения цен: {e}", True
+                )
+
+        return self.last_diff
+
+    def _save_csv(self, prices: dict) -> None:
+        temp_filename = f"{self.output_filename}.tmp"
+
+        pd.DataFrame(
+            list(prices.items()), columns=["market_hash_name", "price"]
+        ).to_csv(temp_filename, index=False, encoding="utf-8")
+
+        os.replace(temp_filename, self.output_filename)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _run(self, stop_event: threading.Event) -> None:
+        while not stop_event.wait(self.interval):
+            diff = self.refresh_once()
+
+            if diff is not None:
+                color_print(
+                    "log",
+                    "log",
+                    f"Цены CS:GO Market обновлены: подешевело {len(diff['down'])}, "
+                    f"подорожало {len(diff['up'])}, новых {len(diff['added'])}, "
+                    f"пропало {len(diff['removed'])}.",
+                    True,
+                )
+
+    def start(self) -> None:
+        """
+        Запускает фоновое обновление для ещё одного сканирования (поток один на всех).
+        Каждому вызову start должен соответствовать свой вызов stop.
+        """
+
+        with self._users_lock:
+            self._users += 1
+
+            if (
+                self._thread is not None
+                and self._thread.is_alive()
+                and not self._stop_event.is_set()
+            ):
+                return
+
+            # У каждого потока своё событие, чтобы остановленный поток не мешал новому
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._stop_event,),
+                name="cs2crap-csgomarket-prices",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Сообщает, что сканированию фоновое обновление больше не нужно.
+        Поток останавливается (не дожидаясь текущего запроса), когда его не использует ни одно сканирование.
+        """
+
+        with self._users_lock:
+            self._users = max(self._users - 1, 0)
+
+            if self._users == 0:
+                self._stop_event.set()
+
+    def stats(self) -> dict:
+        return {
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "prices": len(get_price_book()),
+        }
+
+
+# ==================================================================================================================================
+
+
+_price_refresher = None
+_price_refresher_lock = threading.Lock()
+
+
+def get_price_refresher() -> PriceRefresher:
+    """
+    Возвращает общий для процесса фоновый обновлятор цен CS:GO Market.
+
+    Returns:
+        - PriceRefresher: Обновлятор цен.
+    """
+
+    global _price_refresher
+
+    with _price_refresher_lock:
+        if _price_refresher is None:
+            _price_refresher = PriceRefresher()
+
+    return _price_refresher
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_refresher = get_price_refresher()
+
+    for _ in range(2):
+        test_diff = test_refresher.refresh_once()
+        print(None if test_diff is None else {k: len(v) for k, v in test_diff.items()})
+
+    print(test_refresher.stats())
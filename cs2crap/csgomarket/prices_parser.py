@@ -0,0 +1,206 @@
+import json
+import codecs
+from array import array
+from typing import Iterable, Iterator, Union
+
+
+# ==================================================================================================================================
+# |                                                   CS:GO MARKET PRICES PARSER DATA                                              |
+# ==================================================================================================================================
+
+CHUNK_SIZE = 64 * 1024  # Размер читаемого куска ответа в байтах
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+# ==================================================================================================================================
+# |                                                     CS:GO MARKET PRICES PARSER                                                 |
+# ==================================================================================================================================
+
+
+class PriceTable:
+    """
+    Компактная таблица цен: названия в списке, цены в array('d') вместо словарей и DataFrame со всеми полями.
+    Поддерживает items(), поэтому её можно передать в PriceBook.replace.
+    """
+
+    def __init__(self):
+        self.names: list[str] = []
+        self.prices = array("d")
+
+    def append(self, name: str, price: float) -> None:
+        self.names.append(name)
+        self.prices.append(price)
+
+    def items(self) -> Iterator[tuple[str, float]]:
+        return zip(self.names, self.prices)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# ==================================================================================================================================
+
+
+def iter_price_items(
+    chunks: Iterable[Union[bytes, str]]
+) -> Iterator[tuple[str, float]]:
+    """
+    Потоково разбирает ответ prices/RUB.json ({"success": ..., "items": [{...}, ...]}).
+    В памяти держится только текущий кусок ответа и один разбираемый предмет.
+
+    Parameters:
+        - chunks (Iterable[bytes | str]): Куски тела ответа (например, response.iter_content()).
+
+    Yields:
+        - tuple[str, float]: Пары (market_hash_name, price).
+    """
+
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+
+    buffer = ""
+    position = 0
+    in_items = False
+    finished = False
+
+    def read_more() -> bool:
+        nonlocal buffer, position, finished
+
+        for chunk in chunks:
+            text = text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                buffer = buffer[position:] + text
+                position = 0
+                return True
+
+        finished = True
+        return False
+
+    while True:
+        if not in_items:
+            # Ищем начало массива items; хвост оставляем на случай разрыва ключа между кусками
+            index = buffer.find('"items"', position)
+            start = buffer.find("[", index) if index != -1 else -1
+
+            if start == -1:
+                position = max(len(buffer) - 16, position)
+                if not read_more():
+                    return
+                continue
+
+            position = start + 1
+            in_items = True
+
+        # Пропускаем пробелы и запятые между предметами
+        while position < len(buffer) and buffer[position] in _WHITESPACE + ",":
+            position += 1
+
+        if position >= len(buffer):
+            if not read_more():
+                return
+            continue
+
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Предмет оборван на границе куска: дочитываем
+            if finished or not read_more():
+                raise
+            continue
+
+        position = end
+
+        try:
+            yield item["market_hash_name"], float(item["price"])
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+# ==================================================================================================================================
+
+
+def parse_prices(chunks: Iterable[Union[bytes, str]]) -> PriceTable:
+    """
+    Потоково разбирает ответ prices/RUB.json в компактную таблицу цен.
+
+    Parameters:
+        - chunks (Iterable[bytes | str]): Куски тела ответа.
+
+    Returns:
+        - PriceTable: Пары (market_hash_name, price).
+
+    Raises:
+        - ValueError: В ответе нет ни одной цены (например, {"success": false}).
+    """
+
+    table = PriceTable()
+
+    for name, price in iter_price_items(chunks):
+        table.append(name, price)
+
+    # Пустой снимок затёр бы книгу цен и CSV, а подписчики увидели бы пропажу всех предметов
+    if not table:
+        raise ValueError("в ответе нет цен")
+
+    return table
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    import pandas as pd
+
+    test_body = json.dumps(
+        {
+            "success": True,
+            "time": 1700000000,
+            "currency": "RUB",
+            "items": [
+                {
+                    "market_hash_name": f"Test Item {i} (Field-Tested)",
+                    "volume": str(i % 500),
+                    "price": f"{i % 10000 + 0.5:.2f}",
+                    "buy_order": "0",
+                    "avg_price": None,
+                    "popularity_7d": str(i % 100),
+                    "ru_name": f"Тестовый предмет {i} (После полевых испытаний)",
+                    "ru_rarity": "Армейское качество",
+                    "ru_quality": "Закалённое в боях",
+                    "text_color": "D2D2D2",
+                    "bg_color": None,
+                }
+                for i in range(30000)
+            ],
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    test_chunks = [
+        test_body[i : i + CHUNK_SIZE] for i in range(0, len(test_body), CHUNK_SIZE)
+    ]
+
+    def benchmark(name: str, parse) -> None:
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = parse()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{name}: {len(result)} цен, "
+            f"пик памяти {peak / 2**20:.1f} МБ, {elapsed:.2f} сек."
+        )
+
+    def parse_full():
+        df = pd.DataFrame(json.loads(b"".join(test_chunks))["items"])
+        return df[["market_hash_name", "price"]]
+
+    print(f"Размер ответа: {len(test_body) / 2**20:.1f} МБ")
+    benchmark("json + DataFrame", parse_full)
+    benchmark("Потоковый разбор", lambda: parse_prices(test_chunks))
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import threading
+
+from cs2crap.common.utils import color_print
+
+
+# ==================================================================================================================================
+# |                                                        ALERT CACHE DATA                                                        |
+# ==================================================================================================================================
+
+ALERT_CACHE_FILE = "data/sent_alerts.json"
+
+ALERT_TTL = 6 * 60 * 60  # Через сколько секунд то же самое уведомление можно отправить снова
+PRICE_STEP = 0.05  # Уведомление повторяется раньше ALERT_TTL, если маржа сдвинулась на 5 п.п. от последней отправленной
+SAVE_EVERY = 20  # Сохранять кэш на диск каждые N новых уведомлений
+
+
+# ==================================================================================================================================
+# |                                                          ALERT CACHE                                                           |
+# ==================================================================================================================================
+
+
+def alert_key(opportunity: dict) -> str:
+    """Ключ уведомления: предмет и метод (маржа хранится в записи кэша, см. AlertCache)."""
+
+    return f"{opportunity['item_name']}|{opportunity['method']}"
+
+
+def alert_margin(opportunity: dict) -> float:
+    """
+    Маржа уведомления в долях.
+
+    Parameters:
+        - opportunity (dict): profit (прибыль в % с учётом комиссии) или buy_at и sell_at.
+
+    Returns:
+        - float: Маржа, например 0.12 для 12%.
+    """
+
+    if opportunity.get("profit") is not None:
+        return float(opportunity["profit"]) / 100
+
+    buy_at = float(opportunity["buy_at"])
+    return (float(opportunity["sell_at"]) - buy_at) / buy_at if buy_at else 0.0
+
+
+# ==================================================================================================================================
+
+
+class AlertCache:
+    """
+    Кэш отправленных уведомлений с истечением по времени, сохраняется между перезапусками.
+    Повторное уведомление о предмете отправляется, только если прошло ALERT_TTL или маржа ушла от последней
+    отправленной хотя бы на PRICE_STEP. Сравнение идёт с отправленной, а не с предыдущей маржой (гистерезис):
+    колебания цены около одного значения не порождают повторных уведомлений.
+    """
+
+    def __init__(
+        self,
+        filename: str = ALERT_CACHE_FILE,
+        ttl: float = ALERT_TTL,
+        step: float = PRICE_STEP,
+    ):
+        """
+        Parameters:
+            - filename (str): Файл кэша.
+            - ttl (float): Время жизни записи в секундах.
+            - step (float): Насколько должна сдвинуться маржа, чтобы уведомление повторилось раньше ttl.
+        """
+
+        self.filename = filename
+        self.ttl = ttl
+        self.step = step
+
+        self._lock = threading.Lock()
+        self._sent: dict[str, dict] = {}  # Ключ -> {"sent_at": time.time() отправки, "margin": маржа}
+        self._unsaved = 0
+
+        self.suppressed = 0
+
+        self._load()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not os.path.isfile(self.filename):
+            return
+
+        try:
+            with open(self.filename, "r", encoding="utf-8") as cache_file:
+                sent = json.load(cache_file)
+        except (OSError, ValueError):
+            sent = {}
+
+        # Записи старого формата (ключ с корзинами цен -> время отправки) пропускаются
+        self._sent = {
+            key: entry for key, entry in sent.items() if isinstance(entry, dict)
+        }
+
+        self._evict(time.time())
+
+    def _evict(self, now: float) -> None:
+        self._sent = {
+            key: entry
+            for key, entry in self._sent.items()
+            if now - entry["sent_at"] < self.ttl
+        }
+
+    def save(self) -> None:
+        """Сохраняет кэш на диск, предварительно удаляя устаревшие записи."""
+
+        with self._lock:
+            self._evict(time.time())
+            sent = dict(self._sent)
+            self._unsaved = 0
+
+        temp_filename = f"{self.filename}.tmp"
+        try:
+            with open(temp_filename, "w", encoding="utf-8") as cache_file:
+                json.dump(sent, cache_file, ensure_ascii=False)
+            os.replace(temp_filename, self.filename)
+        except OSError as e:
+            color_print("fail", "fail", f"Ошибка сохранения {self.filename}: {e}", True)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def should_send(self, opportunity: dict) -> bool:
+        """
+        Проверяет, нужно ли отправлять уведомление. Отправленное уведомление запоминается через record.
+
+        Parameters:
+            - opportunity (dict): item_name, method, profit (или buy_at и sell_at).
+
+        Returns:
+            - bool: False, если уведомление о предмете по этому методу уже отправлялось в пределах ttl
+                и маржа с тех пор сдвинулась меньше чем на step.
+        """
+
+        key = alert_key(opportunity)
+        margin = alert_margin(opportunity)
+        now = time.time()
+
+        with self._lock:
+            entry = self._sent.get(key)
+
+            # Округление убирает погрешность float: сдвиг ровно на step считается достаточным
+            if (
+                entry is not None
+                and now - entry["sent_at"] < self.ttl
+                and round(abs(margin - entry["margin"]), 6) < self.step
+            ):
+                self.suppressed += 1
+                return False
+
+        return True
+
+    def record(self, opportunity: dict) -> None:
+        """
+        Запоминает отправленное уведомление (вызывается только после успешной отправки).
+
+        Parameters:
+            - opportunity (dict): item_name, method, profit (или buy_at и sell_at).
+        """
+
+        key = alert_key(opportunity)
+
+        with self._lock:
+            self._sent[key] = {
+                "sent_at": time.time(),
+                "margin": alert_margin(opportunity),
+            }
+            self._unsaved += 1
+            need_save = self._unsaved >= SAVE_EVERY
+
+        if need_save:
+            self.save()
+
+    def __len__(self) -> int:
+        return len(self._sent)
+
+
+# ==================================================================================================================================
+
+
+_alert_cache = None
+_alert_cache_lock = threading.Lock()
+
+
+def get_alert_cache() -> AlertCache:
+    """
+    Возвращает общий для процесса кэш отправленных уведомлений, загружая его с диска при первом обращении.
+
+    Returns:
+        - AlertCache: Кэш уведомлений.
+    """
+
+    global _alert_cache
+
+    with _alert_cache_lock:
+        if _alert_cache is None:
+            _alert_cache = AlertCache()
+
+    return _alert_cache
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_cache = AlertCache("data/test_sent_alerts.json", ttl=60)
+    test_opportunity = {
+        "item_name": "Revolution Case",
+        "method": "STM2STM",
+        "profit": 12,
+        "buy_at": 80.0,
+        "sell_at": 110.0,
+    }
+
+    print(test_cache.should_send(test_opportunity))
+    test_cache.record(test_opportunity)
+    print(test_cache.should_send({**test_opportunity, "profit": 15}))
+    print(test_cache.should_send({**test_opportunity, "profit": 18}))
+    test_cache.save()
@@ -0,0 +1,220 @@
+import threading
+from typing import Callable, Optional
+
+
+# ==================================================================================================================================
+# |                                                           DIGEST DATA                                                          |
+# ==================================================================================================================================
+
+DIGEST_WINDOW = 300  # Как часто отправлять дайджест в секундах
+DIGEST_TOP_N = 10  # Сколько лучших предметов попадает в дайджест
+INSTANT_PROFIT = 50  # Предметы с прибылью от этого значения (%) отправляются сразу, отдельным сообщением
+
+METHOD_NAMES = {
+    "STM2STM": "Steam to Steam",
+    "CSM2STM": "CS:GO Market to Steam",
+    "STM2CSM": "Steam to CS:GO Market",
+}
+
+
+# ==================================================================================================================================
+# |                                                             DIGEST                                                             |
+# ==================================================================================================================================
+
+
+def format_digest(opportunities: list[dict], window: float, total: int) -> str:
+    """
+    Собирает текст дайджеста.
+
+    Parameters:
+        - opportunities (list[dict]): Лучшие предметы, отсортированные по прибыли.
+        - window (float): Окно дайджеста в секундах.
+        - total (int): Сколько всего предметов накопилось за окно.
+
+    Returns:
+        - str: Сообщение в разметке Markdown.
+    """
+
+    period = f"{round(window / 60)} мин." if window >= 60 else f"{round(window)} сек."
+    lines = [f"📰 *Дайджест за {period}* 📰", ""]
+
+    for number, opportunity in enumerate(opportunities, start=1):
+        lines.append(
+            f"{number}. [{opportunity['item_name']}]({opportunity['item_href']})\n"
+            f"🚀 *{opportunity['profit']}%* · "
+            f"📈 *{opportunity['buy_at']}* ₽ → 📉 *{opportunity['sell_at']}* ₽ · "
+            f"🔥 *{opportunity['volume']}* · "
+            f"🧰 {METHOD_NAMES[opportunity['method']]}"
+        )
+
+    if total > len(opportunities):
+        lines.append(f"\n...и ещё *{total - len(opportunities)}* предмет(ов)")
+
+    return "\n".join(lines)
+
+
+# ==================================================================================================================================
+
+
+class Digest:
+    """
+    Режим дайджеста: выгодные предметы копятся в течение окна и отправляются одним сообщением,
+    лучшие по прибыли первыми. Предметы с прибылью от instant_profit отправляются сразу.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], bool],
+        window: float = DIGEST_WINDOW,
+        top_n: int = DIGEST_TOP_N,
+        instant_profit: float = INSTANT_PROFIT,
+        on_sent: Optional[Callable[[dict], None]] = None,
+    ):
+        """
+        Parameters:
+            - send (Callable[[str], bool]): Функция отправки сообщения.
+            - window (float): Окно дайджеста в секундах.
+            - top_n (int): Сколько лучших предметов попадает в дайджест.
+            - instant_profit (float): Порог прибыли (%) для немедленной отправки.
+            - on_sent (Callable[[dict], None], optional): Вызывается для каждого предмета, сообщение о котором отправлено.
+        """
+
+        self.send = send
+        self.on_sent = on_sent
+        self.window = window
+        self.top_n = top_n
+        self.instant_profit = instant_profit
+
+        self.enabled = False
+
+        self._lock = threading.Lock()
+        self._buffer: dict[tuple[str, str], dict] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def configure(
+        self,
+        enabled: bool,
+        window: Optional[float] = None,
+        top_n: Optional[int] = None,
+        instant_profit: Optional[float] = None,
+    ) -> None:
+        """
+        Включает или выключает режим дайджеста. При выключении накопленное отправляется сразу.
+
+        Parameters:
+            - enabled (bool): Включить режим дайджеста.
+            - window (float, optional): Окно дайджеста в секундах.
+            - top_n (int, optional): Сколько лучших предметов попадает в дайджест.
+            - instant_profit (float, optional): Порог прибыли (%) для немедленной отправки.
+        """
+
+        if window is not None:
+            self.window = window
+        if top_n is not None:
+            self.top_n = top_n
+        if instant_profit is not None:
+            self.instant_profit = instant_profit
+
+        self.enabled = enabled
+
+        if enabled:
+            self._start()
+        else:
+            self._stop_event.set()
+            self.flush()
+
+    def add(self, opportunity: dict, send_full: Callable[[], None]) -> None:
+        """
+        Учитывает выгодный предмет.
+
+        Parameters:
+            - opportunity (dict): item_name, method, profit (%), buy_at, sell_at, volume, item_href.
+            - send_full (Callable[[], bool]): Отправка полного сообщения о предмете (для мгновенной отправки),
+                возвращает True, если сообщение отправлено.
+        """
+
+        if not self.enabled or opportunity["profit"] >= self.instant_profit:
+            if send_full():
+                self._mark_sent([opportunity])
+            return
+
+        with self._lock:
+            # Повторный предмет за окно заменяет старую запись
+            key = (opportunity["item_name"], opportunity["method"])
+            self._buffer[key] = opportunity
+
+    def flush(self) -> None:
+        """Отправляет накопленный дайджест, если он не пуст."""
+
+        with self._lock:
+            opportunities = list(self._buffer.values())
+            self._buffer.clear()
+
+        if not opportunities:
+            return
+
+        opportunities.sort(key=lambda opportunity: opportunity["profit"], reverse=True)
+        sent = self.send(
+            format_digest(
+                opportunities[: self.top_n], self.window, len(opportunities)
+            )
+        )
+
+        # Предметы за пределами top_n в сообщение не попали
+        if sent:
+            self._mark_sent(opportunities[: self.top_n])
+
+    def _mark_sent(self, opportunities: list[dict]) -> None:
+        if self.on_sent is not None:
+            for opportunity in opportunities:
+                self.on_sent(opportunity)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _start(self) -> None:
+        if (
+            self._thread is not None
+            and self._thread.is_alive()
+            and not self._stop_event.is_set()
+        ):
+            return
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._stop_event,),
+            name="cs2crap-digest",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, stop_event: threading.Event) -> None:
+        while not stop_event.wait(self.window):
+            self.flush()
+
+
+# ==================================================================================================================================
+
+if __name__ == "__main__":
+    test_digest = Digest(print, window=60, top_n=2)
+    test_digest.configure(True)
+
+    for test_profit in (25, 31, 60, 22):
+        test_digest.add(
+            {
+                "item_name": f"Test Item {test_profit}",
+                "method": "STM2STM",
+                "profit": test_profit,
+                "buy_at": 100,
+                "sell_at": 100 + test_profit * 1.5,
+                "volume": 40,
+                "item_href": "https://steamcommunity.com/market/listings/730/Test",
+            },
+            lambda: print("Мгновенная отправка"),
+        )
+
+    test_digest.flush()
+
@@ -0,0 +1,306 @@
+import time
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from cs2crap.common.utils import color_print
+from cs2crap.common.scan_control import ScanControl
+
+
+# ==================================================================================================================================
+# |                                                        JOB MANAGER DATA                                                        |
+# ==================================================================================================================================
+
+MAX_CONCURRENT_SCANS = 1  # Сколько тяжёлых задач (/update, /cscrap) выполняется одновременно, остальные ждут в очереди
+MAX_PAUSED_JOBS = 2  # Сколько задач может стоять на паузе, уступив место другой задаче
+FINISHED_JOBS_KEPT = 20  # Сколько завершённых задач показывать в /jobs
+
+JOB_STATUSES = {
+    "queued": "⏳ в очереди",
+    "running": "⚙️ выполняется",
+    "paused": "⏸️ на паузе",
+    "done": "✅ завершена",
+    "failed": "❌ ошибка",
+    "cancelled": "🛑 отменена",
+}
+
+
+# ==================================================================================================================================
+# |                                                          JOB MANAGER                                                           |
+# ==================================================================================================================================
+
+
+class Job:
+    """Задача бота: id, описание, состояние и управление (ScanControl), которое получает функция задачи."""
+
+    def __init__(
+        self,
+        job_id: int,
+        kind: str,
+        description: str,
+        run_id: Optional[str] = None,
+        on_cancel: Optional[Callable[[], None]] = None,
+    ):
+        self.id = job_id
+        self.kind = kind
+        self.description = description
+        self.run_id = run_id  # Запуск сканирования (контрольная точка и журнал), который выполняет задача
+        self.on_cancel = on_cancel  # Вызывается один раз, когда отменённая задача больше не выполняется
+
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+        self.control = ScanControl()
+        self.future: Optional[Future] = None
+        self._holds_slot = False  # Занимает ли задача место среди max_concurrent выполняющихся
+
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def describe(self) -> str:
+        """Строка для списка задач /jobs."""
+
+        if self.started is None:
+            elapsed = ""
+        else:
+            minutes = ((self.finished or time.time()) - self.started) / 60
+            elapsed = f", {round(minutes)} мин."
+
+        return f"#{self.id} {self.description}: {JOB_STATUSES[self.status]}{elapsed}"
+
+
+# ==================================================================================================================================
+
+
+class JobManager:
+    """
+    Выполняет тяжёлые задачи бота в отдельном пуле потоков, чтобы цикл событий aiogram не блокировался.
+    Одновременно выполняется не больше max_concurrent задач, остальные ждут в очереди.
+    Задача на паузе освобождает своё место (и прокси), и её место может занять следующая задача.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_SCANS):
+        self.max_concurrent = max_concurrent
+
+        # Потоков больше, чем мест: задачи на паузе держат свой поток, но не место
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent + MAX_PAUSED_JOBS,
+            thread_name_prefix="cs2crap-job",
+        )
+        self._slots = threading.Condition()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._jobs: dict[int, Job] = {}
+        self._ids = itertools.count(1)
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def submit(
+        self,
+        kind: str,
+        description: str,
+        function: Callable[[ScanControl], None],
+        run_id: Optional[str] = None,
+        on_cancel: Optional[Callable[[], None]] = None,
+    ) -> Job:
+        """
+        Ставит задачу в очередь.
+
+        Parameters:
+            - kind (str): Тип задачи ("update", "cscrap").
+            - description (str): Описание для /jobs.
+            - function (Callable[[ScanControl], None]): Функция задачи, получает управление остановкой и паузой.
+            - run_id (str, optional): Запуск сканирования, который выполняет задача (см. new_run_id).
+            - on_cancel (Callable[[], None], optional): Очистка после отмены задачи (например, удаление
+                контрольных точек запуска), вызывается, когда функция задачи уже не выполняется.
+
+        Returns:
+            - Job: Созданная задача.
+        """
+
+        with self._lock:
+            job = Job(next(self._ids), kind, description, run_id, on_cancel)
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+
+        job.future = self._executor.submit(self._run, job, function)
+        return job
+
+    def _run(self, job: Job, function: Callable[[ScanControl], None]) -> None:
+        with self._slots:
+            self._slots.wait_for(
+                lambda: self._active < self.max_concurrent or job.control.is_set()
+            )
+
+            if job.control.is_set():
+                self._cancelled(job)
+                return
+
+            self._active += 1
+            job._holds_slot = True
+
+        job.status = "running"
+        job.started = time.time()
+
+        try:
+            function(job.control)
+            job.status = "cancelled" if job.control.is_set() else "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            color_print("fail", "fail", f"Ошибка задачи #{job.id}: {e}", True)
+        finally:
+            job.finished = time.time()
+            self._release_slot(job)
+
+        if job.status == "cancelled":
+            self._cancelled(job)
+
+    def _cancelled(self, job: Job) -> None:
+        job.status = "cancelled"
+        job.finished = time.time()
+
+        if job.on_cancel is None:
+            return
+
+        try:
+            job.on_cancel()
+        except Exception as e:
+            color_print("fail", "fail", f"Ошибка очистки задачи #{job.id}: {e}", True)
+
+    def _release_slot(self, job: Job) -> None:
+        with self._slots:
+            if job._holds_slot:
+                job._holds_slot = False
+                self._active -= 1
+            self._slots.notify_all()
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job for job in self._jobs.values() if job.is_finished()]
+
+        for job in finished[:-FINISHED_JOBS_KEPT]:
+            del self._jobs[job.id]
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Отменяет задачу: ожидающая в очереди не запустится, выполняющаяся (в том числе на паузе) остановится.
+
+        Returns:
+            - bool: False, если задачи нет или она уже завершена.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is None or job.is_finished():
+            return False
+
+        job.control.stop()
+        if job.future is not None and job.future.cancel():
+            self._cancelled(job)
+
+        # Будим задачу, которая ждёт свободного места
+        with self._slots:
+            self._slots.notify_all()
+
+        return True
+
+    def cancel_all(self, kind: Optional[str] = None) -> list[int]:
+        """
+        Отменяет все незавершённые задачи (или задачи одного типа).
+
+        Returns:
+            - list[int]: id отменённых задач.
+        """
+
+        return [
+            job.id
+            for job in self.jobs()
+            if (kind is None or job.kind == kind) and self.cancel(job.id)
+        ]
+
+    def pause(self, job_id: int) -> bool:
+        """
+        Ставит выполняющуюся задачу на паузу и освобождает её место для следующей задачи.
+
+        Returns:
+            - bool: False, если задача не выполняется или на паузе уже MAX_PAUSED_JOBS задач.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if (
+            job is None
+            or job.status != "running"
+            or self.paused_count() >= MAX_PAUSED_JOBS
+        ):
+            return False
+
+        job.control.pause()
+        job.status = "paused"
+        self._release_slot(job)
+
+        color_print("warning", "warning", f"Задача #{job.id} на паузе.", True)
+        return True
+
+    def resume(self, job_id: int) -> bool:
+        """
+        Продолжает задачу с места, где она была приостановлена.
+
+        Returns:
+            - bool: False, если задача не на паузе или все места заняты другими задачами.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is None or job.status != "paused":
+            return False
+
+        with self._slots:
+            if self._active >= self.max_concurrent:
+                return False
+
+            self._active += 1
+            job._holds_slot = True
+
+        job.status = "running"
+        job.control.resume()
+
+        color_print("status", "status", f"Задача #{job.id} продолжена.", True)
+        return True
+
+    def pause_all(self) -> list[int]:
+        """
+        Returns:
+            - list[int]: id задач, поставленных на паузу.
+        """
+
+        return [job.id for job in self.jobs() if self.pause(job.id)]
+
+    def resume_all(self) -> list[int]:
+        """
+        Returns:
+            - list[int]: id продолженных задач (пока есть свободные места).
+        """
+
+        return [job.id for job in self.jobs() if self.resume(job.id)]
+
+    def jobs(self) -> list[Job]:
+        """Задачи по возрастанию id."""
+
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.id)
+
+    def running_count(self) -> int:
+        return sum(1 for job in self.jobs() if job.status == "running")
+
+    def paused_count(self) -> int:
+        return sum(1 for job in self.jobs() if job.status == "paused")
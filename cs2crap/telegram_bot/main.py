@@ -1,4 +1,6 @@
 import asyncio
+from typing import Optional
+from functools import partial
 from aiogram.enums import ParseMode
 from aiogram import Bot, Dispatcher, types
 from aiogram.fsm.context import FSMContext
@@ -7,7 +9,10 @@ from aiogram.filters.state import State, StatesGroup
 
 from cs2crap.telegram_bot.utils import get_bot_data
 from cs2crap.common.utils import color_print, print_cscrap_logo
-from cs2crap.common.main import update_database, cscrap
+from cs2crap.common.main import update_database, cscrap, discard_run
+from cs2crap.telegram_bot.telegram_notifier import set_digest_mode
+from cs2crap.telegram_bot.job_manager import JobManager, Job
+from cs2crap.common.scan_checkpoint import list_checkpoints, new_run_id
 
 
 BOT_TOKEN, TELEGRAM_API_URL, CHAT_ID = get_bot_data()
@@ -19,7 +24,11 @@ STM2STM_ENABLED = True
 CSM2STM_ENABLED = False
 STM2CSM_ENABLED = True
 
-stop_cscrap_event = asyncio.Event()
+DIGEST_ENABLED = False  # Присылать выгодные предметы дайджестом раз в DIGEST_WINDOW секунд
+
+ITEMS_STORAGE = "csv"  # Хранилище базы предметов для /update и /cscrap: "csv" или "sqlite"
+
+job_manager = JobManager()  # /update и /cscrap выполняются в отдельном пуле потоков
 
 buttons = [
     [
@@ -27,8 +36,13 @@ buttons = [
     ],
     [
         types.KeyboardButton(text="/update"),
+        types.KeyboardButton(text="/continue"),
+        types.KeyboardButton(text="/jobs"),
+        types.KeyboardButton(text="/pause"),
+        types.KeyboardButton(text="/resume"),
         types.KeyboardButton(text="/stop"),
         types.KeyboardButton(text="/methods"),
+        types.KeyboardButton(text="/digest"),
     ],
     [
         types.KeyboardButton(text="/stm2stm"),
@@ -112,6 +126,24 @@ async def toggle_stm2csm(message: types.Message):
     )
 
 
+@dp.message(Command("digest"))
+async def toggle_digest(message: types.Message):
+    global DIGEST_ENABLED
+    DIGEST_ENABLED = not DIGEST_ENABLED
+    set_digest_mode(DIGEST_ENABLED)
+    color_print(
+        "status",
+        "status",
+        f'Режим дайджеста {"включен" if DIGEST_ENABLED else "выключен"}',
+        True,
+    )
+    await message.answer(
+        f"📰 *Дайджест* {'*включен* 📰' if DIGEST_ENABLED else '*выключен* 📰'}",
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=commands_keyboard,
+    )
+
+
 # ==================================================================================================================================
 
 
@@ -131,21 +163,48 @@ async def toggle_stm2csm(message: types.Message):
     )
 
 
-@dp.message(Command("update"))
-async def update_items_database(message: types.Message):
+async def report_job(message: types.Message, job: Job, done_text: str) -> None:
+    """Ждёт завершения задачи в фоне и сообщает о результате."""
+
+    try:
+        await asyncio.wrap_future(job.future)
+    except asyncio.CancelledError:
+        pass
+
+    if job.status == "done":
+        text = done_text
+    elif job.status == "failed":
+        text = f"❌ *Задача #{job.id} завершилась с ошибкой:* {job.error}"
+    else:
+        text = f"🛑 *Задача #{job.id} остановлена* 🛑"
+
     await message.answer(
-        "🔄 *Обновление базы предметов* 🔄",
+        text,
         parse_mode=ParseMode.MARKDOWN,
+        reply_markup=commands_keyboard,
     )
 
-    update_database()
+
+@dp.message(Command("update"))
+async def update_items_database(message: types.Message):
+    run_id = new_run_id()
+    job = job_manager.submit(
+        "update",
+        "Обновление базы предметов",
+        lambda control: update_database(
+            storage=ITEMS_STORAGE, stop_cscrap_event=control, run_id=run_id
+        ),
+        run_id,
+        partial(discard_run, run_id),
+    )
 
     await message.answer(
-        "✨ *База данных обновлена* ✨",
+        f"🔄 *Обновление базы предметов* 🔄 (задача *#{job.id}*)",
         parse_mode=ParseMode.MARKDOWN,
-        reply_markup=commands_keyboard,
     )
 
+    asyncio.create_task(report_job(message, job, "✨ *База данных обновлена* ✨"))
+
 
 class CScrapForm(StatesGroup):
     waiting_for_price_range = State()
@@ -188,37 +247,27 @@ async def run_cscrap(message: types.Message, state: FSMContext):
             reply_markup=commands_keyboard,
         )
 
-        stop_cscrap_event.clear()
+        methods = (STM2STM_ENABLED, CSM2STM_ENABLED, STM2CSM_ENABLED)
+        run_id = new_run_id()
+
+        job = job_manager.submit(
+            "cscrap",
+            f"Поиск предметов [{args_text}]",
+            lambda control: cscrap(
+                price_range, *methods, control, storage=ITEMS_STORAGE, run_id=run_id
+            ),
+            run_id,
+            partial(discard_run, run_id),
+        )
 
-        loop = asyncio.get_event_loop()
-        try:
-            if price_range is not None:
-                await loop.run_in_executor(
-                    None,
-                    cscrap,
-                    price_range,
-                    STM2STM_ENABLED,
-                    CSM2STM_ENABLED,
-                    STM2CSM_ENABLED,
-                    stop_cscrap_event,
-                )
-            else:
-                await loop.run_in_executor(
-                    None,
-                    cscrap,
-                    None,
-                    STM2STM_ENABLED,
-                    CSM2STM_ENABLED,
-                    STM2CSM_ENABLED,
-                    stop_cscrap_event,
-                )
-        except Exception as e:
-            print("Ошибка при запуске cscrap:", e)
+        if job.status == "queued" and job_manager.running_count() > 0:
+            await message.answer(
+                f"⏳ *Задача #{job.id} ждёт завершения текущих задач* ⏳",
+                parse_mode=ParseMode.MARKDOWN,
+            )
 
-        await message.answer(
-            f"🌌 *Поиск предметов завершён* 🌌",
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=commands_keyboard,
+        asyncio.create_task(
+            report_job(message, job, "🌌 *Поиск предметов завершён* 🌌")
         )
     except (Exception, UnboundLocalError, ValueError) as e:
         await message.answer(
@@ -232,7 +281,182 @@ async def run_cscrap(message: types.Message, state: FSMContext):
 
 @dp.message(Command("stop"))
 async def stop_cscrap(message: types.Message):
-    stop_cscrap_event.set()
+    job_manager.cancel_all()
+
+
+@dp.message(Command("jobs"))
+async def list_jobs(message: types.Message):
+    jobs = job_manager.jobs()
+
+    await message.answer(
+        "📋 *Задачи:*\n" + "\n".join(job.describe() for job in jobs)
+        if jobs
+        else "📋 *Задач нет* 📋",
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=commands_keyboard,
+    )
+
+
+@dp.message(Command("cancel"))
+async def cancel_job(message: types.Message):
+    try:
+        job_id = int(message.text.split()[1].lstrip("#"))
+    except (IndexError, ValueError):
+        await message.answer(
+            "Используйте: /cancel id_задачи (список задач - /jobs)",
+            reply_markup=commands_keyboard,
+        )
+        return
+
+    await message.answer(
+        f"🛑 *Задача #{job_id} отменяется* 🛑"
+        if job_manager.cancel(job_id)
+        else f"Задача #{job_id} не найдена или уже завершена.",
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=commands_keyboard,
+    )
+
+
+def resume_update(params: dict, run_id: Optional[str], control) -> None:
+    """Продолжает прерванное обновление базы предметов с параметрами из его контрольной точки."""
+
+    update_database(
+        params["start_from"],
+        params["items_count"],
+        params["sort_column"],
+        params["sort_dir"],
+        storage=params["storage"],
+        stop_cscrap_event=control,
+        resume=True,
+        run_id=run_id,
+    )
+
+
+def resume_cscrap(params: dict, run_id: Optional[str], control) -> None:
+    """Продолжает прерванный поиск предметов с параметрами из его контрольной точки."""
+
+    cscrap(
+        tuple(params["price_range"]),
+        *params["methods"].values(),
+        control,
+        prescreen=params["prescreen"],
+        storage=params["storage"],
+        resume=True,
+        run_id=run_id,
+    )
+
+
+@dp.message(Command("continue"))
+async def continue_interrupted(message: types.Message):
+    """
+    Продолжает прерванные (падением процесса) /update и /cscrap с их контрольных точек и с их же параметрами.
+    Запуски, отменённые командами /stop и /cancel, не продолжаются: их контрольные точки удаляются при отмене.
+    """
+
+    # Запуски, задачи которых ещё выполняются (или на паузе), сами дойдут до конца
+    active_runs = {job.run_id for job in job_manager.jobs() if not job.is_finished()}
+    jobs = []
+
+    for run_id, update_state in list_checkpoints("update_list"):
+        if run_id in active_runs:
+            continue
+
+        jobs.append(
+            (
+                job_manager.submit(
+                    "update",
+                    "Продолжение обновления базы предметов",
+                    partial(resume_update, update_state["params"], run_id),
+                    run_id,
+                    partial(discard_run, run_id),
+                ),
+                "✨ *База данных обновлена* ✨",
+            )
+        )
+
+    for run_id, cscrap_state in list_checkpoints("cscrap"):
+        if run_id in active_runs:
+            continue
+
+        lower_price, upper_price = cscrap_state["params"]["price_range"]
+        jobs.append(
+            (
+                job_manager.submit(
+                    "cscrap",
+                    f"Продолжение поиска предметов [{lower_price}-{upper_price}], "
+                    f"обработано {len(cscrap_state['done'])}",
+                    partial(resume_cscrap, cscrap_state["params"], run_id),
+                    run_id,
+                    partial(discard_run, run_id),
+                ),
+                "🌌 *Поиск предметов завершён* 🌌",
+            )
+        )
+
+    if not jobs:
+        await message.answer(
+            "Нет прерванных задач для продолжения.",
+            reply_markup=commands_keyboard,
+        )
+        return
+
+    await message.answer(
+        "▶️ *Продолжаем:*\n" + "\n".join(job.describe() for job, _ in jobs),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=commands_keyboard,
+    )
+
+    for job, done_text in jobs:
+        asyncio.create_task(report_job(message, job, done_text))
+
+
+def parse_job_id(message: types.Message) -> Optional[int]:
+    """id задачи из аргумента команды (/pause 3, /resume #3) или None, если аргумента нет."""
+
+    args = message.text.split()
+    return int(args[1].lstrip("#")) if len(args) > 1 else None
+
+
+@dp.message(Command("pause"))
+async def pause_job(message: types.Message):
+    try:
+        job_id = parse_job_id(message)
+    except ValueError:
+        job_id = None
+
+    if job_id is None:
+        paused = job_manager.pause_all()
+    else:
+        paused = [job_id] if job_manager.pause(job_id) else []
+
+    await message.answer(
+        f"⏸️ *На паузе:* {', '.join(f'#{paused_id}' for paused_id in paused)}"
+        if paused
+        else "Нет выполняющихся задач, которые можно поставить на паузу.",
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=commands_keyboard,
+    )
+
+
+@dp.message(Command("resume"))
+async def resume_job(message: types.Message):
+    try:
+        job_id = parse_job_id(message)
+    except ValueError:
+        job_id = None
+
+    if job_id is None:
+        resumed = job_manager.resume_all()
+    else:
+        resumed = [job_id] if job_manager.resume(job_id) else []
+
+    await message.answer(
+        f"▶️ *Продолжены:* {', '.join(f'#{resumed_id}' for resumed_id in resumed)}"
+        if resumed
+        else "Нет задач на паузе или все места заняты другими задачами (/jobs).",
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=commands_keyboard,
+    )
 
 
 # ==================================================================================================================================
@@ -243,6 +467,7 @@ async def main():
     Главный цикл бота
     """
     print_cscrap_logo()
+    set_digest_mode(DIGEST_ENABLED)
 
     while True:
         try:
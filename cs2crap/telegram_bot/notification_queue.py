@@ -0,0 +1,204 @@
+import time
+import queue
+import threading
+from typing import Optional
+import requests
+
+from cs2crap.common.utils import color_print
+
+
+# ==================================================================================================================================
+# |                                                     NOTIFICATION QUEUE DATA                                                    |
+# ==================================================================================================================================
+
+QUEUE_SIZE = 1000  # Максимум сообщений в очереди, новые сверх лимита отбрасываются
+
+CHAT_INTERVAL = 1.0  # Не чаще одного сообщения в секунду в один чат (лимит Telegram)
+GLOBAL_INTERVAL = 1 / 30  # Не больше 30 сообщений в секунду всего (лимит Telegram)
+
+MAX_RETRIES = 3  # Попыток отправки одного сообщения
+REQUEST_TIMEOUT = (3, 10)  # Таймауты подключения и чтения в секундах
+FLUSH_TIMEOUT = 10  # Сколько ждать отправки оставшихся сообщений при выходе
+
+
+# ==================================================================================================================================
+# |                                                       NOTIFICATION QUEUE                                                       |
+# ==================================================================================================================================
+
+
+class NotificationQueue:
+    """
+    Ограниченная очередь сообщений Telegram с фоновой отправкой.
+    Сканирование только кладёт сообщение в очередь и не ждёт ответа Telegram.
+    Фоновый поток переиспользует одно соединение и соблюдает лимиты Telegram на чат и на бота.
+    """
+
+    def __init__(self, api_url: str, max_size: int = QUEUE_SIZE):
+        """
+        Parameters:
+            - api_url (str): Адрес метода sendMessage бота.
+            - max_size (int): Максимальная длина очереди.
+        """
+
+        self.api_url = api_url
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._session = requests.Session()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+        self._chat_next_send: dict[str, float] = {}
+        self._global_next_send = 0.0
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0  # Не поместились в очередь
+        self.deferred = 0  # Отложены из-за 429 от Telegram
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def put(
+        self, chat_id: str, text: str, parse_mode: Optional[str] = "Markdown"
+    ) -> bool:
+        """
+        Ставит сообщение в очередь, не блокируя вызывающий поток.
+
+        Parameters:
+            - chat_id (str): id чата.
+            - text (str): Текст сообщения.
+            - parse_mode (str, optional): Режим разметки Telegram.
+
+        Returns:
+            - bool: True, если сообщение поставлено в очередь, False, если очередь переполнена.
+        """
+
+        self._ensure_sender()
+
+        params = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            params["parse_mode"] = parse_mode
+
+        try:
+            self._queue.put_nowait(params)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _ensure_sender(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="cs2crap-telegram-sender", daemon=True
+                )
+                self._thread.start()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def _wait_for_slot(self, chat_id: str) -> None:
+        now = time.monotonic()
+        send_at = max(self._chat_next_send.get(chat_id, 0.0), self._global_next_send)
+
+        if send_at > now:
+            time.sleep(send_at - now)
+            now = send_at
+
+        self._chat_next_send[chat_id] = now + CHAT_INTERVAL
+        self._global_next_send = now + GLOBAL_INTERVAL
+
+    def _send(self, params: dict) -> None:
+        chat_id = str(params["chat_id"])
+
+        for _ in range(MAX_RETRIES):
+            self._wait_for_slot(chat_id)
+
+            try:
+                response = self._session.post(
+                    self.api_url, params=params, timeout=REQUEST_TIMEOUT
+                )
+
+                if response.status_code == 429:
+                    # Telegram сообщает, сколько ждать, в parameters.retry_after
+                    retry_after = (
+                        response.json().get("parameters", {}).get("retry_after", 1)
+                    )
+                    self._chat_next_send[chat_id] = time.monotonic() + retry_after
+                    self.deferred += 1
+                    continue
+
+                response.raise_for_status()
+                self.sent += 1
+                return
+
+            except (requests.RequestException, ValueError) as e:
+                color_print("fail", "fail", f"Ошибка отправки в Telegram: {e}", True)
+
+        self.failed += 1
+
+    def _run(self) -> None:
+        while True:
+            params = self._queue.get()
+            try:
+                self._send(params)
+            finally:
+                self._queue.task_done()
+
+    # ------------------------------------------------------------------------------------------------------------------------------
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """
+        Ждёт отправки всех сообщений из очереди.
+
+        Returns:
+            - bool: True, если очередь опустела за отведённое время.
+        """
+
+        deadline = time.monotonic() + timeout
+
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+        return True
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            - dict: Длина очереди, количество отправленных, неотправленных, отброшенных и отложенных сообщений.
+        """
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "deferred": self.deferred,
+        }
+
+
+# ==================================================================================================================================
+
+
+_notification_queue = None
+_notification_queue_lock = threading.Lock()
+
+
+def get_notification_queue(api_url: str) -> NotificationQueue:
+    """
+    Возвращает общую для процесса очередь сообщений, создавая её при первом обращении.
+
+    Parameters:
+        - api_url (str): Адрес метода sendMessage бота.
+
+    Returns:
+        - NotificationQueue: Очередь сообщений.
+    """
+
+    global _notification_queue
+
+    with _notification_queue_lock:
+        if _notification_queue is None:
+            _notification_queue = NotificationQueue(api_url)
+
+    return _notification_queue
@@ -1,9 +1,12 @@
-import requests
+import atexit
 from typing import Optional
-from requests.exceptions import RequestException, Timeout, ConnectTimeout
 
 from cs2crap.telegram_bot.utils import get_bot_data
-from cs2crap.common.utils import escape_url, color_print
+from cs2crap.telegram_bot.digest import Digest
+from cs2crap.telegram_bot.alert_cache import get_alert_cache
+from cs2crap.telegram_bot.notification_queue import get_notification_queue
+from cs2crap.common.batch_evaluation import STEAM_PAYOUT, CSGOMARKET_PAYOUT
+from cs2crap.common.utils import escape_url
 from cs2crap.common.price_comparison import (
     stm2stm_comparison,
     csm2stm_comparison,
@@ -19,40 +22,25 @@ BOT_TOKEN, TELEGRAM_API_URL, CHAT_ID = get_bot_data()
 # ==================================================================================================================================
 
 
-def send_message(message: str) -> Optional[dict]:
+def send_message(message: str) -> bool:
     """
-    Логика отправки сообщения ботом.
+    Логика отправки сообщения ботом. Сообщение ставится в очередь и отправляется в фоне,
+    поэтому вызов не ждёт ответа Telegram.
 
     Parameters:
         - message (str): Сообщение для отправки.
 
     Returns:
-        - Optional[dict]: Ответ API Телеграма в формате JSON.
+        - bool: True, если сообщение поставлено в очередь, False, если очередь переполнена.
     """
 
-    params = {"chat_id": CHAT_ID, "text": message, "parse_mode": "Markdown"}
-
-    max_retries: int = 3
-
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(TELEGRAM_API_URL, params=params, timeout=1)
-            response.raise_for_status()
-            return response.json()
-        except ConnectTimeout as connect_timeout_error:
-            color_print(
-                "fail",
-                "fail",
-                f"Ошибка подключения к серверу Telegram: {connect_timeout_error}",
-                True,
-            )
-        except (RequestException, Timeout) as other_error:
-            color_print(
-                "fail",
-                "fail",
-                f"Произошла ошибка: {other_error}",
-                True,
-            )
+    return get_notification_queue(TELEGRAM_API_URL).put(CHAT_ID, message, "Markdown")
+
+
+# Режим дайджеста, включается через set_digest_mode; отправленные предметы запоминаются в кэше уведомлений
+digest = Digest(
+    send_message, on_sent=lambda opportunity: get_alert_cache().record(opportunity)
+)
 
 
 # ==================================================================================================================================
@@ -60,7 +48,7 @@ def send_message(message: str) -> Optional[dict]:
 
 def stm2stm_message(
     item_name: str, volume: int, price_buy: float, price_sell: float, item_href: str
-) -> None:
+) -> bool:
     """
     Отправляет стандартное сообщение о предмете метода Steam -> Steam
 
@@ -72,9 +60,9 @@ def stm2stm_message(
         - item_href (str): Ссылка на предмет.
 
     Returns:
-        - None
+        - bool: True, если сообщение поставлено в очередь.
     """
-    send_message(
+    return send_message(
         f"""
 Найден предмет: *{item_name}*
 
@@ -102,7 +90,7 @@ def csm2stm_message(
     result_buy: Optional[bool],
     result_sell: Optional[bool],
     csgomarket_item_price: float,
-):
+) -> bool:
     """
     Отправляет сообщение о предмете метода CS:GO Market -> Steam.
 
@@ -117,7 +105,7 @@ def csm2stm_message(
         - csgomarket_item_price (float): Цена предмета на CS:GO Market.
 
     Returns:
-        - None
+        - bool: True, если сообщение поставлено в очередь.
     """
 
     # Экранируем ссылку на csgo market
@@ -125,7 +113,7 @@ def csm2stm_message(
         f"https://market.csgo.com/ru/?search={item_name}"
     )
 
-    send_message(
+    return send_message(
         f"""
 Найден предмет: *{item_name}*
 {'\n' + '🔥🔥🔥 *AUTOBUY* 🔥🔥🔥\n' if result_sell else ''}
@@ -156,7 +144,7 @@ def stm2csm_message(
     result_buy: Optional[bool],
     result_sell: Optional[bool],
     csgomarket_item_price: float,
-) -> None:
+) -> bool:
     """
     Отправляет сообщение о предмете метода Steam -> CS:GO Market.
 
@@ -171,7 +159,7 @@ def stm2csm_message(
         - csgomarket_item_price (float): Цена предмета на CS:GO Market.
 
     Returns:
-        - None
+        - bool: True, если сообщение поставлено в очередь.
     """
 
     # Экранируем ссылку на csgo market
@@ -179,7 +167,7 @@ def stm2csm_message(
         f"https://market.csgo.com/ru/?search={item_name}"
     )
 
-    send_message(
+    return send_message(
         f"""
 Найден предмет: *{item_name}*
 {'\n' + '🔥🔥🔥 *FAST BUY* 🔥🔥🔥\n' if result_buy else ''}
@@ -211,6 +199,9 @@ def message_sending(
 ) -> None:
     """
     Основная функция отправки сообщений о предмете.
+    Повторные уведомления о том же предмете с почти той же маржой подавляются (см. alert_cache).
+    В режиме дайджеста (см. set_digest_mode) предметы копятся и отправляются одним сообщением,
+    сразу отправляются только предметы с прибылью от порога мгновенной отправки.
 
     Parameters:
         - item_name (str): Название предмета.
@@ -223,56 +214,126 @@ def message_sending(
         - None
     """
 
-    result_buy = None
-    result_sell = None
-    csgomarket_item_price = None
+    def opportunity(
+        method: str, buy_at: float, sell_at: float, payout: float
+    ) -> dict:
+        profit = (float(sell_at) * payout - float(buy_at)) / float(buy_at) * 100
+
+        return {
+            "item_name": item_name,
+            "method": method,
+            "profit": round(profit),
+            "buy_at": buy_at,
+            "sell_at": sell_at,
+            "volume": volume,
+            "item_href": item_href,
+        }
+
+    def notify(opportunity: dict, send_full) -> None:
+        # Такое же уведомление уже отправлялось недавно: не повторяем.
+        # В кэш уведомление попадает только после отправки (см. Digest, on_sent)
+        if get_alert_cache().should_send(opportunity):
+            digest.add(opportunity, send_full)
 
     # Steam to Steam
     if methods["STM2STM"]:
         if stm2stm_comparison(price_buy, price_sell):
-            stm2stm_message(item_name, volume, price_buy, price_sell, item_href)
+            notify(
+                opportunity("STM2STM", price_sell, price_buy, STEAM_PAYOUT),
+                lambda: stm2stm_message(
+                    item_name, volume, price_buy, price_sell, item_href
+                ),
+            )
 
     # CS:GO Market to Steam
     if methods["CSM2STM"]:
         result = csm2stm_comparison(item_name, price_sell, price_buy)
-        if result is not None:
-            (
-                csgomarket_item_price,
-                result_buy,
-                result_sell,
-            ) = result
-
-        if result_sell or result_buy:
-            csm2stm_message(
-                item_name,
-                volume,
-                price_buy,
-                price_sell,
-                item_href,
-                result_buy,
-                result_sell,
-                csgomarket_item_price,
+
+        if result is not None and (result[1] or result[2]):
+            csgomarket_item_price, result_buy, result_sell = result
+
+            notify(
+                opportunity(
+                    "CSM2STM",
+                    csgomarket_item_price,
+                    price_sell if result_sell else price_buy,
+                    STEAM_PAYOUT,
+                ),
+                lambda: csm2stm_message(
+                    item_name,
+                    volume,
+                    price_buy,
+                    price_sell,
+                    item_href,
+                    result_buy,
+                    result_sell,
+                    csgomarket_item_price,
+                ),
             )
 
     # Steam to CS:GO Market
     if methods["STM2CSM"]:
         result = stm2csm_comparison(item_name, price_sell, price_buy)
-        if result is not None:
-            (csgomarket_item_price, result_buy, result_sell) = result
-
-        if result_sell or result_buy:
-            stm2csm_message(
-                item_name,
-                volume,
-                price_buy,
-                price_sell,
-                item_href,
-                result_buy,
-                result_sell,
-                csgomarket_item_price,
+
+        if result is not None and (result[1] or result[2]):
+            csgomarket_item_price, result_buy, result_sell = result
+
+            notify(
+                opportunity(
+                    "STM2CSM",
+                    price_buy if result_buy else price_sell,
+                    csgomarket_item_price,
+                    CSGOMARKET_PAYOUT,
+                ),
+                lambda: stm2csm_message(
+                    item_name,
+                    volume,
+                    price_buy,
+                    price_sell,
+                    item_href,
+                    result_buy,
+                    result_sell,
+                    csgomarket_item_price,
+                ),
             )
 
 
+# ==================================================================================================================================
+
+
+def set_digest_mode(
+    enabled: bool,
+    window: Optional[float] = None,
+    top_n: Optional[int] = None,
+    instant_profit: Optional[float] = None,
+) -> None:
+    """
+    Включает или выключает режим дайджеста для уведомлений о предметах.
+
+    Parameters:
+        - enabled (bool): Включить режим дайджеста.
+        - window (float, optional): Окно дайджеста в секундах (по умолчанию DIGEST_WINDOW).
+        - top_n (int, optional): Сколько лучших предметов попадает в дайджест (по умолчанию DIGEST_TOP_N).
+        - instant_profit (float, optional): Порог прибыли (%) для немедленной отправки (по умолчанию INSTANT_PROFIT).
+    """
+
+    digest.configure(enabled, window, top_n, instant_profit)
+
+
+def flush_notifications() -> None:
+    """
+    Отправляет накопленный дайджест, ждёт, пока очередь сообщений опустеет,
+    и сохраняет кэш отправленных уведомлений.
+    """
+
+    digest.flush()
+    get_alert_cache().save()
+    get_notification_queue(TELEGRAM_API_URL).flush()
+
+
+atexit.register(flush_notifications)
+
+
 if __name__ == "__main__":
     send_message(
         r"""
@@ -6,6 +6,8 @@ requirements = [
     "requests==2.31.0",
     "colorama==0.4.6",
     "aiogram==3.3.0",
+    "aiohttp==3.9.5",
+    "numpy==1.26.4",
 ]
 
 setup(